@@ -0,0 +1,65 @@
+# benchmarks/bench_bulk_decrypt.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Scaling of `bulk_decrypt()` with the number of workers (thread and process
+# pools) on a synthetic vault held in memory.
+#
+# Usage: `python -m benchmarks.bench_bulk_decrypt [credentials]`
+#
+import os
+import sys
+import time
+
+from vaultsafe.db.models import Credential
+from vaultsafe.utils.bulk_utils import bulk_decrypt
+from vaultsafe.utils.crypto_utils import generate_fernet_key, encrypt, get_fernet
+
+
+class RawCredential:
+    """Stand-in for a Credential row: only `json()` is used by `bulk_decrypt()`."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def make_vault(vault_key, n):
+    vault_cipher = get_fernet(vault_key)
+    rows = []
+    for i in range(n):
+        key = generate_fernet_key()
+        cipher = get_fernet(key)
+        data = {'id': i, 'uuid': f'{i:032x}', 'name': f'Credential {i}', 'mnemonics': [f'mn{i}'],
+                'encrypted_key': encrypt(key, vault_cipher).decode(), 'encryption_algorithm': 'Fernet',
+                'date_created': '2024-06-12T00:00:00', 'last_updated': '2024-06-12T00:00:00'}
+        for field in Credential.ENCRYPTED_FIELDS:
+            data[field] = encrypt(f'{field} of credential {i}', cipher).decode()
+        rows.append(RawCredential(data))
+    return rows
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cores = os.cpu_count() or 1
+    vault_key = generate_fernet_key()
+
+    print(f"Building a synthetic vault of {n} credentials...")
+    rows = make_vault(vault_key, n)
+
+    workers_list = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    for pool in ('thread', 'process'):
+        baseline = None
+        for workers in workers_list:
+            start = time.perf_counter()
+            for _ in bulk_decrypt(rows, vault_key, workers=workers, pool=pool):
+                pass
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{pool:<8} workers={workers:<3} {elapsed:8.3f} s  {n / elapsed:10.0f} credentials/s  speedup x{baseline / elapsed:.2f}")
+
+
+if __name__ == '__main__':
+    main()
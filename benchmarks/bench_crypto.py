@@ -0,0 +1,59 @@
+# benchmarks/bench_crypto.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Microbenchmark: decrypting every field of a 10k-row vault with a fresh
+# `Fernet(key)` per call versus the cached vault cipher from `get_fernet()`
+# and one `new_fernet()` cipher per credential.
+#
+# Usage: `python -m benchmarks.bench_crypto [rows]`
+#
+import sys
+import time
+
+from cryptography.fernet import Fernet
+
+from vaultsafe.utils.crypto_utils import generate_fernet_key, encrypt, decrypt, get_fernet, new_fernet
+
+FIELDS = 8
+
+
+def make_rows(vault_key, n):
+    rows = []
+    for i in range(n):
+        key = generate_fernet_key()
+        cipher = new_fernet(key)
+        fields = [encrypt(f"field-{j}-of-credential-{i}", cipher) for j in range(FIELDS)]
+        rows.append((encrypt(key, vault_key), fields))
+    return rows
+
+
+def decrypt_uncached(rows, vault_key):
+    for encrypted_key, fields in rows:
+        key = Fernet(vault_key).decrypt(encrypted_key)
+        for field in fields:
+            Fernet(key).decrypt(field).decode()
+
+
+def decrypt_cached(rows, vault_key):
+    vault_cipher = get_fernet(vault_key)
+    for encrypted_key, fields in rows:
+        cipher = new_fernet(decrypt(encrypted_key, vault_cipher))
+        for field in fields:
+            decrypt(field, cipher)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    vault_key = generate_fernet_key()
+    rows = make_rows(vault_key, n)
+
+    for label, func in (("Fernet per field", decrypt_uncached), ("cipher per credential", decrypt_cached)):
+        start = time.perf_counter()
+        func(rows, vault_key)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {elapsed:8.3f} s  {elapsed / n * 1e6:8.1f} us/credential")
+
+
+if __name__ == '__main__':
+    main()
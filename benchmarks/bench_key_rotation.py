@@ -0,0 +1,83 @@
+# benchmarks/bench_key_rotation.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Re-wrapping the credential keys of a vault with a new vault key (the bulk of
+# a master password change) on a synthetic vault (see `synthetic_vault.py`):
+# the former approach (all Credential objects loaded, keys re-wrapped one by
+# one, one commit at the end) against `rotation_utils.rewrap_pending()`, which
+# also stages the search index under the new key, with 1 worker, a thread pool
+# and a process pool. Each run starts from freshly wrapped keys. Last, the
+# final swap (`finish_rotation()`) is timed.
+#
+# Usage: `python -m benchmarks.bench_key_rotation [credentials] [workers]`
+#
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import update, delete
+
+from vaultsafe.db import models
+from vaultsafe.db.models import Vault, Credential, NextSearchToken, session
+from vaultsafe.utils.crypto_utils import encrypt, decrypt, get_fernet
+from vaultsafe.utils.rotation_utils import start_rotation, rewrap_pending, finish_rotation
+from vaultsafe.config import CRYPTO_CHUNK_SIZE
+
+from benchmarks.synthetic_vault import build_vault, DEFAULT_MASTER_PASSWORD
+
+
+def reset():
+    session.execute(update(Credential).values(next_encrypted_key=None))
+    session.execute(delete(NextSearchToken))
+    session.commit()
+
+
+def legacy(old_vault_key, new_vault_key):
+    old_cipher, new_cipher = get_fernet(old_vault_key), get_fernet(new_vault_key)
+    for credential in session.query(Credential).all():
+        credential.next_encrypted_key = encrypt(decrypt(credential.encrypted_key, old_cipher), new_cipher)
+    session.commit()
+    session.expunge_all()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(os.cpu_count() or 1, 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the vault's session at a temporary database
+        old_vault_key = build_vault(f"sqlite:///{Path(tmp) / 'bench.db'}", count)
+        vault = session.query(Vault).first()
+        new_vault_key = start_rotation(vault, DEFAULT_MASTER_PASSWORD)
+
+        cases = [
+            ('legacy (keys only, one commit)', lambda: legacy(old_vault_key, new_vault_key)),
+            ('rewrap_pending, 1 worker', lambda: rewrap_pending(old_vault_key, new_vault_key, workers=1)),
+            (f'rewrap_pending, {workers} threads', lambda: rewrap_pending(old_vault_key, new_vault_key, workers=workers, pool='thread')),
+            (f'rewrap_pending, {workers} processes', lambda: rewrap_pending(old_vault_key, new_vault_key, workers=workers, pool='process')),
+        ]
+
+        print(f"{count} credentials, chunks of {CRYPTO_CHUNK_SIZE}, {os.cpu_count()} CPUs")
+        print(f"{'method':<32} {'seconds':>9} {'keys/s':>10}")
+        for name, func in cases:
+            reset()
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            print(f"{name:<32} {elapsed:>9.2f} {count / elapsed:>10,.0f}")
+
+        # The last case left every credential re-wrapped and its tokens staged
+        vault = session.query(Vault).first()
+        start = time.perf_counter()
+        finish_rotation(vault, old_vault_key, new_vault_key)
+        print(f"{'finish_rotation (swap)':<32} {time.perf_counter() - start:>9.2f}")
+
+        session.remove()
+        models._engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_password_generation.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Throughput of password generation: `secrets.choice()` per character (the
+# former `generate_strong_password()`) against the bulk generators of
+# `utils/password_utils.py`.
+#
+# Usage: `python -m benchmarks.bench_password_generation [count] [length]`
+#
+import sys
+import time
+import string
+import secrets
+
+from vaultsafe.utils.password_utils import generate_password_chunks, generate_passphrase_chunks
+
+CHARACTERS = string.ascii_letters + string.digits + "@#$-%&"
+
+
+def legacy(count, length):
+    return [''.join(secrets.choice(CHARACTERS) for _ in range(length)) for _ in range(count)]
+
+
+def bulk(count, length, **kwargs):
+    return sum(len(chunk) for chunk in generate_password_chunks(count, length, **kwargs))
+
+
+def passphrases(count, length):
+    return sum(len(chunk) for chunk in generate_passphrase_chunks(count))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 18
+
+    cases = [
+        ('secrets.choice (legacy)', lambda n: legacy(n, length), min(count, 50_000)),
+        ('bulk', lambda n: bulk(n, length), count),
+        ('bulk, --require-each', lambda n: bulk(n, length, require_each=True), count),
+        ('passphrases (6 words)', lambda n: passphrases(n, length), count),
+    ]
+
+    print(f"{'generator':<26} {'count':>10} {'seconds':>9} {'passwords/s':>13}")
+    for name, func, n in cases:
+        start = time.perf_counter()
+        func(n)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<26} {n:>10} {elapsed:>9.3f} {n / elapsed:>13,.0f}")
+
+
+if __name__ == '__main__':
+    main()
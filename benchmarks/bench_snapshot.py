@@ -0,0 +1,120 @@
+# benchmarks/bench_snapshot.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Looking up credentials by mnemonic in a vault snapshot (`vaultsafe snapshot`)
+# against the database, on a temporary vault: the time to open each one, to
+# find a mnemonic and to find it and decrypt its password. The snapshot is
+# opened in a fresh interpreter as well, to show that it does not depend on
+# the size of the vault.
+#
+# Usage: `python -m benchmarks.bench_snapshot [credentials] [lookups]`
+#
+import os
+import sys
+import time
+import random
+import tempfile
+import subprocess
+from pathlib import Path
+
+from sqlalchemy import insert, select
+
+from vaultsafe.db import models
+from vaultsafe.db.models import Base, Credential, Mnemonic, session
+from vaultsafe.db.engine import create_vault_engine
+from vaultsafe.utils.crypto_utils import encrypt, get_fernet, new_fernet, generate_fernet_key, sha256_hash
+from vaultsafe.utils.snapshot_utils import Snapshot, write_snapshot
+
+OPEN_SNAPSHOT = """
+import sys, time
+start = time.perf_counter()
+from vaultsafe.utils.snapshot_utils import Snapshot
+imported = time.perf_counter()
+with Snapshot(sys.argv[1]) as snapshot:
+    snapshot.get('mn0')
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def populate(engine, count, vault_key):
+    vault_cipher = get_fernet(vault_key)
+    credential_key = generate_fernet_key()
+    wrapped_key = encrypt(credential_key, vault_cipher)
+    cipher = new_fernet(credential_key)
+    password = encrypt('correct horse battery staple', cipher)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Vault.__table__), [{
+            'name': 'bench', 'owner_name': 'bench', 'owner_email': 'bench@example.com',
+            'vault_key_hash': sha256_hash(vault_key), 'master_password_hash': '', 'password_salt': '', 'key_version': 1,
+        }])
+        for start in range(0, count, 10_000):
+            ids = range(start + 1, min(start + 10_000, count) + 1)
+            conn.execute(insert(Credential.__table__), [
+                {'id': i, 'uuid': os.urandom(16).hex(), 'name': f'Credential {i}', 'key_version': 1,
+                 'encrypted_key': wrapped_key, 'password': password}
+                for i in ids
+            ])
+            conn.execute(insert(Mnemonic.__table__), [{'name': f'mn{i}', 'credential_id': i} for i in ids])
+
+
+def per_lookup(func, names):
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    return (time.perf_counter() - start) / len(names) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    vault_key = generate_fernet_key()
+    names = [f'mn{random.randint(1, count)}' for _ in range(lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the vault's session at a temporary database
+        models._engine = create_vault_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", connect_args={'check_same_thread': False})
+        Base.metadata.create_all(models._engine)
+        populate(models._engine, count, vault_key)
+        path = Path(tmp) / 'vault.snapshot'
+
+        start = time.perf_counter()
+        write_snapshot(path)
+        print(f"{count} credentials: snapshot of {path.stat().st_size:,} bytes written in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        snapshot = Snapshot(path)
+        opened = (time.perf_counter() - start) * 1e6
+        result = subprocess.run([sys.executable, '-c', OPEN_SNAPSHOT, str(path)], capture_output=True, text=True, check=True)
+        imported, opened_fresh = map(float, result.stdout.split())
+        print(f"open: {opened:.0f} µs, in a fresh interpreter {opened_fresh * 1e6:.0f} µs (+ {imported * 1000:.0f} ms of imports)")
+
+        def orm_get(name):
+            return session.query(Mnemonic).filter_by(name=name).first().credential
+
+        def core_get(name):
+            return session.execute(
+                select(Credential.encrypted_key, Credential.password).join(Mnemonic).where(Mnemonic.name == name)
+            ).first()
+
+        cases = [
+            ('ORM (get)', orm_get),
+            ('SQL, no ORM', core_get),
+            ('snapshot', snapshot.get),
+            ('ORM + decrypt password', lambda name: orm_get(name).decrypt_fields(vault_key, ['password'])),
+            ('snapshot + decrypt password', lambda name: snapshot.get(name).decrypt_fields(vault_key, ['password'])),
+        ]
+        print(f"{'lookup of a mnemonic':<30} {'µs':>9}")
+        for name, func in cases:
+            func(names[0])  # warm up
+            print(f"{name:<30} {per_lookup(func, names):>9.1f}")
+            session.expunge_all()
+
+        snapshot.close()
+        session.remove()
+        models._engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_sqlite_profiles.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Compares SQLite's defaults with the 'durable' and 'fast' profiles of
+# `create_vault_engine()`: throughput of small write transactions (one commit
+# each, like `add` or `update`) and the latency of lookups by uuid while a
+# writer keeps committing (like the web server).
+#
+# Usage: `python -m benchmarks.bench_sqlite_profiles [commits] [seconds]`
+#
+import sys
+import time
+import uuid
+import random
+import tempfile
+import threading
+from pathlib import Path
+
+from sqlalchemy import insert, select
+
+from vaultsafe.db.models import Base, Credential
+from vaultsafe.db.engine import create_vault_engine, SQLITE_PROFILES
+
+READERS = 4
+
+credential_table = Credential.__table__
+
+
+def new_row(i):
+    return {'uuid': uuid.uuid4().hex, 'name': f'Credential {i}', 'encrypted_key': 'x' * 100}
+
+
+def write_throughput(engine, commits):
+    start = time.perf_counter()
+    for i in range(commits):
+        with engine.begin() as conn:
+            conn.execute(insert(credential_table), new_row(i))
+    return commits / (time.perf_counter() - start)
+
+
+def read_latencies(engine, uuids, seconds):
+    """Lookups by uuid from READERS threads while one thread keeps committing."""
+    stop = threading.Event()
+    latencies = []
+    lock = threading.Lock()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            with engine.begin() as conn:
+                conn.execute(insert(credential_table), new_row(i))
+            i += 1
+
+    def reader():
+        local = []
+        query = select(credential_table.c.name)
+        with engine.connect() as conn:
+            while not stop.is_set():
+                start = time.perf_counter()
+                conn.execute(query.where(credential_table.c.uuid == random.choice(uuids))).first()
+                conn.rollback()
+                local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(READERS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return latencies
+
+
+def main():
+    commits = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"{'profile':<10} {'commits/s':>10} {'reads':>8} {'p50 read (ms)':>14} {'p99 read (ms)':>14} {'max read (ms)':>14}")
+    for profile in (None, *SQLITE_PROFILES):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_vault_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", profile=profile,
+                                         connect_args={'check_same_thread': False})
+            Base.metadata.create_all(engine)
+
+            throughput = write_throughput(engine, commits)
+            with engine.connect() as conn:
+                uuids = list(conn.scalars(select(credential_table.c.uuid)))
+
+            latencies = read_latencies(engine, uuids, seconds)
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            print(f"{profile or 'default':<10} {throughput:>10.0f} {len(latencies):>8} {p50:>14.3f} {p99:>14.3f} {latencies[-1] * 1000:>14.3f}")
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_startup.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Cold start of the CLI: wall time of a few commands which need no database,
+# and their total import time from `python -X importtime`, checked against a
+# budget. Exits with status 1 if a budget is exceeded or if a heavy module
+# (SQLAlchemy, Flask, ...) gets imported by a command which does not need it.
+#
+# Usage: `python -m benchmarks.bench_startup [runs]`
+#
+import sys
+import time
+import subprocess
+
+# command -> import time budget in milliseconds
+BUDGETS = {
+    ('--help',): 80,
+    ('--version',): 80,
+    ('generate', '--count', '2'): 200,
+}
+
+HEAVY_MODULES = ('sqlalchemy', 'flask', 'cryptography', 'vaultsafe.db')
+
+
+def run(args, *options):
+    return subprocess.run(
+        [sys.executable, *options, '-m', 'vaultsafe.cli', *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+
+
+def import_profile(args):
+    """Returns (total import time in ms, names of all the modules imported)."""
+    stderr = run(args, '-X', 'importtime').stderr
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        name = name[1:]  # one space after the separator, then two per nesting level
+        modules.add(name.strip())
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    failed = False
+
+    for args, budget in BUDGETS.items():
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run(args)
+            timings.append(time.perf_counter() - start)
+
+        import_ms, modules = import_profile(args)
+        heavy = sorted(name for name in HEAVY_MODULES if name in modules)
+        over_budget = import_ms > budget
+
+        status = 'OK'
+        if over_budget or heavy:
+            status = 'FAIL'
+            failed = True
+
+        label = ' '.join(args)
+        print(f"{label:<22} best {min(timings) * 1000:7.1f} ms  imports {import_ms:7.1f} ms (budget {budget} ms)  {status}")
+        if heavy:
+            print(f"{'':<22} unexpected imports: {', '.join(heavy)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
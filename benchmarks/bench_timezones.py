@@ -0,0 +1,63 @@
+# benchmarks/bench_timezones.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Formatting of UTC timestamps in local time, as done twice per credential by
+# `get` and the dashboard: the former implementation (timezone looked up and
+# offset of *now* computed on every call), `convert_utc_to_local_str()` and
+# the list version `convert_utc_to_local_strs()`.
+#
+# Usage: `python -m benchmarks.bench_timezones [count] [timezone]`
+#   The timezone defaults to Europe/Berlin, so that DST transitions are crossed.
+#
+import os
+import sys
+import time
+import random
+from datetime import datetime, timedelta
+
+import pytz
+from tzlocal import get_localzone_name
+
+
+def legacy_convert_utc_to_local_str(dt):
+    """The implementation before the timezone was cached (wrong across DST)."""
+    timezone_str = get_localzone_name()
+    offset = datetime.now(pytz.timezone(timezone_str)).utcoffset()
+    timezone_str = 'UTC' if offset == timedelta(0) else timezone_str
+    dt_local = dt + offset
+    return dt_local.strftime("%a, ") + dt_local.strftime("%d %b %Y") + dt_local.strftime(f" %I:%M %p ({timezone_str})")
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    os.environ['TZ'] = sys.argv[2] if len(sys.argv) > 2 else 'Europe/Berlin'
+
+    # Imported after setting TZ: the local timezone is resolved once per process
+    from vaultsafe.utils.general_utils import convert_utc_to_local_str, convert_utc_to_local_strs
+
+    # Timestamps over the last 5 years
+    start = datetime(2021, 10, 17)
+    dts = [start + timedelta(seconds=random.randrange(5 * 365 * 86400)) for _ in range(count)]
+
+    legacy_count = min(count, 5_000)
+    legacy_time, _ = timed(lambda: [legacy_convert_utc_to_local_str(dt) for dt in dts[:legacy_count]])
+    scalar_time, scalar = timed(lambda: [convert_utc_to_local_str(dt) for dt in dts])
+    vector_time, vector = timed(lambda: convert_utc_to_local_strs(dts))
+    assert scalar == vector
+
+    print(f"{count} timestamps in {os.environ['TZ']}")
+    print(f"{'method':<28} {'total (s)':>10} {'us/timestamp':>13}")
+    print(f"{'legacy (estimated)':<28} {legacy_time * count / legacy_count:>10.3f} {legacy_time / legacy_count * 1e6:>13.2f}")
+    print(f"{'convert_utc_to_local_str':<28} {scalar_time:>10.3f} {scalar_time / count * 1e6:>13.2f}")
+    print(f"{'convert_utc_to_local_strs':<28} {vector_time:>10.3f} {vector_time / count * 1e6:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
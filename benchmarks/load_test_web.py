@@ -0,0 +1,108 @@
+# benchmarks/load_test_web.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Load test of the web interface on the current vault: the app is served by a
+# threaded server in this process, the clients log in once and then request
+# the dashboard (1 in 10 requests) and `/get/<uuid>` pages concurrently.
+#
+# Usage: `python -m benchmarks.load_test_web [clients] [seconds]`
+#   The master password is asked for (or taken from VAULTSAFE_PASSWORD).
+#
+import os
+import sys
+import time
+import random
+import getpass
+import logging
+import threading
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+from werkzeug.serving import make_server
+
+from vaultsafe.config import Config
+from vaultsafe.web import create_app
+from vaultsafe.db.models import session, Credential
+
+DASHBOARD_RATIO = 0.1
+
+
+def login(base_url, password):
+    """Log in and return the session cookie header."""
+    jar = CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    data = urllib.parse.urlencode({'master_passwd': password}).encode()
+    opener.open(f"{base_url}/login", data=data).read()
+    cookie = '; '.join(f"{c.name}={c.value}" for c in jar)
+    if 'session=' not in cookie:
+        sys.exit("Login failed.")
+    return cookie
+
+
+def client(base_url, cookie, uuids, stop, results):
+    latencies = []
+    errors = 0
+    while not stop.is_set():
+        if random.random() < DASHBOARD_RATIO or not uuids:
+            path = '/dashboard'
+        else:
+            path = f'/get/{random.choice(uuids)}'
+
+        request = urllib.request.Request(f"{base_url}{path}", headers={'Cookie': cookie})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+        except OSError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    results.append((latencies, errors))
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    password = os.getenv('VAULTSAFE_PASSWORD') or getpass.getpass("Master password: ")
+
+    uuids = [row.uuid for row in session.query(Credential.uuid)]
+    session.remove()
+
+    app = create_app(Config)
+    app.config['DEBUG'] = False
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    cookie = login(base_url, password)
+
+    stop = threading.Event()
+    results = []
+    threads = [threading.Thread(target=client, args=(base_url, cookie, uuids, stop, results)) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    latencies = sorted(latency for latency_list, _ in results for latency in latency_list)
+    errors = sum(errors for _, errors in results)
+    if not latencies:
+        sys.exit("No request succeeded.")
+
+    print(f"{clients} clients, {len(uuids)} credentials, {elapsed:.1f} s")
+    print(f"requests/s {len(latencies) / elapsed:10.1f}")
+    print(f"p50 (ms)   {latencies[len(latencies) // 2] * 1000:10.1f}")
+    print(f"p99 (ms)   {latencies[int(len(latencies) * 0.99)] * 1000:10.1f}")
+    print(f"errors     {errors:10d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+# benchmarks/suite.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# End to end benchmark suite on synthetic vaults (see `synthetic_vault.py`)
+# of one or more sizes. For each size a new vault is built in a temporary
+# directory and the following are timed, in this order:
+#
+#   unlock            check the master password and derive the vault key
+#   get               one credential by mnemonic, all of its fields decrypted
+#   list              decrypt the whole vault (`vaultsafe get` without arguments)
+#   search            blind index search of a common and of a rare keyword
+#   export            decrypted JSON Lines export of the whole vault
+#   import            import of that export into an empty vault
+#   dashboard         a page of the web dashboard (test client, logged in)
+#   web_get           a credential page of the web interface
+#   change_password   re-wrap every credential key and switch to the new key
+#
+# The results (median, 95th percentile, min and runs of every case, in
+# milliseconds) are written as JSON with the commit, Python version and
+# machine, so that runs can be compared across commits with `--compare`.
+#
+# Usage:
+#   python -m benchmarks.suite [--sizes 1000 10000] [--output results.json]
+#   python -m benchmarks.suite --sizes 1000 --compare baseline.json
+#   python -m benchmarks.suite --compare baseline.json --against results.json
+#
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+
+from vaultsafe.version import __version__
+
+DEFAULT_SIZES = (1000, 10_000)
+# A case is a regression if its median is this many times slower than the baseline
+REGRESSION_RATIO = 1.25
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def git_commit():
+    """(commit, whether the tree has local changes), or (None, None) outside of git."""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    try:
+        return git('rev-parse', 'HEAD'), bool(git('status', '--porcelain', '--untracked-files=no'))
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def measure(func, runs: int, budget: float = None):
+    """
+    Time `func` `runs` times (fewer if `budget` seconds are used up, at least once).
+
+    Returns:
+        dict: median_ms, p95_ms, min_ms and runs.
+    """
+    times = []
+    started = time.perf_counter()
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+        if budget and time.perf_counter() - started > budget:
+            break
+    times.sort()
+    return {
+        'median_ms': round(statistics.median(times), 4),
+        'p95_ms': round(times[min(len(times) - 1, int(len(times) * 0.95))], 4),
+        'min_ms': round(times[0], 4),
+        'runs': len(times),
+    }
+
+
+def run_size(count: int, runs: int, workdir: Path, log):
+    """Build a vault of `count` credentials in `workdir` and time every case on it."""
+    from sqlalchemy import select, func
+
+    from benchmarks.synthetic_vault import build_vault, DEFAULT_MASTER_PASSWORD, WORDS
+    from vaultsafe.db import models
+    from vaultsafe.db.models import session, Vault, Credential, Mnemonic
+    from vaultsafe.utils.bulk_utils import bulk_decrypt, iter_credentials
+    from vaultsafe.utils.search_utils import search_credentials
+    from vaultsafe.utils.rotation_utils import start_rotation, rotate
+    from vaultsafe.commands import export, import_credentials
+    from vaultsafe.commands.get import LIST_FIELDS
+    from vaultsafe.web import create_app
+    from vaultsafe.web.routes import credential_cache
+    from vaultsafe.config import Config
+
+    results = {}
+    rng = random.Random(count)
+    # Large vaults get fewer runs of the cases which go through the whole vault
+    full_runs = max(1, min(runs, 100_000 // count))
+    devnull = open(os.devnull, 'w')
+
+    start = time.perf_counter()
+    vault_key = build_vault(f"sqlite:///{workdir / 'vault.db'}", count, seed=count)
+    results['build'] = {'median_ms': round((time.perf_counter() - start) * 1000, 1), 'runs': 1}
+    log(f"  built in {results['build']['median_ms'] / 1000:.1f}s")
+
+    vault = session.query(Vault).first()
+    names = session.scalars(select(Mnemonic.name)).all()
+
+    def unlock():
+        assert vault.check_password(DEFAULT_MASTER_PASSWORD)
+        vault.derive_key(DEFAULT_MASTER_PASSWORD)
+    results['unlock'] = measure(unlock, min(runs, 5))
+
+    def get():
+        mnemonic = session.query(Mnemonic).filter_by(name=rng.choice(names)).first()
+        mnemonic.credential.decrypt_fields(vault_key, Credential.ENCRYPTED_FIELDS)
+        session.expunge_all()
+    results['get'] = measure(get, runs * 20)
+
+    def list_all():
+        for _ in bulk_decrypt(iter_credentials(), vault_key, fields=LIST_FIELDS):
+            pass
+    results['list'] = measure(list_all, full_runs)
+
+    common = rng.choice(WORDS)
+    rare = names[len(names) // 2]
+    results['search_common'] = measure(lambda: search_credentials(common, vault_key), full_runs, budget=30)
+    results['search_rare'] = measure(lambda: search_credentials(rare, vault_key), runs * 5)
+    session.expunge_all()
+
+    # The export (decrypted, JSON Lines) is imported into an empty vault below
+    export.console.quiet = True
+    import_credentials.console.quiet = True
+    import_credentials.DOT_IMPORT_CHECKPOINT = workdir / '.import_checkpoint'
+    results['export'] = measure(lambda: export.export_credentials(iter_credentials(), workdir, 'jsonl', vault_key), full_runs)
+    export_file = workdir / 'credentials.jsonl'
+
+    # Web pages, with a logged in test client
+    app = create_app(Config)
+    client = app.test_client()
+    with client.session_transaction() as web_session:
+        web_session['logged_in'] = True
+        web_session['vault_key'] = vault_key
+        web_session['expires_at'] = time.time() + 3600
+    last_id = session.scalar(select(func.max(Credential.id)))
+    uuids = session.scalars(select(Credential.uuid)).all()
+
+    def dashboard():
+        response = client.get('/dashboard', query_string={'after': rng.randint(0, max(last_id - 50, 0))})
+        assert response.status_code == 200
+    results['dashboard'] = measure(dashboard, runs * 5)
+
+    def web_get(uuid):
+        assert client.get(f'/get/{uuid}').status_code == 200
+    results['web_get'] = measure(lambda: web_get(rng.choice(uuids)), runs * 5)
+    credential_cache.clear()
+    session.remove()
+
+    # Import, into a new (empty) vault with the same key
+    main_engine = models._engine
+    import_runs = []
+    for i in range(full_runs):
+        build_vault(f"sqlite:///{workdir / f'import-{i}.db'}", 0, seed=count)
+        vault_import = session.query(Vault).first()
+        import_key = vault_import.derive_key(DEFAULT_MASTER_PASSWORD)
+        start = time.perf_counter()
+        with redirect_stdout(devnull):
+            import_credentials.import_credentials_from_json(export_file, import_key, file_format='jsonl')
+        import_runs.append((time.perf_counter() - start) * 1000)
+        session.remove()
+        models._engine.dispose()
+    import_runs.sort()
+    results['import'] = {
+        'median_ms': round(statistics.median(import_runs), 4), 'p95_ms': round(import_runs[-1], 4),
+        'min_ms': round(import_runs[0], 4), 'runs': len(import_runs),
+    }
+    models._engine = main_engine
+
+    # Change of the master password, last since it changes the vault key
+    vault = session.query(Vault).first()
+
+    def change_password():
+        new_vault_key = start_rotation(vault, DEFAULT_MASTER_PASSWORD)
+        rotate(vault, vault_key, new_vault_key)
+    results['change_password'] = measure(change_password, 1)
+
+    session.remove()
+    models._engine.dispose()
+    devnull.close()
+    return results
+
+
+def compare(baseline: dict, current: dict, ratio: float = REGRESSION_RATIO):
+    """
+    Print the median of every case next to the baseline.
+
+    Returns:
+        list: The (size, case) whose median is `ratio` times slower or more.
+    """
+    regressions = []
+    print(f"{'size':>8} {'case':<16} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for size, cases in current['results'].items():
+        for case, result in cases.items():
+            base = baseline['results'].get(size, {}).get(case)
+            if base is None or case == 'build':
+                continue
+            change = result['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+            flag = ' <- slower' if change >= ratio else ''
+            if flag:
+                regressions.append((size, case))
+            print(f"{size:>8} {case:<16} {base['median_ms']:>12.3f} {result['median_ms']:>12.3f} {change:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite on synthetic vaults.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Number of credentials of the vaults, e.g. 1000 10000 100000 1000000.")
+    parser.add_argument('--runs', type=int, default=5, help="Base number of runs of every case.")
+    parser.add_argument('--output', '-o', type=Path, help="JSON file for the results. Default: benchmarks/results/<commit>.json")
+    parser.add_argument('--compare', type=Path, help="Baseline results to compare with (exit status 1 on a regression).")
+    parser.add_argument('--against', type=Path, help="With --compare: compare these results instead of running the suite.")
+    parser.add_argument('--ratio', type=float, default=REGRESSION_RATIO, help="Slowdown counted as a regression.")
+    args = parser.parse_args()
+
+    if args.against:
+        if not args.compare:
+            parser.error("--against needs --compare.")
+        current = json.loads(args.against.read_text())
+    else:
+        commit, dirty = git_commit()
+        current = {
+            'meta': {
+                'commit': commit,
+                'dirty': dirty,
+                'vaultsafe': __version__,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'cpus': os.cpu_count(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'runs': args.runs,
+            },
+            'results': {},
+        }
+        log = lambda message: print(message, file=sys.stderr)
+        for count in args.sizes:
+            log(f"{count} credentials")
+            with tempfile.TemporaryDirectory() as tmp:
+                current['results'][str(count)] = run_size(count, args.runs, Path(tmp), log)
+            for case, result in current['results'][str(count)].items():
+                log(f"  {case:<16} {result['median_ms']:>12.3f} ms")
+
+        output = args.output or REPO_ROOT / 'benchmarks' / 'results' / f"{(commit or 'local')[:12]}{'-dirty' if dirty else ''}.json"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(current, indent=2) + '\n')
+        log(f"Results written to '{output}'.")
+
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), current, args.ratio)
+        if regressions:
+            sys.exit(f"{len(regressions)} regression(s) of {args.ratio}x or more.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+# benchmarks/synthetic_vault.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Generator of synthetic vaults for the benchmarks: a real vault (schema,
+# Vault row with the default KDF, encrypted credentials, mnemonics and search
+# index) filled through `vaultsafe.db.models` with random but realistic data.
+#
+# Every credential has a name, a URL, a username and a password; the other
+# fields are set with the probabilities of `OPTIONAL_FIELDS` and have the
+# usual sizes (e.g. notes of 20 to 400 characters). A credential has 1 to 3
+# mnemonics (`MNEMONIC_FANOUT`). The same seed gives the same plaintexts.
+#
+# Usage: `python -m benchmarks.synthetic_vault <credentials> <database path> [master password]`
+#
+import sys
+import time
+import uuid
+import random
+import string
+from pathlib import Path
+
+from sqlalchemy import insert
+
+from vaultsafe.db import models
+from vaultsafe.db.models import Base, Vault, Credential, Mnemonic, SearchToken, session
+from vaultsafe.db.engine import create_vault_engine
+from vaultsafe.db.migrations import upgrade
+from vaultsafe.utils.crypto_utils import encrypt, get_fernet, new_fernet, generate_fernet_key, derive_search_key
+from vaultsafe.utils.search_utils import search_tokens_for
+from vaultsafe.utils.bulk_utils import worker_pool
+from vaultsafe.utils.general_utils import utcnow
+
+DEFAULT_MASTER_PASSWORD = 'benchmark-master-password'
+BATCH_SIZE = 5000
+
+SERVICES = (
+    'github', 'gitlab', 'google', 'gmail', 'outlook', 'amazon', 'aws', 'azure', 'netflix', 'spotify',
+    'slack', 'discord', 'dropbox', 'paypal', 'stripe', 'twitter', 'linkedin', 'reddit', 'steam', 'zoom',
+    'bank', 'insurance', 'electricity', 'router', 'wifi', 'vpn', 'jira', 'notion', 'figma', 'heroku',
+)
+WORDS = (
+    'account', 'personal', 'work', 'backup', 'shared', 'family', 'old', 'admin', 'billing', 'test',
+    'security', 'question', 'answer', 'pin', 'recovery', 'codes', 'stored', 'offline', 'renew', 'yearly',
+    'contact', 'support', 'ticket', 'license', 'device', 'phone', 'laptop', 'server', 'staging', 'prod',
+)
+DOMAINS = ('gmail.com', 'outlook.com', 'proton.me', 'yahoo.com', 'example.org', 'company.com')
+
+# Probability that an optional field is set
+OPTIONAL_FIELDS = {'recovery_key': 0.2, 'primary_email': 0.7, 'secondary_email': 0.2, 'token': 0.15, 'notes': 0.4}
+# Mnemonics per credential: count -> weight
+MNEMONIC_FANOUT = {1: 70, 2: 20, 3: 10}
+
+
+def _random_text(rng, low, high, alphabet=string.ascii_letters + string.digits):
+    return ''.join(rng.choices(alphabet, k=rng.randint(low, high)))
+
+
+def synthetic_credential(rng, i):
+    """
+    The plaintexts of the `i`th credential.
+
+    Returns:
+        dict: name, mnemonics (list) and the fields of `Credential.ENCRYPTED_FIELDS` (None if not set).
+    """
+    service = rng.choice(SERVICES)
+    user = f"{rng.choice(WORDS)}.{_random_text(rng, 4, 10, string.ascii_lowercase)}"
+    data = {field: None for field in Credential.ENCRYPTED_FIELDS}
+    data.update({
+        'name': f"{service.capitalize()} {rng.choice(WORDS)} {i}",
+        'url': f"https://{rng.choice(('www.', 'login.', 'accounts.', ''))}{service}.com/{_random_text(rng, 0, 24, string.ascii_lowercase + '/')}",
+        'username': user,
+        'password': _random_text(rng, 16, 32, string.ascii_letters + string.digits + '@#$-%&'),
+    })
+    if rng.random() < OPTIONAL_FIELDS['recovery_key']:
+        data['recovery_key'] = '-'.join(_random_text(rng, 4, 4, string.ascii_uppercase + string.digits) for _ in range(8))
+    if rng.random() < OPTIONAL_FIELDS['primary_email']:
+        data['primary_email'] = f"{user}@{rng.choice(DOMAINS)}"
+    if rng.random() < OPTIONAL_FIELDS['secondary_email']:
+        data['secondary_email'] = f"{_random_text(rng, 5, 12, string.ascii_lowercase)}@{rng.choice(DOMAINS)}"
+    if rng.random() < OPTIONAL_FIELDS['token']:
+        data['token'] = _random_text(rng, 40, 64)
+    if rng.random() < OPTIONAL_FIELDS['notes']:
+        data['notes'] = ' '.join(rng.choices(WORDS, k=rng.randint(3, 60)))[:400]
+
+    fanout = rng.choices(tuple(MNEMONIC_FANOUT), weights=tuple(MNEMONIC_FANOUT.values()))[0]
+    data['mnemonics'] = [f"{service}-{i}"] + [f"{service}-{i}-{n}" for n in range(2, fanout + 1)]
+    return data
+
+
+def _encrypt_credential(data, vault_key, search_key):
+    """Column values and search tokens of a synthetic credential. Module level for the worker pool."""
+    credential_key = generate_fernet_key()
+    cipher = new_fernet(credential_key)
+    columns = {field: encrypt(data[field], cipher) if data[field] else None for field in Credential.ENCRYPTED_FIELDS}
+    columns['name'] = data['name']
+    columns['encrypted_key'] = encrypt(credential_key, get_fernet(vault_key))
+    tokens = search_tokens_for([data['name'], data['username'], data['notes'], *data['mnemonics']], search_key)
+    return columns, tokens
+
+
+def build_vault(url, count: int, master_password: str = DEFAULT_MASTER_PASSWORD, seed: int = 0,
+                kdf: str = None, kdf_params: dict = None, progress=None):
+    """
+    Create a vault of `count` synthetic credentials in a new database and point
+    the vault's session at it.
+
+    Args:
+        url (str): SQLAlchemy URL of the new database, e.g. 'sqlite:///vault.db'.
+        count (int): Number of credentials.
+        master_password (str): The master password of the vault.
+        seed (int): Seed of the plaintexts.
+        kdf (str, optional): Key derivation function. Default: the default of new vaults.
+        kdf_params (dict, optional): Its parameters.
+        progress (callable, optional): Called with the number of credentials of every inserted batch.
+
+    Returns:
+        bytes: The vault key.
+    """
+    if models._engine is not None:
+        session.remove()
+        models._engine.dispose()
+    models._engine = create_vault_engine(url, connect_args={'check_same_thread': False})
+    Base.metadata.create_all(models._engine)
+    upgrade(models._engine)
+
+    vault = Vault(name='Synthetic vault', owner_name='benchmark', owner_email='benchmark@example.com')
+    vault.set_master_password_hash(master_password=master_password)
+    if kdf:
+        vault.set_kdf(kdf, kdf_params)
+    else:
+        vault.set_kdf()
+    vault_key = vault.derive_key(master_password)
+    vault.set_vault_key_hash(vault_key=vault_key)
+    session.add(vault)
+    session.commit()
+
+    rng = random.Random(seed)
+    now = utcnow()
+    search_key = derive_search_key(vault_key)
+    with worker_pool() as pool_map:
+        for start in range(0, count, BATCH_SIZE):
+            batch = [synthetic_credential(rng, i) for i in range(start, min(start + BATCH_SIZE, count))]
+            prepared = pool_map(_encrypt_credential, batch, vault_key, search_key)
+            # A new database: the ids are given rather than returned, for plain executemany INSERTs
+            ids = range(start + 1, start + len(batch) + 1)
+            session.execute(insert(Credential.__table__), [
+                {'id': id, 'uuid': uuid.UUID(int=rng.getrandbits(128)).hex, 'date_created': now, 'last_updated': now, 'key_version': 1, **columns}
+                for id, (columns, _) in zip(ids, prepared)
+            ])
+            session.execute(insert(Mnemonic.__table__), [
+                {'name': name, 'credential_id': id} for id, data in zip(ids, batch) for name in data['mnemonics']
+            ])
+            session.execute(insert(SearchToken.__table__), [
+                {'token': token, 'credential_id': id} for id, (_, tokens) in zip(ids, prepared) for token in tokens
+            ])
+            session.commit()
+            if progress:
+                progress(len(batch))
+
+    return vault_key
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python -m benchmarks.synthetic_vault <credentials> <database path> [master password]")
+    count = int(sys.argv[1])
+    path = Path(sys.argv[2])
+    master_password = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_MASTER_PASSWORD
+    if path.exists():
+        sys.exit(f"'{path}' already exists.")
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    build_vault(f"sqlite:///{path}", count, master_password)
+    print(f"Vault of {count} credentials written to '{path}' in {time.perf_counter() - start:.1f}s "
+          f"(master password: '{master_password}').")
+
+
+if __name__ == '__main__':
+    main()
@@ -23,6 +23,9 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=install_requires,
+    extras_require={
+        'argon2': ['argon2-cffi'],
+    },
     entry_points={
         'console_scripts': [
             'vaultsafe=vaultsafe.cli:cli',
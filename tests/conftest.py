@@ -0,0 +1,83 @@
+# tests/conftest.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Fixtures of a vault in a temporary database. `models.session` is pointed at
+# it, so the tests never touch the vault of the user (~/.vaultsafe).
+#
+import pytest
+
+from vaultsafe.db import models
+from vaultsafe.db.models import Base, Vault, Credential, Mnemonic, session
+from vaultsafe.db.engine import create_vault_engine
+from vaultsafe.db.migrations import upgrade
+from vaultsafe.utils.crypto_utils import encrypt, generate_fernet_key
+from vaultsafe.utils.search_utils import index_credential
+from vaultsafe.utils import output_utils
+
+MASTER_PASSWORD = 'correct horse battery staple'
+
+# A cheap key derivation: the tests derive many keys
+TEST_KDF = 'pbkdf2-sha256'
+TEST_KDF_PARAMS = {'iterations': 1000}
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """An empty vault database with the latest schema, used by `models.session`."""
+    session.remove()
+    engine = create_vault_engine(f"sqlite:///{tmp_path / 'vault.db'}", connect_args={'check_same_thread': False})
+    Base.metadata.create_all(engine)
+    upgrade(engine)
+    monkeypatch.setattr(models, '_engine', engine)
+    yield engine
+    session.remove()
+    engine.dispose()
+
+
+@pytest.fixture
+def vault(engine):
+    """A vault with the master password `MASTER_PASSWORD` and no credentials."""
+    vault = Vault(name='Test vault', owner_name='tester', owner_email='tester@example.com')
+    vault.set_master_password_hash(master_password=MASTER_PASSWORD)
+    vault.set_kdf(TEST_KDF, TEST_KDF_PARAMS)
+    vault.set_vault_key_hash(vault_key=vault.derive_key(MASTER_PASSWORD))
+    session.add(vault)
+    session.commit()
+    return vault
+
+
+@pytest.fixture
+def vault_key(vault):
+    return vault.derive_key(MASTER_PASSWORD)
+
+
+@pytest.fixture
+def add_credential(vault_key):
+    """
+    Add an indexed credential, the way `vaultsafe add` does:
+    `add_credential('GitHub', ['gh'], username='me', password='secret')`.
+    """
+    def add(name, mnemonics=(), **fields):
+        credential_key = generate_fernet_key()
+        credential = Credential(
+            name=name,
+            encrypted_key=encrypt(credential_key, vault_key),
+            **{field: encrypt(value, credential_key) for field, value in fields.items()}
+        )
+        session.add(credential)
+        for mnemonic in mnemonics:
+            session.add(Mnemonic(name=mnemonic, credential=credential))
+        session.flush()
+        index_credential(credential, vault_key)
+        session.commit()
+        return credential
+    return add
+
+
+@pytest.fixture(autouse=True)
+def output_mode():
+    """Restore the output mode which a test (or a command it runs) changed."""
+    mode = output_utils.get_mode()
+    yield
+    output_utils.set_mode(mode)
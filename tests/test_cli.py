@@ -0,0 +1,36 @@
+# tests/test_cli.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import click
+import pytest
+from click.testing import CliRunner
+
+from vaultsafe.cli import cli, LAZY_COMMANDS
+
+
+@pytest.mark.parametrize('name', sorted(LAZY_COMMANDS))
+def test_lazy_short_help_matches_command(name):
+    # `--help` shows the registered short help without importing the command
+    ctx = click.Context(cli)
+    command = cli.get_command(ctx, name)
+    registered = click.Command(name, help=LAZY_COMMANDS[name][1])
+    assert registered.get_short_help_str(1000) == command.get_short_help_str(1000)
+
+
+def test_help_lists_every_command_without_importing_them():
+    group = type(cli)(lazy_commands=LAZY_COMMANDS)
+    ctx = click.Context(group)
+    formatter = ctx.make_formatter()
+    group.format_commands(ctx, formatter)
+    output = formatter.getvalue()
+    assert all(name in output for name in LAZY_COMMANDS)
+    assert not group.commands
+
+
+def test_server_refuses_several_workers_with_the_api(monkeypatch):
+    from vaultsafe.commands import server as server_module
+    monkeypatch.setattr(server_module, 'create_app', lambda *args, **kwargs: pytest.fail('The app was created.'))
+    result = CliRunner().invoke(cli, ['server', '-w', '2', '--headless'])
+    assert result.exit_code == 2
+    assert "'--no-api'" in result.stderr
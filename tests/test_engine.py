@@ -0,0 +1,64 @@
+# tests/test_engine.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from vaultsafe.db.engine import create_vault_engine, SQLITE_PROFILES
+
+
+@pytest.fixture
+def vault_engine(tmp_path):
+    engine = create_vault_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+    yield engine
+    engine.dispose()
+
+
+def test_savepoints_stay_inside_the_transaction(vault_engine):
+    session = Session(vault_engine)
+    for name in ('a', 'b', 'a', 'c'):
+        try:
+            with session.begin_nested():
+                session.execute(text("INSERT INTO item (name) VALUES (:name)"), {'name': name})
+        except IntegrityError:
+            pass
+    # Releasing the first savepoint did not commit it
+    session.rollback()
+    assert session.execute(text("SELECT name FROM item")).all() == []
+
+    for name in ('a', 'b', 'a', 'c'):
+        try:
+            with session.begin_nested():
+                session.execute(text("INSERT INTO item (name) VALUES (:name)"), {'name': name})
+        except IntegrityError:
+            pass
+    session.commit()
+    assert session.execute(text("SELECT name FROM item ORDER BY id")).scalars().all() == ['a', 'b', 'c']
+    session.close()
+
+
+def pragmas(engine, *names):
+    with engine.connect() as conn:
+        return [conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names]
+
+
+def test_default_profile(vault_engine):
+    # synchronous NORMAL is 1, FULL is 2
+    assert pragmas(vault_engine, 'journal_mode', 'synchronous', 'mmap_size') == \
+        ['wal', 1, SQLITE_PROFILES['fast']['mmap_size']]
+
+
+def test_durable_profile(tmp_path):
+    engine = create_vault_engine(f"sqlite:///{tmp_path / 'test.db'}", profile='durable')
+    assert pragmas(engine, 'journal_mode', 'synchronous', 'mmap_size') == ['wal', 2, 0]
+    engine.dispose()
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match='fast, durable'):
+        create_vault_engine('sqlite://', profile='turbo')
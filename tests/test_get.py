@@ -0,0 +1,123 @@
+# tests/test_get.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import json
+import shlex
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from vaultsafe.cli import cli
+from vaultsafe.commands import get as get_module
+from vaultsafe.commands.get import env_name, check_env_names, format_batch
+from vaultsafe.utils.snapshot_utils import write_snapshot
+
+RESULTS = {
+    'github': {'password': 'p@ss "word"', 'token': None},
+    'aws-ci': {'password': "it's\n$HOME \\", 'token': 'abc'},
+}
+
+
+@pytest.mark.parametrize('mnemonic, field, expected', [
+    ('github', 'password', 'GITHUB_PASSWORD'),
+    ('github-ci', 'token', 'GITHUB_CI_TOKEN'),
+    ('my.app', 'username', 'MY_APP_USERNAME'),
+    ('2fa', 'token', '_2FA_TOKEN'),
+    ('café', 'password', 'CAF__PASSWORD'),
+])
+def test_env_name(mnemonic, field, expected):
+    assert env_name(mnemonic, field) == expected
+
+
+def test_check_env_names():
+    check_env_names(['github', 'github', 'aws'], ['password', 'token'])
+    with pytest.raises(click.UsageError, match="'github-ci' and 'github.ci'"):
+        check_env_names(['github-ci', 'github.ci'], ['password'])
+
+
+def test_format_json():
+    assert json.loads(format_batch(RESULTS, 'json')) == RESULTS
+
+
+def test_format_env():
+    assert format_batch(RESULTS, 'env').splitlines() == [
+        'GITHUB_PASSWORD="p@ss \\"word\\""',
+        'GITHUB_TOKEN=""',
+        'AWS_CI_PASSWORD="it\'s\\n$HOME \\\\"',
+        'AWS_CI_TOKEN="abc"',
+    ]
+
+
+def test_format_shell():
+    lines = format_batch(RESULTS, 'shell').splitlines()
+    # The shell reads back the values
+    assert shlex.split(format_batch(RESULTS, 'shell')) == [
+        'export', 'GITHUB_PASSWORD=p@ss "word"',
+        'export', 'GITHUB_TOKEN=',
+        'export', "AWS_CI_PASSWORD=it's\n$HOME \\",
+        'export', 'AWS_CI_TOKEN=abc',
+    ]
+    assert lines[0] == "export GITHUB_PASSWORD='p@ss \"word\"'"
+
+
+@pytest.fixture
+def runner(vault_key, add_credential, monkeypatch):
+    add_credential('GitHub', ['github', 'gh'], password='gh-pass', token='gh-token')
+    add_credential('AWS', ['aws-ci'], password='aws-pass')
+    monkeypatch.setattr(get_module, 'assert_db_init', lambda: None)
+    monkeypatch.setattr(get_module, 'input_vault_key_and_verify', lambda: vault_key)
+    monkeypatch.setattr(get_module, 'input_snapshot_key_and_verify', lambda snapshot: vault_key)
+    return CliRunner()
+
+
+def test_get_batch(runner):
+    result = runner.invoke(cli, ['get', '--batch', 'github', 'aws-ci', 'gh', '-f', 'password', '-f', 'token'])
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout) == {
+        'github': {'password': 'gh-pass', 'token': 'gh-token'},
+        'aws-ci': {'password': 'aws-pass', 'token': None},
+        'gh': {'password': 'gh-pass', 'token': 'gh-token'},
+    }
+
+
+@pytest.mark.parametrize('output_format, expected', [
+    ('env', 'GITHUB_PASSWORD="gh-pass"\nAWS_CI_PASSWORD="aws-pass"\n'),
+    ('shell', 'export GITHUB_PASSWORD=gh-pass\nexport AWS_CI_PASSWORD=aws-pass\n'),
+])
+def test_get_batch_formats(runner, output_format, expected):
+    result = runner.invoke(cli, ['get', '--batch', 'github', 'aws-ci', '--format', output_format])
+    assert result.exit_code == 0, result.output
+    assert result.stdout == expected
+
+
+def test_get_batch_from_a_snapshot(runner, tmp_path):
+    path = tmp_path / 'vault.snapshot'
+    write_snapshot(path)
+    result = runner.invoke(cli, ['get', '--batch', 'aws-ci', 'gh', '--format', 'env', '--snapshot', str(path)])
+    assert result.exit_code == 0, result.output
+    assert result.stdout == 'AWS_CI_PASSWORD="aws-pass"\nGH_PASSWORD="gh-pass"\n'
+
+
+def test_get_batch_missing_mnemonic(runner):
+    result = runner.invoke(cli, ['get', '--batch', 'github', 'nothing'])
+    assert result.exit_code == 1
+    assert result.stdout == ''
+    assert 'nothing' in result.stderr
+
+
+@pytest.mark.parametrize('args, message', [
+    (['get', '--batch'], 'at least one mnemonic'),
+    (['get', '--batch', 'gh', '-s', 'git'], "both '--batch' and '--search'"),
+    (['get', 'gh', 'aws-ci'], "Use '--batch'"),
+    (['get', 'gh', '--format', 'json'], 'only be used with'),
+    (['get', 'gh', '-f', 'token'], 'only be used with'),
+    (['get', '--batch', 'a-b', 'a.b', '--format', 'env'], 'both map to the variable A_B_PASSWORD'),
+])
+def test_get_usage_errors(args, message, monkeypatch):
+    # Raised before the database is used
+    monkeypatch.setattr(get_module, 'assert_db_init', lambda: pytest.fail('The database was used.'))
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 2
+    assert message in result.stderr
@@ -0,0 +1,190 @@
+# tests/test_import.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import json
+
+import pytest
+from sqlalchemy import select
+
+from vaultsafe.commands import import_credentials
+from vaultsafe.commands.import_credentials import import_credentials_from_json, load_checkpoint
+from vaultsafe.db.models import session, Credential, Mnemonic
+from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, generate_fernet_key, sha256_hash
+
+
+def entry(i):
+    return {'name': f'Site {i}', 'mnemonics': f'site{i}', 'username': f'user{i}', 'password': f'pass{i}'}
+
+
+def write_export(path, entries, metadata=None):
+    lines = [{'metadata': metadata or {'file_encrypted': False}}] + entries
+    path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+    return path
+
+
+@pytest.fixture
+def report(monkeypatch):
+    """The (imported, skipped, failed) of the import summary."""
+    report = {}
+
+    def print_import_report(imported, skipped, failed):
+        report.update(imported=imported, skipped=skipped, failed=failed)
+
+    monkeypatch.setattr(import_credentials, '_print_import_report', print_import_report)
+    return report
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_file(tmp_path, monkeypatch):
+    path = tmp_path / '.import_checkpoint'
+    monkeypatch.setattr(import_credentials, 'DOT_IMPORT_CHECKPOINT', path)
+    return path
+
+
+def imported_names():
+    return session.scalars(select(Credential.name).order_by(Credential.id)).all()
+
+
+def passwords(vault_key):
+    return {
+        mnemonic.name: mnemonic.credential.decrypt_fields(vault_key, ['password'])['password']
+        for mnemonic in session.query(Mnemonic)
+    }
+
+
+def test_import(tmp_path, vault_key, checkpoint_file):
+    path = write_export(tmp_path / 'export.jsonl', [entry(i) for i in range(7)])
+    import_credentials_from_json(path, vault_key, 'jsonl', batch_size=3)
+
+    assert imported_names() == [f'Site {i}' for i in range(7)]
+    assert passwords(vault_key) == {f'site{i}': f'pass{i}' for i in range(7)}
+    assert not checkpoint_file.exists()
+
+
+def test_taken_mnemonics_are_skipped(tmp_path, vault_key, add_credential):
+    add_credential('Existing', ['site1'])
+    path = write_export(tmp_path / 'export.jsonl', [entry(0), entry(1), entry(2), entry(2)])
+    import_credentials_from_json(path, vault_key, 'jsonl')
+
+    assert imported_names() == ['Existing', 'Site 0', 'Site 2']
+
+
+def test_interrupted_import_resumes_from_the_checkpoint(tmp_path, vault_key, monkeypatch):
+    path = write_export(tmp_path / 'export.jsonl', [entry(i) for i in range(7)])
+
+    insert_batch = import_credentials._insert_batch
+    batches = []
+
+    def crash_on_second_batch(prepared):
+        batches.append(prepared)
+        if len(batches) == 2:
+            raise KeyboardInterrupt
+        insert_batch(prepared)
+
+    monkeypatch.setattr(import_credentials, '_insert_batch', crash_on_second_batch)
+    with pytest.raises(KeyboardInterrupt):
+        import_credentials_from_json(path, vault_key, 'jsonl', batch_size=3)
+    session.rollback()
+    assert imported_names() == ['Site 0', 'Site 1', 'Site 2']
+    assert load_checkpoint(path)['imported'] == 3
+
+    monkeypatch.setattr(import_credentials, '_insert_batch', insert_batch)
+    import_credentials_from_json(path, vault_key, 'jsonl', resume=True, batch_size=3)
+    assert imported_names() == [f'Site {i}' for i in range(7)]
+    assert load_checkpoint(path) is None
+
+
+def test_malformed_credential_keeps_a_checkpoint_which_survives_the_fix(tmp_path, vault_key):
+    entries = [entry(i) for i in range(5)]
+    path = write_export(tmp_path / 'export.jsonl', entries)
+    good = path.read_text()
+    lines = good.splitlines(keepends=True)
+    lines[4] = '{"name": "Site 3", "mnemonics": \n'
+    path.write_text(''.join(lines))
+
+    import_credentials_from_json(path, vault_key, 'jsonl', batch_size=2)
+    assert imported_names() == ['Site 0', 'Site 1', 'Site 2']
+    checkpoint = load_checkpoint(path)
+    assert checkpoint['imported'] == 3
+    assert checkpoint['offset'] == len(''.join(lines[:4]).encode())
+
+    # Correcting the file does not change the part already imported
+    path.write_text(good)
+    import_credentials_from_json(path, vault_key, 'jsonl', resume=True, batch_size=2)
+    assert imported_names() == [f'Site {i}' for i in range(5)]
+
+
+def test_checkpoint_of_a_changed_file_is_ignored(tmp_path, vault_key):
+    path = write_export(tmp_path / 'export.jsonl', [entry(i) for i in range(3)] + [[1]])
+    import_credentials_from_json(path, vault_key, 'jsonl')
+    assert load_checkpoint(path) is not None
+
+    # The imported part changed: the checkpoint does not belong to this file anymore
+    write_export(path, [entry(i) for i in range(10, 14)])
+    assert load_checkpoint(path) is None
+
+
+def test_malformed_header_imports_nothing(tmp_path, vault_key, checkpoint_file):
+    path = tmp_path / 'export.jsonl'
+    path.write_text('[1]\n' + json.dumps(entry(0)) + '\n')
+    import_credentials_from_json(path, vault_key, 'jsonl')
+
+    assert imported_names() == []
+    assert not checkpoint_file.exists()
+
+
+@pytest.mark.parametrize('bad', [
+    {'mnemonics': 'bad'},                                  # no name
+    {'name': '', 'mnemonics': 'bad'},
+    {'name': 'Bad', 'mnemonics': 'bad', 'password': 123},  # not a string
+    {'name': 'Bad', 'mnemonics': ['bad']},
+])
+def test_invalid_entry_fails_alone(tmp_path, vault_key, report, checkpoint_file, bad):
+    entries = [entry(0), entry(1), bad, entry(3), entry(4)]
+    path = write_export(tmp_path / 'export.jsonl', entries)
+    import_credentials_from_json(path, vault_key, 'jsonl')
+
+    assert imported_names() == ['Site 0', 'Site 1', 'Site 3', 'Site 4']
+    assert report['imported'] == 4 and len(report['failed']) == 1
+    assert not checkpoint_file.exists()
+
+
+def test_entry_which_cannot_be_decrypted_fails_alone(tmp_path, vault_key, report, monkeypatch):
+    file_key = derive_vault_key('file password')
+
+    def encrypted_entry(i, password=None):
+        credential_key = generate_fernet_key()
+        return {
+            'name': f'Site {i}', 'mnemonics': f'site{i}',
+            'encrypted_key': encrypt(credential_key, file_key).decode(),
+            'password': password or encrypt(f'pass{i}', credential_key).decode(),
+        }
+
+    entries = [encrypted_entry(0), encrypted_entry(1, password='not a token'), encrypted_entry(2)]
+    entries[2]['encrypted_key'] = encrypt(generate_fernet_key(), generate_fernet_key()).decode()
+    entries.append(encrypted_entry(3))
+    metadata = {'file_encrypted': True, 'file_key_hash': sha256_hash(file_key)}
+    path = write_export(tmp_path / 'export.jsonl', entries, metadata)
+
+    monkeypatch.setattr(import_credentials.click, 'prompt', lambda *args, **kwargs: 'file password')
+    import_credentials_from_json(path, vault_key, 'jsonl')
+
+    assert imported_names() == ['Site 0', 'Site 3']
+    assert passwords(vault_key) == {'site0': 'pass0', 'site3': 'pass3'}
+    assert [name for name, _ in report['failed']] == ['Site 1', 'Site 2']
+
+
+def test_rows_refused_by_the_database_fail_alone(tmp_path, vault_key, report, checkpoint_file, monkeypatch):
+    # Without the check, an entry without a name reaches the NOT NULL constraint
+    monkeypatch.setattr(import_credentials, 'entry_error', lambda data, file_encrypted: None)
+    bad = {'mnemonics': 'shared'}
+    reuse = dict(entry(3), mnemonics='shared')
+    path = write_export(tmp_path / 'export.jsonl', [entry(0), bad, entry(2), reuse])
+    import_credentials_from_json(path, vault_key, 'jsonl', batch_size=2)
+
+    # The rest of the batch is kept, and the mnemonic of the failed row is free again
+    assert imported_names() == ['Site 0', 'Site 2', 'Site 3']
+    assert passwords(vault_key) == {'site0': 'pass0', 'site2': 'pass2', 'shared': 'pass3'}
+    assert report['imported'] == 3 and len(report['failed']) == 1 and report['skipped'] == []
+    assert not checkpoint_file.exists()
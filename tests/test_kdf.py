@@ -0,0 +1,85 @@
+# tests/test_kdf.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import base64
+
+import pytest
+from cryptography.fernet import Fernet
+
+from vaultsafe.db.models import Vault
+from vaultsafe.utils.crypto_utils import derive_vault_key
+from vaultsafe.utils import kdf_utils
+from vaultsafe.utils.kdf_utils import derive_key, generate_salt, available_kdfs, dump_params, load_params, calibrate, MAX_COSTS
+
+from tests.conftest import MASTER_PASSWORD, TEST_KDF, TEST_KDF_PARAMS
+
+CHEAP_PARAMS = {
+    'pbkdf2-sha256': {'iterations': 1000},
+    'scrypt': {'n': 2 ** 10, 'r': 8, 'p': 1},
+    'argon2id': {'time_cost': 1, 'memory_cost': 1024, 'parallelism': 1},
+}
+
+
+@pytest.mark.parametrize('algorithm', available_kdfs())
+def test_derive_key(algorithm):
+    salt = generate_salt()
+    key = derive_key('password', algorithm, CHEAP_PARAMS[algorithm], salt)
+
+    assert len(base64.urlsafe_b64decode(key)) == 32
+    Fernet(key)  # usable as a Fernet key
+    assert derive_key('password', algorithm, CHEAP_PARAMS[algorithm], salt) == key
+    assert derive_key('Password', algorithm, CHEAP_PARAMS[algorithm], salt) != key
+    assert derive_key('password', algorithm, CHEAP_PARAMS[algorithm], generate_salt()) != key
+
+
+def test_parameters_change_the_key():
+    salt = generate_salt()
+    assert derive_key('password', 'pbkdf2-sha256', {'iterations': 1000}, salt) != \
+        derive_key('password', 'pbkdf2-sha256', {'iterations': 1001}, salt)
+
+
+def test_unknown_kdf():
+    with pytest.raises(ValueError, match='bcrypt'):
+        derive_key('password', 'bcrypt', {}, generate_salt())
+
+
+def test_params_round_trip():
+    params = {'n': 2 ** 15, 'r': 8, 'p': 1}
+    assert load_params(dump_params(params)) == params
+    assert dump_params(params) == dump_params(dict(reversed(params.items())))
+
+
+def test_vault_derive_key(vault, vault_key):
+    assert vault.kdf_algorithm == TEST_KDF
+    assert vault_key == derive_key(MASTER_PASSWORD, TEST_KDF, TEST_KDF_PARAMS, vault.kdf_salt)
+    assert vault.derive_key('wrong password') != vault_key
+
+
+def test_set_kdf_changes_the_salt(vault, vault_key):
+    vault.set_kdf(TEST_KDF, TEST_KDF_PARAMS)
+    assert vault.derive_key(MASTER_PASSWORD) != vault_key
+
+
+def test_legacy_vault_derive_key():
+    # Vaults made before the KDF columns: PBKDF2 with the fixed salt
+    vault = Vault(kdf_algorithm=None)
+    key = vault.derive_key(MASTER_PASSWORD)
+    assert key == derive_vault_key(MASTER_PASSWORD)
+    assert key != derive_vault_key('another password')
+
+
+def test_calibrate(monkeypatch):
+    # One millisecond per 1000 iterations
+    monkeypatch.setattr(kdf_utils, 'time_kdf', lambda algorithm, params: params['iterations'] / 1e6)
+    params, elapsed, capped = calibrate('pbkdf2-sha256', 0.5)
+    assert params == {'iterations': 500_000} and elapsed == 0.5 and not capped
+
+
+def test_calibrate_stops_at_the_largest_scrypt_cost(monkeypatch):
+    # A machine on which scrypt is always fast
+    measured = []
+    monkeypatch.setattr(kdf_utils, 'time_kdf', lambda algorithm, params: measured.append(params['n']) or 0.001)
+    params, elapsed, capped = calibrate('scrypt', 10)
+    assert capped and params['n'] == MAX_COSTS['n'] == max(measured)
+    assert (params['r'], params['p']) == (8, 1)
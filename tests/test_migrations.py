@@ -0,0 +1,116 @@
+# tests/test_migrations.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from vaultsafe.db import models
+from vaultsafe.db.models import Vault, Credential, session
+from vaultsafe.db.migrations import upgrade, get_schema_version, LATEST_VERSION, MIGRATIONS
+from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, generate_fernet_key, sha256_hash
+from vaultsafe.utils.search_utils import search_credentials
+
+# The schema of the first release, before any migration
+BASELINE_SCHEMA = [
+    "CREATE TABLE vault ("
+    "id INTEGER NOT NULL PRIMARY KEY, uuid VARCHAR, name VARCHAR, "
+    "vault_key_hash VARCHAR NOT NULL, master_password_hash VARCHAR NOT NULL, "
+    "date_created DATETIME, last_updated DATETIME, owner_name VARCHAR, owner_email VARCHAR, "
+    "password_salt VARCHAR NOT NULL, session_check BOOLEAN NOT NULL, session_secret_key VARCHAR NOT NULL, "
+    "session_salt VARCHAR NOT NULL, session_expiration INTEGER NOT NULL)",
+    "CREATE TABLE credential ("
+    "id INTEGER NOT NULL PRIMARY KEY, uuid VARCHAR, name VARCHAR NOT NULL, url VARCHAR, username VARCHAR, "
+    "password VARCHAR, recovery_key VARCHAR, primary_email VARCHAR, secondary_email VARCHAR, token VARCHAR, "
+    "notes TEXT, date_created DATETIME, last_updated DATETIME, encrypted_key VARCHAR NOT NULL, "
+    "encryption_algorithm VARCHAR)",
+    "CREATE TABLE mnemonic ("
+    "id INTEGER NOT NULL PRIMARY KEY, name VARCHAR NOT NULL UNIQUE, "
+    "credential_id INTEGER REFERENCES credential (id))",
+]
+
+MASTER_PASSWORD = 'legacy master password'
+
+
+@pytest.fixture
+def baseline_engine(tmp_path, monkeypatch):
+    """A vault made by the first release: legacy key derivation, no search index."""
+    session.remove()
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    vault_key = derive_vault_key(MASTER_PASSWORD)
+    credential_key = generate_fernet_key()
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.exec_driver_sql(statement)
+        conn.exec_driver_sql(
+            "INSERT INTO vault (id, vault_key_hash, master_password_hash, password_salt, session_check, "
+            "session_secret_key, session_salt, session_expiration) VALUES (1, ?, ?, 'salt', 1, 'secret', 'ssalt', 10800)",
+            (sha256_hash(vault_key), sha256_hash(MASTER_PASSWORD + 'salt'))
+        )
+        # Two rows with the same uuid: the unique index of migration 3 needs a new one
+        for id in (1, 2):
+            conn.exec_driver_sql(
+                "INSERT INTO credential (id, uuid, name, password, encrypted_key, date_created, last_updated) "
+                "VALUES (?, 'same-uuid', ?, ?, ?, '2024-06-13 10:00:00', '2024-06-13 10:00:00')",
+                (id, f'Legacy {id}', encrypt(f'password {id}', credential_key).decode(),
+                 encrypt(credential_key, vault_key).decode())
+            )
+            conn.exec_driver_sql("INSERT INTO mnemonic (name, credential_id) VALUES (?, ?)", (f'legacy{id}', id))
+    monkeypatch.setattr(models, '_engine', engine)
+    yield engine
+    session.remove()
+    engine.dispose()
+
+
+def columns(engine, table):
+    return {column['name'] for column in inspect(engine).get_columns(table)}
+
+
+def test_upgrade_of_a_baseline_database(baseline_engine):
+    assert upgrade(baseline_engine) == [version for version, _, _ in MIGRATIONS]
+    with baseline_engine.connect() as conn:
+        assert get_schema_version(conn) == LATEST_VERSION
+
+    tables = set(inspect(baseline_engine).get_table_names())
+    assert {'search_token', 'next_search_token', 'schema_version'} <= tables
+    assert {'kdf_algorithm', 'kdf_params', 'kdf_salt', 'key_version', 'rotation_state'} <= columns(baseline_engine, 'vault')
+    assert {'key_version', 'next_encrypted_key'} <= columns(baseline_engine, 'credential')
+    indexes = {index['name'] for index in inspect(baseline_engine).get_indexes('credential')}
+    assert {'ix_credential_uuid', 'ix_credential_name'} <= indexes
+
+    uuids = [uuid for uuid, in session.query(Credential.uuid)]
+    assert len(set(uuids)) == 2 and 'same-uuid' in uuids
+
+    # Nothing left to do
+    assert upgrade(baseline_engine) == []
+
+
+def test_migrations_are_idempotent(baseline_engine):
+    upgrade(baseline_engine)
+    with baseline_engine.begin() as conn:
+        for _, _, migration in MIGRATIONS:
+            migration(conn)
+
+
+def test_database_created_from_the_models_is_upgraded(engine):
+    # `engine` is made by `create_all()`, then upgraded
+    with engine.connect() as conn:
+        assert get_schema_version(conn) == LATEST_VERSION
+
+
+def test_legacy_vault_still_works_after_the_upgrade(baseline_engine):
+    upgrade(baseline_engine)
+    vault = session.query(Vault).first()
+    assert vault.kdf_algorithm is None and vault.key_version == 1
+    assert vault.check_password(MASTER_PASSWORD)
+
+    vault_key = vault.derive_key(MASTER_PASSWORD)
+    assert vault_key == derive_vault_key(MASTER_PASSWORD)
+    assert sha256_hash(vault_key) == vault.vault_key_hash
+
+    credential = session.query(Credential).filter_by(name='Legacy 2').one()
+    assert credential.key_version == 1
+    assert credential.decrypt_fields(vault_key, ['password', 'token']) == {'password': 'password 2', 'token': None}
+
+    # The search index is built on first use
+    assert [credential.name for credential in search_credentials('legacy', vault_key)] == ['Legacy 1', 'Legacy 2']
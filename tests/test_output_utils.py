@@ -0,0 +1,70 @@
+# tests/test_output_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from vaultsafe.utils import output_utils
+from vaultsafe.utils.output_utils import format_record, set_mode, get_mode, detect_mode, emit, records_to_stdout
+
+RECORD = {
+    'name': 'Café ☕',
+    'mnemonics': ['gh', 'github'],
+    'notes': 'tab\there\nnew line \\ backslash',
+    'token': None,
+    'date_created': datetime(2024, 6, 13, 10, 30),
+}
+
+
+def test_format_record_json():
+    line = format_record(RECORD, 'json')
+    assert '\n' not in line
+    assert 'Café ☕' in line  # not escaped
+    assert json.loads(line) == dict(RECORD, date_created='2024-06-13 10:30:00')
+
+
+def test_format_record_plain():
+    line = format_record(RECORD, 'plain')
+    assert line.split('\t') == [
+        'Café ☕', 'gh,github', 'tab\\there\\nnew line \\\\ backslash', '-', '2024-06-13 10:30:00'
+    ]
+
+
+def test_format_record_uses_the_mode():
+    set_mode('plain')
+    assert format_record({'a': 1, 'b': None}) == '1\t-'
+    set_mode('rich')
+    assert format_record({'a': 1, 'b': None}) == '{"a": 1, "b": null}'
+
+
+def test_set_mode():
+    set_mode('json')
+    assert get_mode() == 'json' and not output_utils.is_rich()
+    with pytest.raises(ValueError):
+        set_mode('yaml')
+    assert get_mode() == 'json'
+
+
+def test_detect_mode(monkeypatch):
+    monkeypatch.delenv('VAULTSAFE_OUTPUT', raising=False)
+    assert detect_mode(io.StringIO()) == 'json'
+
+    monkeypatch.setenv('VAULTSAFE_OUTPUT', 'Plain')
+    assert detect_mode(io.StringIO()) == 'plain'
+    monkeypatch.setenv('VAULTSAFE_OUTPUT', 'yaml')
+    with pytest.raises(ValueError):
+        detect_mode()
+
+
+def test_emit_writes_to_the_real_stdout(capsys):
+    set_mode('json')
+    with records_to_stdout():
+        print('a message')
+        emit({'name': 'GitHub'})
+    captured = capsys.readouterr()
+    assert captured.out == '{"name": "GitHub"}\n'
+    assert captured.err == 'a message\n'
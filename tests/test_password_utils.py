@@ -0,0 +1,137 @@
+# tests/test_password_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import io
+import math
+from collections import Counter
+from itertools import product
+
+import pytest
+
+from vaultsafe.utils import password_utils
+from vaultsafe.utils.password_utils import (
+    CHARACTER_CLASSES, _sampling_table, random_chars, random_indices, password_alphabet,
+    password_entropy, password_length_for_entropy, generate_password_chunks,
+    passphrase_entropy, passphrase_words_for_entropy, generate_passphrase_chunks, load_wordlist, write_chunks
+)
+
+
+@pytest.mark.parametrize('alphabet', [b'ab', b'abc', password_alphabet().encode(), bytes(range(256))])
+def test_sampling_table_is_uniform(alphabet):
+    table, rejected, kept = _sampling_table(alphabet)
+    assert len(table) == 256
+    accepted = [table[byte] for byte in range(256) if byte not in rejected]
+    counts = Counter(accepted)
+    assert set(counts) == set(alphabet)
+    assert len(set(counts.values())) == 1
+    assert kept == len(accepted) / 256
+
+
+@pytest.mark.parametrize('alphabet', [b'', b'a'])
+def test_sampling_table_needs_two_characters(alphabet):
+    with pytest.raises(ValueError):
+        _sampling_table(alphabet)
+
+
+def test_random_chars_rejects_the_biased_bytes(monkeypatch):
+    # For 'abc' the byte 255 would favour 'a' (255 % 3 == 0): it is dropped
+    monkeypatch.setattr(password_utils.os, 'urandom', lambda n: bytes([255, 0, 1, 2, 255, 4] * n)[:n])
+    assert random_chars(b'abc', 8) == b'abcbabcb'
+
+
+def test_random_chars():
+    alphabet = password_alphabet().encode()
+    chars = random_chars(alphabet, 10000)
+    assert len(chars) == 10000
+    assert set(chars) <= set(alphabet)
+    # Every character shows up: 10000 draws from 68
+    assert set(chars) == set(alphabet)
+
+
+def test_random_indices():
+    indices = random_indices(5000, 7)
+    assert len(indices) == 5000
+    assert set(indices) == set(range(7))
+    assert random_indices(3, 1) == [0, 0, 0]
+
+
+def test_password_alphabet():
+    assert password_alphabet(['digits', 'symbols', 'digits']) == '0123456789@#$-%&'
+    with pytest.raises(ValueError):
+        password_alphabet(['emoji'])
+    with pytest.raises(ValueError):
+        password_alphabet([])
+
+
+def test_password_entropy():
+    assert password_entropy(10, ['digits']) == pytest.approx(10 * math.log2(10))
+    assert password_entropy(18) == pytest.approx(18 * math.log2(68))
+    # 16**2 passwords, less the 10**2 without a symbol and the 6**2 without a digit
+    assert password_entropy(2, ['digits', 'symbols'], require_each=True) == pytest.approx(math.log2(120))
+    assert password_entropy(1, ['digits', 'symbols'], require_each=True) == 0.0
+
+
+@pytest.mark.parametrize('classes, length', [(('digits', 'symbols'), 3), (('lower', 'digits', 'symbols'), 3)])
+def test_require_each_entropy_counts_the_possible_passwords(classes, length):
+    alphabet = password_alphabet(classes)
+    possible = sum(
+        all(any(char in CHARACTER_CLASSES[name] for char in password) for name in classes)
+        for password in product(alphabet, repeat=length)
+    )
+    assert password_entropy(length, classes, require_each=True) == pytest.approx(math.log2(possible))
+
+
+def test_password_length_for_entropy():
+    assert password_length_for_entropy(33, ['digits']) == 10
+    assert password_length_for_entropy(100) == math.ceil(100 / math.log2(68))
+    length = password_length_for_entropy(20, ['digits', 'symbols'], require_each=True)
+    assert password_entropy(length, ['digits', 'symbols'], require_each=True) >= 20
+    assert password_entropy(length - 1, ['digits', 'symbols'], require_each=True) < 20
+
+
+def test_generate_passwords():
+    chunks = list(generate_password_chunks(25, length=12, classes=['lower', 'digits'], chunk_size=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    alphabet = set(password_alphabet(['lower', 'digits']).encode())
+    for password in sum(chunks, []):
+        assert len(password) == 12 and set(password) <= alphabet
+
+
+def test_generate_passwords_with_each_class():
+    passwords = sum(generate_password_chunks(500, length=4, require_each=True, chunk_size=64), [])
+    assert len(passwords) == 500
+    for password in passwords:
+        for chars in CHARACTER_CLASSES.values():
+            assert set(password) & set(chars.encode())
+
+
+@pytest.mark.parametrize('kwargs', [{'length': 0}, {'length': 3, 'require_each': True}, {'classes': ['emoji']}])
+def test_generate_passwords_checks_its_arguments(kwargs):
+    with pytest.raises(ValueError):
+        generate_password_chunks(1, **kwargs)
+
+
+def test_passphrase_entropy():
+    wordlist = ('alpha', 'beta', 'gamma', 'delta')
+    assert passphrase_entropy(5, wordlist) == 10
+    assert passphrase_words_for_entropy(10, wordlist) == 5
+    assert passphrase_words_for_entropy(11, wordlist) == 6
+    assert passphrase_entropy(6) == pytest.approx(6 * math.log2(len(load_wordlist())))
+
+
+def test_generate_passphrases():
+    wordlist = ('alpha', 'beta', 'gamma', 'délta')
+    chunks = list(generate_passphrase_chunks(7, words=3, wordlist=wordlist, separator=' ', chunk_size=4))
+    assert [len(chunk) for chunk in chunks] == [4, 3]
+    for passphrase in sum(chunks, []):
+        words = passphrase.decode().split(' ')
+        assert len(words) == 3 and set(words) <= set(wordlist)
+    with pytest.raises(ValueError):
+        generate_passphrase_chunks(1, words=0)
+
+
+def test_write_chunks():
+    f = io.BytesIO()
+    assert write_chunks([[b'a', b'b'], [], [b'c']], f) == 3
+    assert f.getvalue() == b'a\nb\nc\n'
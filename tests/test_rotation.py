@@ -0,0 +1,127 @@
+# tests/test_rotation.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import pytest
+
+from vaultsafe.db.models import session, Vault, Credential, NextSearchToken
+from vaultsafe.utils.crypto_utils import encrypt, sha256_hash, derive_vault_key
+from vaultsafe.utils.rotation_utils import (
+    start_rotation, rewrap_pending, finish_rotation, rotate, abort_rotation, pending_count
+)
+from vaultsafe.utils.search_utils import search_credentials, index_credential
+
+from tests.conftest import MASTER_PASSWORD, TEST_KDF, TEST_KDF_PARAMS
+
+NEW_PASSWORD = 'new master password'
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def credentials(add_credential):
+    return [add_credential(f'Site {i}', [f'site{i}'], username=f'user{i}', password=f'pass{i}') for i in range(5)]
+
+
+def passwords(vault_key):
+    return {
+        credential.name: credential.decrypt_fields(vault_key, ['password'])['password']
+        for credential in session.query(Credential).order_by(Credential.id)
+    }
+
+
+def names(results):
+    return [credential.name for credential in results]
+
+
+def test_rotation(vault, vault_key, credentials):
+    new_key = start_rotation(vault, NEW_PASSWORD, TEST_KDF, TEST_KDF_PARAMS)
+    assert vault.rotation_key(NEW_PASSWORD) == new_key
+    assert vault.rotation_key(MASTER_PASSWORD) is None
+
+    assert rotate(vault, vault_key, new_key, workers=1, chunk_size=2) == 5
+    assert vault.rotation_state is None and vault.key_version == 2
+    assert vault.check_password(NEW_PASSWORD)
+    assert vault.derive_key(NEW_PASSWORD) == new_key
+    assert vault.vault_key_hash == sha256_hash(new_key)
+
+    assert passwords(new_key) == {f'Site {i}': f'pass{i}' for i in range(5)}
+    assert {credential.key_version for credential in session.query(Credential)} == {2}
+    assert names(search_credentials('user3', new_key)) == ['Site 3']
+    assert session.query(NextSearchToken).count() == 0
+
+
+def test_interrupted_rotation_resumes(vault, vault_key, credentials):
+    new_key = start_rotation(vault, NEW_PASSWORD, TEST_KDF, TEST_KDF_PARAMS)
+
+    def crash_after_first_chunk(size):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        rewrap_pending(vault_key, new_key, workers=1, chunk_size=2, progress=crash_after_first_chunk)
+    session.rollback()
+
+    # The committed chunk is kept; the vault still opens with the old password
+    assert pending_count() == 3
+    assert vault.derive_key(MASTER_PASSWORD) == vault_key
+    assert passwords(vault_key)['Site 0'] == 'pass0'
+    assert names(search_credentials('user1', vault_key)) == ['Site 1']
+
+    # A new session, as after a crash: the rotation is found in the vault
+    session.remove()
+    vault = session.query(Vault).first()
+    new_key = vault.rotation_key(NEW_PASSWORD)
+    assert rotate(vault, vault_key, new_key, workers=1, chunk_size=2) == 3
+
+    assert passwords(new_key) == {f'Site {i}': f'pass{i}' for i in range(5)}
+    assert names(search_credentials('user1', new_key)) == ['Site 1']
+    assert names(search_credentials('user4', new_key)) == ['Site 4']
+
+
+def test_credential_edited_during_the_rotation_is_redone(vault, vault_key, credentials):
+    new_key = start_rotation(vault, NEW_PASSWORD, TEST_KDF, TEST_KDF_PARAMS)
+    rewrap_pending(vault_key, new_key, workers=1)
+    assert pending_count() == 0
+
+    credential = session.get(Credential, credentials[2].id)
+    credential.username = encrypt('renamed', credential.get_decrypted_key(vault_key))
+    index_credential(credential, vault_key)
+    session.commit()
+    assert pending_count() == 1
+
+    finish_rotation(vault, vault_key, new_key)
+    assert names(search_credentials('renamed', new_key)) == ['Site 2']
+    assert names(search_credentials('user2', new_key)) == []
+
+
+def test_abort_rotation(vault, vault_key, credentials):
+    new_key = start_rotation(vault, NEW_PASSWORD, TEST_KDF, TEST_KDF_PARAMS)
+    rewrap_pending(vault_key, new_key, workers=1, chunk_size=2)
+
+    abort_rotation(vault)
+    assert vault.rotation_state is None and vault.key_version == 1
+    assert pending_count() == 5
+    assert session.query(NextSearchToken).count() == 0
+    assert vault.check_password(MASTER_PASSWORD)
+    assert passwords(vault_key) == {f'Site {i}': f'pass{i}' for i in range(5)}
+    assert names(search_credentials('user0', vault_key)) == ['Site 0']
+
+
+def test_rotation_of_a_legacy_vault(vault, vault_key, credentials):
+    # Turn the vault into one made before the KDF columns
+    legacy_key = derive_vault_key(MASTER_PASSWORD)
+    vault.kdf_algorithm = vault.kdf_params = vault.kdf_salt = None
+    vault.set_vault_key_hash(vault_key=legacy_key)
+    for credential in session.query(Credential):
+        credential.encrypted_key = encrypt(credential.get_decrypted_key(vault_key), legacy_key)
+        index_credential(credential, legacy_key)
+    session.commit()
+    assert vault.derive_key(MASTER_PASSWORD) == legacy_key
+
+    new_key = start_rotation(vault, NEW_PASSWORD, TEST_KDF, TEST_KDF_PARAMS)
+    rotate(vault, legacy_key, new_key, workers=1)
+    assert vault.kdf_algorithm == TEST_KDF and vault.kdf_salt is not None
+    assert vault.derive_key(NEW_PASSWORD) == new_key
+    assert passwords(new_key) == {f'Site {i}': f'pass{i}' for i in range(5)}
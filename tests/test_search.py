@@ -0,0 +1,94 @@
+# tests/test_search.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import pytest
+
+from vaultsafe.db.models import session, Vault, Credential, SearchToken
+from vaultsafe.utils import search_utils
+from vaultsafe.utils.search_utils import search_credentials, extract_terms, ensure_search_index, INDEXED_MARKER
+
+
+@pytest.fixture
+def credentials(add_credential):
+    add_credential('GitHub', ['gh'], username='octocat@example.com', notes='work account')
+    add_credential('Gmail', ['mail'], username='me@gmail.com', notes='personal')
+    add_credential('Bank', ['bank'], notes='abc bcd')
+    add_credential('@@', ['--'])
+
+
+def names(results):
+    return [credential.name for credential in results]
+
+
+def test_extract_terms():
+    assert extract_terms('Hello, Wo') == {'hello', 'hel', 'ell', 'llo', 'wo'}
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('github', ['GitHub']),
+    ('GITHUB', ['GitHub']),
+    ('octocat', ['GitHub']),         # username
+    ('work acc', ['GitHub']),        # notes, several words
+    ('gmail', ['Gmail']),            # name and username
+    ('mai', ['Gmail']),              # a trigram
+    ('gh', ['GitHub']),              # a mnemonic, shorter than a trigram
+    ('oc', ['GitHub']),              # shorter than a trigram, inside a word
+    ('me', ['Gmail']),
+    ('example.com', ['GitHub']),
+    ('nothing', []),
+])
+def test_search(credentials, vault_key, query, expected):
+    assert names(search_credentials(query, vault_key)) == expected
+
+
+def test_trigram_false_positives_are_dropped(credentials, vault_key):
+    # 'abc bcd' has both trigrams of 'abcd', but not 'abcd'
+    assert names(search_credentials('abcd', vault_key)) == []
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('@', ['GitHub', 'Gmail', '@@']),
+    ('-', ['@@']),
+    ('%', []),
+    ('_', []),
+])
+def test_query_without_words_decrypts_every_credential(credentials, vault_key, query, expected):
+    assert names(search_credentials(query, vault_key)) == expected
+
+
+def test_the_index_holds_no_plaintext(credentials, vault_key):
+    tokens = {token for token, in session.query(SearchToken.token)}
+    assert not tokens & extract_terms('GitHub octocat example work account')
+
+
+def test_unindexed_credentials_are_indexed_once(credentials, vault_key, monkeypatch):
+    session.query(SearchToken).delete()
+    # As set by the migration of a vault made before the index
+    session.query(Vault).update({'search_index_pending': True})
+    session.commit()
+
+    indexed = []
+    index_credential = search_utils.index_credential
+    monkeypatch.setattr(search_utils, 'index_credential', lambda credential, *args: (
+        indexed.append(credential.name), index_credential(credential, *args)
+    ))
+
+    assert names(search_credentials('github', vault_key)) == ['GitHub']
+    assert sorted(indexed) == sorted(['GitHub', 'Gmail', 'Bank', '@@'])
+
+    # '@@' has no terms, only the marker: it is not taken for unindexed again
+    ensure_search_index(vault_key)
+    search_credentials('bank', vault_key)
+    assert len(indexed) == 4
+    credential = session.query(Credential).filter_by(name='@@').one()
+    assert [token.token for token in credential.search_tokens] == [INDEXED_MARKER]
+    assert not session.query(Vault.search_index_pending).scalar()
+
+
+def test_indexed_vault_is_not_scanned_for_unindexed_credentials(credentials, vault_key, monkeypatch):
+    # Unless a migration set the flag, a search does not look for them
+    monkeypatch.setattr(search_utils, 'index_credential', lambda *args: pytest.fail('Indexed again.'))
+    session.query(SearchToken).filter(SearchToken.token != INDEXED_MARKER).delete()
+    session.commit()
+    assert names(search_credentials('github', vault_key)) == []
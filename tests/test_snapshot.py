@@ -0,0 +1,110 @@
+# tests/test_snapshot.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import os
+import stat
+
+import pytest
+
+from vaultsafe.utils.snapshot_utils import write_snapshot, Snapshot, SnapshotError, SNAPSHOT_HEADER, SNAPSHOT_VERSION
+
+from tests.conftest import MASTER_PASSWORD
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, add_credential):
+    add_credential('GitHub', ['gh', 'github'], username='octocat', password='p@ss', notes='multi\nline')
+    add_credential('Café ☕', ['café'], password='naïve')
+    add_credential('Empty')
+    # More credentials than a chunk
+    for i in range(5):
+        add_credential(f'Site {i}', [f'site{i}'], password=f'pass{i}')
+    path = tmp_path / 'vault.snapshot'
+    assert write_snapshot(path, chunk_size=2) == (8, 8)
+    return path
+
+
+def test_round_trip(snapshot_path, vault, vault_key):
+    with Snapshot(snapshot_path) as snapshot:
+        assert len(snapshot) == 8
+        assert list(snapshot.mnemonics()) == sorted(
+            ['gh', 'github', 'café'] + [f'site{i}' for i in range(5)], key=str.encode
+        )
+        assert snapshot.metadata['vault_name'] == vault.name
+        assert snapshot.check_key(vault_key)
+        assert snapshot.derive_key(MASTER_PASSWORD) == vault_key
+
+        record = snapshot.get('github')
+        assert record.name == 'GitHub'
+        assert record.uuid == snapshot.get('gh').uuid
+        assert record.decrypt_fields(vault_key, ['username', 'password', 'notes', 'token']) == {
+            'username': 'octocat', 'password': 'p@ss', 'notes': 'multi\nline', 'token': None
+        }
+        assert snapshot.get('café').decrypt_fields(vault_key, ['password']) == {'password': 'naïve'}
+        for i in range(5):
+            assert snapshot.get(f'site{i}').decrypt_fields(vault_key, ['password']) == {'password': f'pass{i}'}
+
+
+@pytest.mark.parametrize('mnemonic', ['', 'a', 'gi', 'zzz', 'Empty'])
+def test_missing_mnemonic(snapshot_path, mnemonic):
+    with Snapshot(snapshot_path) as snapshot:
+        assert snapshot.get(mnemonic) is None
+
+
+def test_wrong_key(snapshot_path):
+    with Snapshot(snapshot_path) as snapshot:
+        assert not snapshot.check_key(snapshot.derive_key('wrong password'))
+
+
+def test_snapshot_is_private_and_replaced_atomically(snapshot_path):
+    assert stat.S_IMODE(os.stat(snapshot_path).st_mode) == 0o600
+    assert not os.path.exists(f"{snapshot_path}.tmp")
+
+
+def test_empty_vault(tmp_path, vault):
+    path = tmp_path / 'empty.snapshot'
+    assert write_snapshot(path) == (0, 0)
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 0
+        assert snapshot.get('gh') is None
+
+
+def test_long_mnemonic(tmp_path, vault, add_credential):
+    # Longer than a 16-bit length
+    mnemonic = 'm' * 70000
+    add_credential('Long', [mnemonic, 'short'])
+    path = tmp_path / 'long.snapshot'
+    write_snapshot(path)
+    with Snapshot(path) as snapshot:
+        assert list(snapshot.mnemonics()) == [mnemonic, 'short']
+        assert snapshot.get(mnemonic).name == 'Long'
+
+
+def test_version_1_is_read(snapshot_path):
+    # Only the index entries changed, in a way that reads the same
+    content = bytearray(snapshot_path.read_bytes())
+    content[8:10] = (1).to_bytes(2, 'little')
+    snapshot_path.write_bytes(content)
+    with Snapshot(snapshot_path) as snapshot:
+        assert snapshot.get('github').name == 'GitHub'
+
+
+def test_no_vault(tmp_path, engine):
+    path = tmp_path / 'vault.snapshot'
+    with pytest.raises(SnapshotError, match='no vault'):
+        write_snapshot(path)
+    assert not path.exists()
+
+
+@pytest.mark.parametrize('content', [
+    b'',
+    b'VSSNAPSH',
+    bytes(SNAPSHOT_HEADER.size),
+    SNAPSHOT_HEADER.pack(b'VSSNAPSH', SNAPSHOT_VERSION + 1, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+])
+def test_not_a_snapshot(tmp_path, content):
+    path = tmp_path / 'bad.snapshot'
+    path.write_bytes(content)
+    with pytest.raises(SnapshotError):
+        Snapshot(path)
@@ -0,0 +1,119 @@
+# tests/test_stream_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import io
+import json
+
+import pytest
+
+from vaultsafe.utils import stream_utils
+from vaultsafe.utils.stream_utils import (
+    read_json_metadata, iter_json_credentials, read_jsonl_metadata, iter_jsonl_credentials, ExportFormatError
+)
+
+METADATA = {'file_encrypted': False, 'vault_name': 'Test vault'}
+CREDENTIALS = [
+    {'name': 'GitHub', 'mnemonics': 'gh', 'password': 'p@ss "quoted"'},
+    {'name': 'Café ☕', 'mnemonics': 'cafe', 'notes': 'naïve\nmultiline'},
+    {'name': 'Ünïcode 𝄞', 'mnemonics': 'uni,music', 'username': 'ü'},
+]
+
+
+def json_export(credentials=CREDENTIALS, metadata=METADATA):
+    return json.dumps({'metadata': metadata, 'credentials': credentials}, indent=2, ensure_ascii=False).encode()
+
+
+def jsonl_export(credentials=CREDENTIALS, metadata=METADATA):
+    lines = [{'metadata': metadata}] + credentials
+    return ''.join(json.dumps(line, ensure_ascii=False) + '\n' for line in lines).encode()
+
+
+@pytest.fixture(autouse=True)
+def tiny_chunks(monkeypatch):
+    # Values and multibyte characters straddle the chunks
+    monkeypatch.setattr(stream_utils, 'CHUNK_SIZE', 7)
+
+
+@pytest.mark.parametrize('export, read_metadata, iter_credentials', [
+    (json_export, read_json_metadata, iter_json_credentials),
+    (jsonl_export, read_jsonl_metadata, iter_jsonl_credentials),
+])
+def test_credentials_are_streamed_and_resumable_from_every_offset(export, read_metadata, iter_credentials):
+    f = io.BytesIO(export())
+    metadata, offset = read_metadata(f)
+    assert metadata == METADATA
+
+    entries = list(iter_credentials(f, offset))
+    assert [data for data, _ in entries] == CREDENTIALS
+
+    # An offset is a checkpoint: reading again from it gives the credentials after it
+    for i, (_, offset) in enumerate(entries):
+        assert [data for data, _ in iter_credentials(io.BytesIO(f.getvalue()), offset)] == CREDENTIALS[i + 1:]
+
+
+def test_json_metadata_must_come_first():
+    f = io.BytesIO(json.dumps({'credentials': [], 'metadata': METADATA}).encode())
+    with pytest.raises(ExportFormatError):
+        read_json_metadata(f)
+
+
+def test_json_without_credentials():
+    f = io.BytesIO(json.dumps({'metadata': METADATA}).encode())
+    assert read_json_metadata(f) == (METADATA, None)
+
+
+@pytest.mark.parametrize('header', [b'[1]\n', b'{"metadata": 5}\n', b'{"metadata": \n'])
+def test_jsonl_header_must_be_an_object(header):
+    with pytest.raises(ExportFormatError):
+        read_jsonl_metadata(io.BytesIO(header + b'{"name": "x"}\n'))
+
+
+def test_json_metadata_must_be_an_object():
+    with pytest.raises(ExportFormatError):
+        read_json_metadata(io.BytesIO(json_export(metadata=[1])))
+
+
+def test_malformed_jsonl_record_reports_its_offset():
+    data = jsonl_export()
+    lines = data.splitlines(keepends=True)
+    start = len(b''.join(lines[:3]))
+    f = io.BytesIO(b''.join(lines[:3]) + b'{"name": "broken\n' + lines[3])
+
+    _, offset = read_jsonl_metadata(f)
+    credentials = iter_jsonl_credentials(f, offset)
+    assert [data for data, _ in [next(credentials), next(credentials)]] == CREDENTIALS[:2]
+    with pytest.raises(ExportFormatError, match=f"byte {start}"):
+        next(credentials)
+
+
+@pytest.mark.parametrize('export, read_metadata, iter_credentials', [
+    (json_export, read_json_metadata, iter_json_credentials),
+    (jsonl_export, read_jsonl_metadata, iter_jsonl_credentials),
+])
+def test_credentials_must_be_objects(export, read_metadata, iter_credentials):
+    f = io.BytesIO(export([CREDENTIALS[0], [1], CREDENTIALS[1]]))
+    _, offset = read_metadata(f)
+    credentials = iter_credentials(f, offset)
+    assert next(credentials)[0] == CREDENTIALS[0]
+    with pytest.raises(ExportFormatError, match="credential object at byte"):
+        next(credentials)
+
+
+def test_malformed_json_record():
+    data = json_export().decode()
+    broken = data.replace('"name": "Café ☕"', '"name" "Café ☕"').encode()
+    f = io.BytesIO(broken)
+    _, offset = read_json_metadata(f)
+    credentials = iter_json_credentials(f, offset)
+    assert next(credentials)[0] == CREDENTIALS[0]
+    with pytest.raises(ExportFormatError, match="invalid JSON at byte"):
+        next(credentials)
+
+
+def test_truncated_json():
+    data = json_export()
+    f = io.BytesIO(data[:data.index('Ünïcode'.encode())])
+    _, offset = read_json_metadata(f)
+    with pytest.raises(ExportFormatError):
+        list(iter_json_credentials(f, offset))
@@ -0,0 +1,329 @@
+# tests/test_web.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import time
+import threading
+from datetime import timedelta
+
+import pytest
+
+from vaultsafe.config import Config
+from vaultsafe.db.models import session, Vault
+from vaultsafe.web import create_app, api, routes
+from vaultsafe.web.routes import dashboard_page
+from vaultsafe.web.key_store import KeyStore
+from vaultsafe.web.credential_cache import CredentialCache
+from vaultsafe.web.throttle import LoginThrottle
+from vaultsafe.utils.crypto_utils import encrypt, generate_fernet_key
+from vaultsafe.utils.rotation_utils import start_rotation, rotate
+
+from tests.conftest import MASTER_PASSWORD, TEST_KDF, TEST_KDF_PARAMS
+
+
+@pytest.fixture
+def app(vault):
+    app = create_app(Config)
+    app.config['TESTING'] = True
+    return app
+
+
+# Database sessions
+
+def test_the_session_is_removed_after_each_request(app):
+    session.query(Vault).first()
+    assert session.registry.has()
+    app.test_client().get('/')
+    assert not session.registry.has()
+
+
+def test_each_thread_has_its_own_session(engine):
+    sessions = []
+
+    def use_session():
+        sessions.append(session())
+        session.remove()
+
+    thread = threading.Thread(target=use_session)
+    thread.start()
+    thread.join()
+    assert sessions[0] is not session()
+
+
+# Dashboard
+
+def test_dashboard_pages(add_credential):
+    ids = [add_credential(f'Site {i}', [f'site{i}']).id for i in range(5)]
+
+    def page(**kwargs):
+        credentials, previous_before, next_after = dashboard_page(limit=2, **kwargs)
+        return [credential.id for credential in credentials], previous_before, next_after
+
+    assert page() == (ids[:2], None, ids[1])
+    assert page(after=ids[1]) == (ids[2:4], ids[2], ids[3])
+    assert page(after=ids[3]) == (ids[4:], ids[4], None)
+    assert page(before=ids[4]) == (ids[2:4], ids[2], ids[3])
+    assert page(before=ids[2]) == (ids[:2], None, ids[1])
+
+
+def test_dashboard_json(app, add_credential):
+    add_credential('GitHub', ['gh', 'github'], password='secret')
+    client = app.test_client()
+    assert client.get('/dashboard.json').status_code == 302
+
+    with client.session_transaction() as flask_session:
+        flask_session['logged_in'] = True
+    data = client.get('/dashboard.json?limit=0').get_json()
+    assert [(credential['name'], credential['mnemonics']) for credential in data['credentials']] == [('GitHub', ['gh', 'github'])]
+    assert 'secret' not in str(data)
+
+
+class Clock:
+    """A `time.monotonic()` which only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    return clock
+
+
+# KeyStore
+
+def test_key_store(clock):
+    store = KeyStore()
+    token = store.issue(b'vault key', ttl=60)
+    assert store.get(token) == b'vault key'
+    assert store.get('another token') is None
+
+    store.revoke(token)
+    assert store.get(token) is None
+
+
+def test_key_store_expiry(clock):
+    store = KeyStore()
+    token = store.issue(b'vault key', ttl=60)
+    clock.advance(59)
+    assert store.get(token) == b'vault key'
+    clock.advance(1)
+    assert store.get(token) is None
+
+
+def test_key_store_purges_expired_keys(clock):
+    store = KeyStore()
+    store.issue(b'old key', ttl=10)
+    clock.advance(10)
+    token = store.issue(b'new key', ttl=10)
+    assert len(store._keys) == 1
+    assert store.get(token) == b'new key'
+
+
+def test_key_store_keeps_no_token(clock):
+    store = KeyStore()
+    token = store.issue(b'vault key', ttl=60)
+    assert token not in store._keys
+
+
+# LoginThrottle
+
+def test_login_throttle(clock):
+    throttle = LoginThrottle(free_failures=2, max_delay=5)
+    for _ in range(2):
+        throttle.failure('1.2.3.4')
+        assert throttle.retry_after('1.2.3.4') == 0
+
+    # Then 1, 2, 4 seconds and at most `max_delay`
+    for delay in (1, 2, 4, 5, 5):
+        throttle.failure('1.2.3.4')
+        assert throttle.retry_after('1.2.3.4') == delay
+        assert throttle.retry_after('5.6.7.8') == 0
+        clock.advance(delay)
+        assert throttle.retry_after('1.2.3.4') == 0
+
+    throttle.success('1.2.3.4')
+    throttle.failure('1.2.3.4')
+    assert throttle.retry_after('1.2.3.4') == 0
+
+
+def test_login_throttle_forgets(clock):
+    throttle = LoginThrottle(free_failures=1, max_delay=300, forget_after=3600)
+    for _ in range(5):
+        throttle.failure('1.2.3.4')
+    clock.advance(3601)
+    throttle.failure('1.2.3.4')
+    assert throttle.retry_after('1.2.3.4') == 0
+
+
+# API
+
+@pytest.fixture
+def client(app, monkeypatch):
+    monkeypatch.setattr(api, 'key_store', KeyStore())
+    monkeypatch.setattr(api, 'login_throttle', LoginThrottle(free_failures=2, max_delay=60))
+    monkeypatch.setattr(routes, 'login_throttle', api.login_throttle)
+    return app.test_client()
+
+
+def authenticate(client, password=MASTER_PASSWORD):
+    return client.post('/api/v1/auth', json={'master_password': password})
+
+
+def test_api_can_be_disabled(vault):
+    client = create_app(Config, enable_api=False).test_client()
+    assert authenticate(client).status_code == 404
+
+
+def test_api_token(client, add_credential):
+    add_credential('GitHub', ['gh'], password='secret')
+    token = authenticate(client).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get('/api/v1/mnemonics/gh/password', headers=headers)
+    assert response.get_json()['value'] == 'secret'
+    assert client.get('/api/v1/mnemonics/gh/password').status_code == 401
+
+    assert client.delete('/api/v1/auth', headers=headers).status_code == 204
+    assert client.get('/api/v1/mnemonics/gh/password', headers=headers).status_code == 401
+
+
+def test_api_refuses_the_tokens_of_an_old_master_password(client, vault_key):
+    token = authenticate(client).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/v1/credentials', headers=headers).status_code == 200
+
+    # The requests removed the session of the fixture
+    vault = session.query(Vault).first()
+    new_key = start_rotation(vault, 'new master password', TEST_KDF, TEST_KDF_PARAMS)
+    rotate(vault, vault_key, new_key, workers=1)
+    session.remove()
+
+    response = client.get('/api/v1/credentials', headers=headers)
+    assert response.status_code == 401
+    assert 'master password has changed' in response.get_json()['error']
+    assert authenticate(client, 'new master password').status_code == 200
+
+
+def test_api_throttles_password_guesses(client, clock):
+    for _ in range(2):
+        assert authenticate(client, 'guess').status_code == 401
+    assert authenticate(client, 'guess').status_code == 401
+
+    response = authenticate(client)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+
+    clock.advance(1)
+    assert authenticate(client).status_code == 200
+
+
+# CredentialCache
+
+@pytest.fixture
+def credential(add_credential):
+    return add_credential('GitHub', ['gh'], username='octocat', password='secret')
+
+
+@pytest.fixture
+def other_key(vault_key, credential):
+    """The vault key of another login, which `credential` (not committed) is wrapped for."""
+    other_key = generate_fernet_key()
+    credential.encrypted_key = encrypt(credential.get_decrypted_key(vault_key), other_key)
+    return other_key
+
+
+def test_cache_hit(clock, vault_key, credential):
+    cache = CredentialCache()
+    assert cache.get(vault_key, credential.id, credential.last_updated) is None
+
+    data = cache.put(vault_key, credential, ttl=60)
+    assert data['password'] == 'secret' and data['mnemonics'] == ['gh']
+    assert cache.get(vault_key, credential.id, credential.last_updated) == data
+    # Another login does not see it
+    assert cache.get(generate_fernet_key(), credential.id, credential.last_updated) is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 1)
+
+
+def test_modified_credential_is_not_served(clock, vault_key, credential):
+    cache = CredentialCache()
+    cache.put(vault_key, credential, ttl=60)
+    assert cache.get(vault_key, credential.id, credential.last_updated + timedelta(seconds=1)) is None
+    assert cache.stats()['stale'] == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_cache_invalidate(clock, vault_key, credential, add_credential, other_key):
+    other = add_credential('Gmail', ['mail'], password='other')
+    cache = CredentialCache()
+    cache.put(vault_key, other, ttl=60)
+    cache.put(other_key, credential, ttl=60)
+
+    cache.invalidate(credential.id)
+    assert cache.get(other_key, credential.id, credential.last_updated) is None
+    assert cache.get(vault_key, other.id, other.last_updated)['password'] == 'other'
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_cache_clear(clock, vault_key, credential, add_credential, other_key):
+    other = add_credential('Gmail', ['mail'], password='other')
+    cache = CredentialCache()
+    cache.put(vault_key, other, ttl=60)
+    cache.put(other_key, credential, ttl=60)
+
+    cache.clear(vault_key)
+    assert cache.get(vault_key, other.id, other.last_updated) is None
+    assert cache.get(other_key, credential.id, credential.last_updated) is not None
+    cache.clear()
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_cache_expiry(clock, vault_key, credential):
+    cache = CredentialCache()
+    cache.put(vault_key, credential, ttl=60)
+    clock.advance(60)
+    assert cache.get(vault_key, credential.id, credential.last_updated) is None
+    assert cache.stats()['expired'] == 1
+
+
+def test_cache_eviction(clock, vault_key, add_credential):
+    credentials = [add_credential(f'Site {i}', password=f'pass{i}') for i in range(3)]
+    cache = CredentialCache(max_entries=2)
+    cache.put(vault_key, credentials[0], ttl=60)
+    cache.put(vault_key, credentials[1], ttl=60)
+    # The most recently used is kept
+    cache.get(vault_key, credentials[0].id, credentials[0].last_updated)
+    cache.put(vault_key, credentials[2], ttl=60)
+
+    assert cache.get(vault_key, credentials[1].id, credentials[1].last_updated) is None
+    assert cache.get(vault_key, credentials[0].id, credentials[0].last_updated) is not None
+    assert cache.stats()['evictions'] == 1
+
+
+@pytest.mark.parametrize('ttl, max_entries', [(0, 10), (-5, 10), (60, 0)])
+def test_not_cached(clock, vault_key, credential, ttl, max_entries):
+    cache = CredentialCache(max_entries=max_entries)
+    assert cache.put(vault_key, credential, ttl=ttl)['password'] == 'secret'
+    assert cache.stats()['entries'] == 0
+
+
+def test_removed_entries_are_wiped(clock, vault_key, credential):
+    cache = CredentialCache()
+    cache.put(vault_key, credential, ttl=60)
+    entry = next(iter(cache._entries.values()))
+    secret = entry.values['password']
+    assert secret == bytearray(b'secret')
+
+    cache.invalidate(credential.id)
+    assert secret == bytes(6)
+    assert entry.values == {}
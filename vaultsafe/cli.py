@@ -10,51 +10,136 @@
 #   `pip install git+https://github.com/indrajit912/PasswordManager.git`
 # 
 # cli.py - Main entry point for the CLI.
+import importlib
+
 import click
-from rich.console import Console
-from rich.panel import Panel
-
-from vaultsafe.commands import (
-    change_master_passwd, init, add, get, update, delete, info,
-    open, update_vault, export, import_credentials, generate_strong_passwd,
-    copy_credential, server
-)
-from vaultsafe.utils.cli_utils import print_basic_info
+
 from vaultsafe.version import __version__
 
-console = Console()
+
+class LazyGroup(click.Group):
+    """
+    A click group whose commands are imported only when they are invoked.
+
+    Most commands pull in SQLAlchemy (and `server` pulls in Flask), so importing
+    all of them up front made every invocation, even `vaultsafe --help` or
+    `vaultsafe generate`, pay for the whole application. Each lazy command is
+    registered with its import path ('module:attribute') and its short help,
+    which is shown by `--help` without importing the module (and must match the
+    first line of the command's docstring, see `tests/test_cli.py`).
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # name -> (import path, short help)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted({*self.commands, *self.lazy_commands})
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands and cmd_name not in self.commands:
+            import_path, _ = self.lazy_commands[cmd_name]
+            module_name, attr = import_path.split(':')
+            self.commands[cmd_name] = getattr(importlib.import_module(module_name), attr)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        names = self.list_commands(ctx)
+        if not names:
+            return
+
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            if name in self.commands:
+                command = self.commands[name]
+                if command.hidden:
+                    continue
+                rows.append((name, command.get_short_help_str(limit)))
+            else:
+                # Shortened the same way as for a loaded command
+                short_help = self.lazy_commands[name][1]
+                rows.append((name, click.Command(name, help=short_help).get_short_help_str(limit)))
+
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+LAZY_COMMANDS = {
+    'init': ('vaultsafe.commands.init:init', 'Initialize the password vault.'),
+    'info': ('vaultsafe.commands.info:info', 'Display information about the password vault.'),
+    'generate': ('vaultsafe.commands.generate_strong_passwd:generate', 'Generate strong passwords of specified length.'),
+    'add': ('vaultsafe.commands.add:add', 'Add a new credential to the database.'),
+    'get': ('vaultsafe.commands.get:get', 'Retrieve and display credentials from the vault.'),
+    'copy': ('vaultsafe.commands.copy_credential:copy_credential', 'Copy a specific field from a credential associated with the mnemonic to the clipboard.'),
+    'update': ('vaultsafe.commands.update:update', 'Update an existing credential in the database.'),
+    'del': ('vaultsafe.commands.delete:delete', 'Delete a credential from the database.'),
+    'open': ('vaultsafe.commands.open:open', 'Retrieve and display a credential from the database.'),
+    'change-master-password': ('vaultsafe.commands.change_master_passwd:change_master_password', 'Command to change the master password for the password vault.'),
+    'update-vault': ('vaultsafe.commands.update_vault:update_vault', 'Update the vault information in the database.'),
+    'export': ('vaultsafe.commands.export:export', 'Export credentials to a specified file format.'),
+    'snapshot': ('vaultsafe.commands.snapshot:snapshot', 'Compile the vault into a read-only snapshot file for fast lookups.'),
+    'import': ('vaultsafe.commands.import_credentials:import_credentials', 'Import credentials from a JSON or JSON Lines file into the database.'),
+    'server': ('vaultsafe.commands.server:server', 'Run the server for VaultSafe, providing a GUI interface.'),
+    'agent': ('vaultsafe.commands.agent:agent', 'Manage the key agent which keeps the vault key in memory.'),
+    'kdf-benchmark': ('vaultsafe.commands.kdf_benchmark:kdf_benchmark', 'Calibrate the key derivation function to a target unlock time.'),
+}
 
 @click.command()
 def help():
     """Displays help about the available commands."""
+    from rich.console import Console
+    from rich.panel import Panel
+    from vaultsafe.utils.cli_utils import print_basic_info
+
+    console = Console()
     print_basic_info()
     console.print(Panel("Help - VaultSafe CLI", style="green", title="Command List"))
 
-    for command_name, command in cli.commands.items():
+    ctx = click.get_current_context()
+    for command_name in cli.list_commands(ctx):
+        command = cli.get_command(ctx, command_name)
         if command is not help:  # Skip displaying help for the help command itself
             console.print(f"\n[bold yellow]{command_name}[/bold yellow]: {command.help}")
 
-@click.group()
+def enable_profiling(ctx, param, value):
+    """
+    Callback of `--profile` and `--profile-output`. They are eager, so that
+    profiling starts before the command is imported.
+    """
+    if not value:
+        return value
+    from vaultsafe.utils import profile_utils
+
+    if not profile_utils.is_enabled():
+        ctx.call_on_close(profile_utils.finish)
+    profile_utils.enable(value if param.name == 'profile_output' else None)
+    return value
+
+
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
 @click.version_option(__version__, prog_name="vaultsafe", message="%(prog)s v%(version)s")
-def cli():
-    pass
+@click.option('--profile', is_flag=True, is_eager=True, expose_value=False, callback=enable_profiling,
+              envvar='VAULTSAFE_PROFILE', help='Print where the time of the command goes (to stderr).')
+@click.option('--profile-output', type=click.Path(dir_okay=False, writable=True), is_eager=True, expose_value=False,
+              callback=enable_profiling, envvar='VAULTSAFE_PROFILE_OUTPUT',
+              help="Also write the profile: a JSON trace, or cProfile statistics for a '.pstats' or '.prof' file.")
+@click.option('--plain', 'output_mode', flag_value='plain',
+              help='No banner nor tables: one line of tab separated values per record, messages to stderr.')
+@click.option('--json', 'output_mode', flag_value='json',
+              help='No banner nor tables: one JSON object per line per record, messages to stderr. '
+                   'The default when stdout is not a terminal.')
+@click.option('--rich', 'output_mode', flag_value='rich', help='Banner and tables, even when stdout is not a terminal.')
+def cli(output_mode):
+    from vaultsafe.utils import output_utils
+
+    try:
+        output_utils.set_mode(output_mode or output_utils.detect_mode())
+    except ValueError as e:
+        raise click.UsageError(str(e))
 
-# Add commands to the group
-cli.add_command(init.init)
 cli.add_command(help, name='help')
-cli.add_command(info.info)
-cli.add_command(generate_strong_passwd.generate)
-cli.add_command(add.add)
-cli.add_command(get.get)
-cli.add_command(copy_credential.copy_credential, name='copy')
-cli.add_command(update.update)
-cli.add_command(delete.delete, name='del')
-cli.add_command(open.open)
-cli.add_command(change_master_passwd.change_master_password)
-cli.add_command(update_vault.update_vault)
-cli.add_command(export.export)
-cli.add_command(import_credentials.import_credentials, name='import')
-cli.add_command(server.server)
 
 if __name__ == '__main__':
     cli()
@@ -7,8 +7,9 @@ from rich.console import Console
 from rich.panel import Panel
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import get_password, input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, generate_fernet_key
+from vaultsafe.utils.auth_utils import get_password, input_vault_key_and_verify
+from vaultsafe.utils.crypto_utils import encrypt, generate_fernet_key
+from vaultsafe.utils.search_utils import index_credential
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info, multiline_input
 
 console = Console()
@@ -66,8 +67,8 @@ def add(name, mnemonics, username, password, recovery_key, url, primary_email, s
 
     console.rule("Add Credential")
 
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
 
     # Prompt for credential details if not provided as options
     if username:
@@ -109,9 +110,6 @@ def add(name, mnemonics, username, password, recovery_key, url, primary_email, s
     if notes:
         notes = multiline_input("Write any notes related to the credential ([red]end with three empty lines[/red]):")
 
-    # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
-
     # Generate a new key for the credential
     credential_key = generate_fernet_key()
 
@@ -159,6 +157,9 @@ def add(name, mnemonics, username, password, recovery_key, url, primary_email, s
         mnemonic_entry = Mnemonic(name=mnemonic, credential=credential)
         session.add(mnemonic_entry)
 
+    # Add the credential to the search index
+    index_credential(credential, vault_key)
+
     session.commit()
 
     console.print(Panel(f"Credential '{credential.name}' added successfully!", title="Success", style="bold green"))
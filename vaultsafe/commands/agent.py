@@ -0,0 +1,96 @@
+# This script handles the agent command.
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import os
+import sys
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+
+from vaultsafe.db.models import session, Vault
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify
+from vaultsafe.utils.agent_utils import agent_supported, agent_status, stop_agent, serve_agent, daemonize
+from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
+
+console = Console()
+
+@click.group()
+def agent():
+    """
+    Manage the key agent which keeps the vault key in memory.
+
+    Like `ssh-agent`, the agent holds the derived vault key behind a Unix domain
+    socket (~/.vaultsafe/.agent.sock) so that the other commands can skip the
+    key derivation. The agent forgets the key after the Vault's session
+    expiration time (see `update-vault -se`).
+
+    Examples:
+        \b
+        $ vaultsafe agent start
+        $ vaultsafe agent status
+        $ vaultsafe agent stop
+    """
+    if not agent_supported():
+        console.print("[bold red]The key agent needs Unix domain sockets, which are not available on this platform.[/bold red]")
+        sys.exit(1)
+
+
+@agent.command()
+@click.option('-t', '--ttl', type=int, help="Lifetime of the agent in sec. Defaults to the Vault's session expiration.")
+@click.option('-f', '--foreground', is_flag=True, help="Run the agent in the foreground.")
+def start(ttl, foreground):
+    """Start the key agent."""
+    print_basic_info()
+    assert_db_init()
+
+    console.rule("Start Key Agent")
+
+    remaining = agent_status()
+    if remaining is not None:
+        console.print(Panel(f"[bold yellow]The agent is already running ({remaining} sec left).[/bold yellow]", border_style="yellow"))
+        return
+
+    vault_key = input_vault_key_and_verify()
+
+    if ttl is None:
+        vault = session.query(Vault).first()
+        ttl = vault.session_expiration
+
+    if foreground:
+        console.print(Panel(f"[bold green]Agent running in the foreground for {ttl} sec. Press Ctrl+C to stop.[/bold green]", border_style="green"))
+        try:
+            serve_agent(vault_key=vault_key, ttl=ttl)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    pid = daemonize()
+    if pid == 0:
+        # Inside the daemon
+        try:
+            serve_agent(vault_key=vault_key, ttl=ttl)
+        finally:
+            os._exit(0)
+
+    console.print(Panel(f"[bold green]Agent started (pid {pid}). It will forget the vault key in {ttl} sec.[/bold green]", border_style="green"))
+
+
+@agent.command()
+def stop():
+    """Stop the key agent."""
+    if stop_agent():
+        console.print("[bold green]Agent stopped.[/bold green]")
+    else:
+        console.print("[bold yellow]No agent is running.[/bold yellow]")
+
+
+@agent.command()
+def status():
+    """Show whether the key agent is running."""
+    remaining = agent_status()
+    if remaining is None:
+        console.print("[bold yellow]No agent is running.[/bold yellow]")
+    else:
+        console.print(f"[bold green]Agent is running.[/bold green] The vault key expires in [bold]{remaining}[/bold] sec.")
@@ -6,22 +6,48 @@ import click
 import pwinput
 from rich.console import Console
 from rich.panel import Panel
+from rich.progress import Progress
 
-from vaultsafe.db.models import session, Vault, Credential
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, decrypt
+from vaultsafe.db.models import session, Vault
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify
+from vaultsafe.utils.agent_utils import stop_agent
+from vaultsafe.utils.rotation_utils import start_rotation, rotate, abort_rotation, pending_count
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
 
+
+def rotate_with_progress(vault, old_vault_key, new_vault_key):
+    """
+    Re-wrap the credential keys with a progress bar and switch the vault to the
+    new key (see `utils/rotation_utils.py`), then stop the key agent, which holds
+    the old key.
+
+    Returns:
+        int: Number of credentials re-wrapped.
+    """
+    with Progress(console=console, transient=True) as progress:
+        task = progress.add_task("Re-wrapping the credential keys...", total=pending_count())
+        count = rotate(vault, old_vault_key, new_vault_key, progress=lambda n: progress.advance(task, n))
+
+    stop_agent()
+    return count
+
+
 @click.command()
-def change_master_password():
+@click.option('--abort', is_flag=True, help='Discard an interrupted master password change.')
+def change_master_password(abort):
     """
     Command to change the master password for the password vault.
 
     This command allows the user to change the master password used to encrypt and decrypt
     credentials stored in the password vault.
 
+    The keys of the credentials are re-wrapped in chunks, each saved as it is
+    done, and the vault switches to the new master password at the very end. If
+    the command is interrupted, the old master password keeps working; run the
+    command again (and enter the new master password) to resume, or use --abort.
+
     Example:
         To change the master password:
         
@@ -32,41 +58,46 @@ def change_master_password():
     
     console.rule("[bold cyan]Change Master Password[/bold cyan]")
     
-    # Take old master password
-    old_master_passwd = input_master_passwd_and_verify()
-
-    # Derive the old vault key
-    old_vault_key = derive_vault_key(master_key=old_master_passwd)
+    # Get the old vault key (from the key agent or the old master password)
+    old_vault_key = input_vault_key_and_verify()
 
-    # Prompt for new master password
-    console.print("[bold]Enter new master password: [/bold]", style="bold cyan", end='')
-    new_master_passwd = pwinput.pwinput("", mask='\u2022')
-
-    # Prompt to confirm new master password
-    console.print("[bold]Confirm new master password: [/bold]", style="bold cyan", end='')
-    confirm_new_master_passwd = pwinput.pwinput("", mask='\u2022')
+    # Get the vault
+    vault = session.query(Vault).first()
 
-    if new_master_passwd != confirm_new_master_passwd:
-        console.print("[bold red]Passwords do not match. Aborting operation.[/bold red]")
+    if abort:
+        if vault.rotation_state:
+            abort_rotation(vault)
+            console.print(Panel("[bold green]The interrupted master password change was discarded.[/bold green]", style="bold green"))
+        else:
+            console.print("[bold yellow]No master password change is in progress.[/bold yellow]")
         return
 
-    # Derive the new vault key
-    new_vault_key = derive_vault_key(master_key=new_master_passwd)
+    if vault.rotation_state:
+        console.print(Panel(
+            "[bold yellow]A master password change was interrupted.[/bold yellow] Enter the new master password to finish it "
+            "(or run `vaultsafe change-master-password --abort`).", style="bold yellow"
+        ))
+        console.print("[bold]Enter new master password: [/bold]", style="bold cyan", end='')
+        new_vault_key = vault.rotation_key(pwinput.pwinput("", mask='\u2022'))
+        if new_vault_key is None:
+            console.print("[bold red]This is not the new master password of the interrupted change. Aborting operation.[/bold red]")
+            return
+    else:
+        # Prompt for new master password
+        console.print("[bold]Enter new master password: [/bold]", style="bold cyan", end='')
+        new_master_passwd = pwinput.pwinput("", mask='\u2022')
 
-    # Get the vault
-    vault = session.query(Vault).first()
+        # Prompt to confirm new master password
+        console.print("[bold]Confirm new master password: [/bold]", style="bold cyan", end='')
+        confirm_new_master_passwd = pwinput.pwinput("", mask='\u2022')
 
-    # Set new password hashes
-    vault.set_master_password_hash(new_master_passwd)
-    vault.set_vault_key_hash(new_vault_key)
+        if new_master_passwd != confirm_new_master_passwd:
+            console.print("[bold red]Passwords do not match. Aborting operation.[/bold red]")
+            return
 
-    # Update credentials with new vault key
-    credentials = session.query(Credential).all()
-    for cred in credentials:
-        cred_key = decrypt(cred.encrypted_key, old_vault_key)
-        cred_key_encrypted = encrypt(cred_key, new_vault_key)
-        cred.encrypted_key = cred_key_encrypted
+        # Derive the new vault key with a fresh salt (legacy vaults move to the default KDF)
+        new_vault_key = start_rotation(vault, new_master_passwd)
 
-    session.commit()
+    rotate_with_progress(vault, old_vault_key, new_vault_key)
 
     console.print(Panel("[bold green]Master password changed successfully![/bold green]", style="bold green"))
@@ -7,9 +7,9 @@ import pyperclip
 from rich.console import Console
 
 from vaultsafe.db.models import session, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key, decrypt
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
+from vaultsafe.utils.profile_utils import span
 
 console = Console()
 
@@ -52,11 +52,8 @@ def copy_credential(mnemonic, username, password, recovery_key, token, primary_e
     
     console.rule("Copy Credential Field")
     
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
-    
-    # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
 
     # Verify the mnemonic
     mnemonic_entry = session.query(Mnemonic).filter_by(name=mnemonic).first()
@@ -73,26 +70,19 @@ def copy_credential(mnemonic, username, password, recovery_key, token, primary_e
         console.print("[bold red]Please provide exactly one flag to specify which attribute to copy.[/bold red]")
         return
     
-    # Decrypt the necessary attribute based on the given flag
-    decrypted_value = None
-    credential_key = credential.get_decrypted_key(vault_key=vault_key)
-
-    if username:
-        decrypted_value = decrypt(credential.username, credential_key) if credential.username else None
-    elif password:
-        decrypted_value = decrypt(credential.password, credential_key) if credential.password else None
-    elif recovery_key:
-        decrypted_value = decrypt(credential.recovery_key, credential_key) if credential.recovery_key else None
-    elif token:
-        decrypted_value = decrypt(credential.token, credential_key) if credential.token else None
-    elif primary_email:
-        decrypted_value = decrypt(credential.primary_email, credential_key) if credential.primary_email else None
-    elif secondary_email:
-        decrypted_value = decrypt(credential.secondary_email, credential_key) if credential.secondary_email else None
+    # Decrypt only the attribute of the given flag
+    fields = {
+        'username': username, 'password': password, 'recovery_key': recovery_key,
+        'token': token, 'primary_email': primary_email, 'secondary_email': secondary_email,
+    }
+    field = next(field for field, flag in fields.items() if flag)
+    credential_data = credential.decrypted(vault_key)
+    decrypted_value = credential_data[field] if credential_data.is_set(field) else None
 
     # Copy the decrypted value to the clipboard
     if decrypted_value:
-        pyperclip.copy(decrypted_value)
+        with span('clipboard'):
+            pyperclip.copy(decrypted_value)
         console.print("[bold green]The specified field has been copied to the clipboard![/bold green]")
     else:
         console.print("[bold red]The specified field is empty or not provided for this credential.[/bold red]")
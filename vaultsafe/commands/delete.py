@@ -7,8 +7,7 @@ from rich.console import Console
 from rich.prompt import Confirm
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -29,11 +28,8 @@ def delete(mnemonic):
 
     console.rule("Delete Credential")
     
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
-    
-    # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
 
     if not mnemonic:
         mnemonic = click.prompt("No matching mnemonic found. Please provide the mnemonic associated with the credential to be deleted")
@@ -46,7 +42,7 @@ def delete(mnemonic):
     # Get the credential associated with the mnemonic
     credential = mnemonic_entry.credential
     console.print("\n")
-    Credential._print_on_screen(credential.json(vault_key))
+    credential.print_on_screen(vault_key)
     console.print("\n")
 
     confirmation = Confirm.ask("Do you want to delete this credential?", default=False)
@@ -11,116 +11,159 @@ from rich.panel import Panel
 from rich import print as rprint
 
 from vaultsafe.db.models import session, Credential
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_password
-from vaultsafe.utils.crypto_utils import derive_vault_key, decrypt, encrypt, sha256_hash
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify, get_password
+from vaultsafe.utils.crypto_utils import derive_vault_key, decrypt, encrypt, sha256_hash, get_fernet
+from vaultsafe.utils.bulk_utils import bulk_decrypt, iter_credentials
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 from vaultsafe.utils.general_utils import utcnow, convert_utc_to_local_str
 
 console = Console()
 
 
+def _export_row(cred_data_json, vault_cipher, file_cipher=None):
+    """
+    Convert the JSON representation of a Credential into an exported row.
+
+    If `file_cipher` is given, the row stays encrypted and the credential key is
+    re-encrypted with the file key instead of the vault key.
+    """
+    credential_data = {}
+
+    credential_data['id'] = cred_data_json['id']
+    credential_data['uuid'] = cred_data_json['uuid']
+    credential_data['name'] = cred_data_json['name']
+    credential_data['mnemonics'] = ', '.join(cred_data_json['mnemonics'])
+    for field in Credential.ENCRYPTED_FIELDS:
+        credential_data[field] = None if cred_data_json[field] == Credential.NONE_STR else cred_data_json[field]
+
+    if file_cipher:
+        # Get the encrypted credential key
+        credential_key_encrypted = cred_data_json['encrypted_key'].encode()
+
+        # Decrypt the credential's encrypted_key
+        credential_key = decrypt(credential_key_encrypted, vault_cipher)
+
+        # Encrypt the credential key using the file_key
+        cred_key_encrypted_by_file_key = encrypt(credential_key, file_cipher)
+
+        credential_data['encrypted_key'] = cred_key_encrypted_by_file_key.decode()
+
+    return credential_data
+
+
+def _indent(text, level):
+    """Indent all but the first line of `text` by `level` spaces."""
+    return text.replace('\n', '\n' + ' ' * level)
+
+
+def _write_json(f, metadata, rows):
+    """
+    Write the rows one by one. The output is the same as
+    `json.dump({'metadata': ..., 'credentials': [...]}, f, indent=4)`.
+    """
+    f.write('{\n    "metadata": ' + _indent(json.dumps(metadata, indent=4), 4) + ',\n    "credentials": [')
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        f.write((',' if count > 1 else '') + '\n        ' + _indent(json.dumps(row, indent=4), 8))
+    f.write('\n    ]\n}' if count else ']\n}')
+    return count
+
+
+def _write_jsonl(f, metadata, rows):
+    """Write the metadata on the first line and then one credential per line."""
+    f.write(json.dumps({'metadata': metadata}) + '\n')
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        f.write(json.dumps(row) + '\n')
+    return count
+
+
+def _write_txt(f, metadata, rows):
+    f.write(f"File Encrypted: {metadata['file_encrypted']}\n")
+    f.write(f"Exported Date: {metadata['exported_date']}\n")
+    if 'file_key_hash' in metadata:
+        f.write(f"File Key SHA256 Hash: {metadata['file_key_hash']}\n")
+    f.write("=" * 58 + "\n\n")
+    count = 0
+    for count, cred in enumerate(rows, start=1):
+        f.write(f"Credential {count}\n")
+        f.write("=" * 20 + "\n")
+        for key, value in cred.items():
+            f.write(f"{key.capitalize()}: {value if value is not None else 'N/A'}\n")
+        f.write("\n")
+    return count
+
+
+EXPORT_WRITERS = {
+    'json': _write_json,
+    'jsonl': _write_jsonl,
+    'txt': _write_txt,
+}
+
+
 def export_credentials(credentials, output_dir, file_format, vault_key, file_key=None):
     """
     Export credentials to the specified file format.
 
+    The credentials are converted and written one at a time, so memory use does
+    not grow with the size of the vault and the file is written right away.
+
     Parameters:
-    - credentials (list): List of Credential objects.
+    - credentials (iterable): Credential objects (e.g. from `iter_credentials()`).
     - vault_key (bytes): Key to decrypt credential attributes.
     - output_dir (str): Directory where the output file will be saved.
-    - file_format (str): Output file format ('json', 'txt').
+    - file_format (str): Output file format ('json', 'jsonl', 'txt').
+    - file_key (bytes, optional): If given, the data stays encrypted and the credential keys are encrypted with it.
     """
-    credentials_data = []
+    if file_format not in EXPORT_WRITERS:
+        console.print("[bold red]Error:[/bold red] Invalid file format. Please choose 'json', 'jsonl' or 'txt'.")
+        return
+
+    # Build the ciphers once for the whole export
+    vault_cipher = get_fernet(vault_key)
+    file_cipher = get_fernet(file_key) if file_key else None
+
+    if file_key:
+        credentials_json = (credential.json() for credential in credentials)
+    else:
+        # Decrypt the whole vault in parallel
+        credentials_json = bulk_decrypt(credentials, vault_key)
+
+    rows = (_export_row(cred_data_json, vault_cipher, file_cipher) for cred_data_json in credentials_json)
 
-    file_encrypted = True if file_key else False
-    
-    for credential in credentials:
-        credential_data = {}
-        _cred_data_json = credential.json() if file_key else credential.json(vault_key=vault_key)
-
-        credential_data['id'] = _cred_data_json['id']
-        credential_data['uuid'] = _cred_data_json['uuid']
-        credential_data['name'] = _cred_data_json['name']
-        credential_data['mnemonics'] = ', '.join(_cred_data_json['mnemonics'])
-        credential_data['url'] = None if _cred_data_json['url'] == Credential.NONE_STR else _cred_data_json['url']
-        credential_data['username'] = None if _cred_data_json['username'] == Credential.NONE_STR else _cred_data_json['username']
-        credential_data['password'] = None if _cred_data_json['password'] == Credential.NONE_STR else _cred_data_json['password']
-        credential_data['recovery_key'] = None if _cred_data_json['recovery_key'] == Credential.NONE_STR else _cred_data_json['recovery_key']
-        credential_data['primary_email'] = None if _cred_data_json['primary_email'] == Credential.NONE_STR else _cred_data_json['primary_email']
-        credential_data['secondary_email'] = None if _cred_data_json['secondary_email'] == Credential.NONE_STR else _cred_data_json['secondary_email']
-        credential_data['token'] = None if _cred_data_json['token'] == Credential.NONE_STR else _cred_data_json['token']
-        credential_data['notes'] = None if _cred_data_json['notes'] == Credential.NONE_STR else _cred_data_json['notes']
-
-        if file_key:
-            # Get the encrypted credential key
-            credential_key_encrypted = _cred_data_json['encrypted_key'].encode()
-
-            # Decrypt the credential's encrypted_key
-            credential_key = decrypt(credential_key_encrypted, vault_key)
-
-            # Encrypt the credential key using the file_key
-            cred_key_encrypted_by_file_key = encrypt(credential_key, file_key)
-
-            credential_data['encrypted_key'] = cred_key_encrypted_by_file_key.decode()
-
-        credentials_data.append(credential_data)
-
-    current_timestamp = convert_utc_to_local_str(dt=utcnow())
-    
     metadata = {
-        'file_encrypted': file_encrypted,
-        'exported_date': current_timestamp
+        'file_encrypted': True if file_key else False,
+        'exported_date': convert_utc_to_local_str(dt=utcnow())
     }
 
     if file_key:
         metadata['file_key_hash'] = sha256_hash(file_key)
 
-    if file_format == 'json':
-        output_data = {
-            'metadata': metadata,
-            'credentials': credentials_data
-        }
-        output_file = Path(output_dir) / 'credentials.json'
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=4)
-        console.print(f"Exported credentials to [bold]{output_file}[/bold]")
-    
-    elif file_format == 'txt':
-        output_file = Path(output_dir) / 'credentials.txt'
-        with open(output_file, 'w') as f:
-            f.write(f"File Encrypted: {metadata['file_encrypted']}\n")
-            f.write(f"Exported Date: {metadata['exported_date']}\n")
-            if file_key:
-                f.write(f"File Key SHA256 Hash: {metadata['file_key_hash']}\n")
-            f.write("=" * 58 + "\n\n")
-            for idx, cred in enumerate(credentials_data, start=1):
-                f.write(f"Credential {idx}\n")
-                f.write("=" * 20 + "\n")
-                for key, value in cred.items():
-                    f.write(f"{key.capitalize()}: {value if value is not None else 'N/A'}\n")
-                f.write("\n")
-        console.print(f"Exported credentials to [bold]{output_file}[/bold]")
+    output_file = Path(output_dir) / f'credentials.{file_format}'
+    with open(output_file, 'w') as f:
+        count = EXPORT_WRITERS[file_format](f, metadata, rows)
 
-    else:
-        console.print("[bold red]Error:[/bold red] Invalid file format. Please choose 'json' or 'txt'.")
+    console.print(f"Exported {count} credentials to [bold]{output_file}[/bold]")
 
 @click.command()
 @click.option('--output-dir', '-o', default=Path.home() / 'Downloads', type=click.Path(), help='Output directory for the exported file.')
-@click.option('--file-format', '-f', type=click.Choice(['json', 'txt']), default='json', 
-              help='File format for export (json or txt). Default is json.')
+@click.option('--file-format', '-f', type=click.Choice(['json', 'jsonl', 'txt']), default='json', 
+              help='File format for export (json, jsonl or txt). Default is json.')
 @click.option('-d', '--decrypt', is_flag=True, help='Export the data as decrypted. If not set, data will be exported as encrypted.')
 def export(output_dir, file_format, decrypt):
     """
     Export credentials to a specified file format.
 
     This command exports credentials from a database or another source to a file.
-    The exported file can be in JSON or TXT format, depending on the chosen --file-format option.
+    The exported file can be in JSON, JSON Lines or TXT format, depending on the chosen --file-format option.
+    Credentials are written one at a time, so even very large vaults are exported with little memory.
 
-    Note: Please choose the 'json' file format if you intend to import the file back into the 
+    Note: Please choose the 'json' or 'jsonl' file format if you intend to import the file back into the 
         application in the future. A 'txt' file cannot be imported.
 
     Options:
     -o, --output_dir (str): Directory where the exported file will be saved.
-    -f, --file_format (str): File format for export ('json' or 'txt'). Defaults to 'json'.
+    -f, --file_format (str): File format for export ('json', 'jsonl' or 'txt'). Defaults to 'json'.
 
     Flag:
     -d, --decrypt : If this flag is given then the data will be exported as decrypted form.
@@ -134,19 +177,12 @@ def export(output_dir, file_format, decrypt):
     
     console.rule("Export Credentials")
 
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
 
-    # Fetch credentials from the database or any other source
-    credentials = session.query(Credential).all()
-
-    if not credentials:
+    if session.query(Credential.id).first() is None:
         console.print("[bold yellow]Warning:[/bold yellow] No credentials found to export.")
         return
-    
-    # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
-
 
     if decrypt:
         # Print warning message in a Panel with colored text
@@ -171,7 +207,7 @@ def export(output_dir, file_format, decrypt):
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
     export_credentials(
-        credentials=credentials,
+        credentials=iter_credentials(),
         output_dir=output_dir,
         file_format=file_format,
         vault_key=vault_key,
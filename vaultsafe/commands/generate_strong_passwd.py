@@ -2,29 +2,83 @@
 # Author: Indrajit Ghosh
 # Created On: Jun 15, 2024
 #
+import os
+import sys
+
 import click
-import pyperclip
-from rich.console import Console
-from rich.table import Table
 
-from vaultsafe.utils.cli_utils import print_basic_info, assert_db_init
 from vaultsafe.utils.general_utils import generate_strong_password
+from vaultsafe.utils.password_utils import (
+    CHARACTER_CLASSES, DEFAULT_CLASSES, DEFAULT_PASSWORD_LENGTH, DEFAULT_PASSPHRASE_WORDS,
+    generate_password_chunks, generate_passphrase_chunks, load_wordlist, write_chunks,
+    password_entropy, password_length_for_entropy, passphrase_entropy, passphrase_words_for_entropy
+)
+
+# Up to this many passwords are shown in a table on a terminal
+MAX_TABLE_ROWS = 100
+
+
+def print_table(passwords, entropy):
+    import pyperclip
+    from rich.console import Console
+    from rich.table import Table
+    from vaultsafe.utils.cli_utils import print_basic_info
+
+    console = Console()
+    print_basic_info()
+    console.rule("Generate Strong Passwords")
+
+    table = Table(title="Generated Passwords", caption=f"Entropy: {entropy:.1f} bits each")
+    table.add_column("Index", justify="right", style="cyan", no_wrap=True)
+    table.add_column("Password", style="magenta")
+
+    for i, password in enumerate(passwords, start=1):
+        table.add_row(str(i), password)
+
+    console.print(table)
+
+    if len(passwords) == 1:
+        from vaultsafe.utils.profile_utils import span
+        with span('clipboard'):
+            pyperclip.copy(passwords[0])
+        console.print("[bold yellow]Password has been copied to clipboard.[/bold yellow]")
 
-console = Console()
 
 @click.command()
-@click.option('-l', '--length', default=18, help='Length of the generated password.')
-@click.option('-c', '--count', default=1, help='Number of passwords to generate.')
-def generate(length, count):
+@click.option('-l', '--length', type=int, help=f'Length of the generated passwords. Default is {DEFAULT_PASSWORD_LENGTH} (or enough for --min-entropy).')
+@click.option('-c', '--count', default=1, show_default=True, help='Number of passwords to generate.')
+@click.option('-C', '--class', 'classes', multiple=True, type=click.Choice(CHARACTER_CLASSES),
+              help='Character class to draw from (repeatable). Default: all of them.')
+@click.option('--require-each', is_flag=True, help='Every password contains at least one character of each class.')
+@click.option('-e', '--min-entropy', type=float, help='Minimum entropy of each password, in bits.')
+@click.option('-p', '--passphrase', is_flag=True, help='Generate passphrases of random words instead.')
+@click.option('-w', '--words', type=int, help=f'Words per passphrase. Default is {DEFAULT_PASSPHRASE_WORDS} (or enough for --min-entropy).')
+@click.option('--separator', default='-', show_default=True, help='Separator of the passphrase words.')
+@click.option('--wordlist', type=click.Path(exists=True, dir_okay=False), help='Wordlist file (one word per line) for passphrases.')
+@click.option('-o', '--output', type=click.File('wb'), help="Write the passwords to this file ('-' for stdout), one per line.")
+def generate(length, count, classes, require_each, min_entropy, passphrase, words, separator, wordlist, output):
     """
     Generate strong passwords of specified length.
 
+    On a terminal a few passwords are shown in a table (a single one is also copied
+    to the clipboard). With --output, when piped, or for more than 100 passwords,
+    they are streamed one per line, which takes well under a second per million.
+    This is also the output of the --plain and --json modes. The vault is not needed.
+
     Options:
-        -l, --length (int): Length of the password to be generated. Default is 16.
+        -l, --length (int): Length of the password to be generated. Default is 18.
         -c, --count (int): Number of passwords to generate. Default is 1.
+        -C, --class (str): lower, upper, digits or symbols (repeatable). Default: all.
+        --require-each (flag): At least one character of each class in every password.
+        -e, --min-entropy (float): Minimum entropy in bits; sets the length if not given.
+        -p, --passphrase (flag): Random words instead of characters.
+        -w, --words (int): Words per passphrase. Default is 6.
+        --separator (str): Separator of the passphrase words. Default is '-'.
+        --wordlist (path): Wordlist for passphrases. Default: the bundled list.
+        -o, --output (path): File to write the passwords to ('-' for stdout).
 
     Examples:
-        To generate a single password of default length (16 characters):
+        To generate a single password of default length (18 characters):
         \b
         $ vaultsafe generate
 
@@ -36,28 +90,51 @@ def generate(length, count):
         \b
         $ vaultsafe generate --length 20 --count 3
 
+        To generate a million passwords of at least 100 bits with a digit and a symbol each:
+        \b
+        $ vaultsafe generate -c 1000000 -e 100 -C lower -C upper -C digits -C symbols --require-each -o passwords.txt
+
+        To generate a passphrase:
+        \b
+        $ vaultsafe generate --passphrase --words 7
     """
-    print_basic_info()
-    assert_db_init()
-    
-    console.rule("Generate Strong Passwords")
-    
+    if count < 1:
+        raise click.BadParameter("must be at least 1.", param_hint="'--count'")
+
     try:
-        passwords = [generate_strong_password(length) for _ in range(count)]
-        
-        table = Table(title="Generated Passwords")
-        table.add_column("Index", justify="right", style="cyan", no_wrap=True)
-        table.add_column("Password", style="magenta")
-            
-        for i, password in enumerate(passwords, start=1):
-            table.add_row(str(i), password)
-            
-        console.print(table)
-
-        if len(passwords) == 1:
-            pyperclip.copy(passwords[0])
-            console.print("[bold yellow]Password has been copied to clipboard.[/bold yellow]")
-            
-    except ValueError as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        if passphrase:
+            wordlist = load_wordlist(wordlist) if wordlist else load_wordlist()
+            if words is None:
+                words = max(DEFAULT_PASSPHRASE_WORDS, passphrase_words_for_entropy(min_entropy, wordlist)) if min_entropy else DEFAULT_PASSPHRASE_WORDS
+            entropy = passphrase_entropy(words, wordlist)
+            chunks = generate_passphrase_chunks(count, words, wordlist, separator)
+        else:
+            classes = classes or DEFAULT_CLASSES
+            if length is None:
+                length = max(DEFAULT_PASSWORD_LENGTH, password_length_for_entropy(min_entropy, classes, require_each)) if min_entropy else DEFAULT_PASSWORD_LENGTH
+            entropy = password_entropy(length, classes, require_each)
+            chunks = generate_password_chunks(count, length, classes, require_each)
+    except (ValueError, OSError) as e:
+        raise click.ClickException(str(e))
+
+    if min_entropy and entropy < min_entropy:
+        raise click.ClickException(
+            f"The passwords would only have {entropy:.1f} bits of entropy (< {min_entropy:g}). "
+            "Increase --length/--words or leave it out."
+        )
 
+    from vaultsafe.utils import output_utils
+
+    if output is None and output_utils.is_rich() and sys.stdout.isatty() and count <= MAX_TABLE_ROWS:
+        passwords = [password.decode() for chunk in chunks for password in chunk]
+        print_table(passwords, entropy)
+        return
+
+    try:
+        write_chunks(chunks, output or sys.stdout.buffer)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if output is not None:
+            output.close()
@@ -2,22 +2,164 @@
 # Author: Indrajit Ghosh
 # Created On: Jun 13, 2024
 #
+import re
+import sys
+import json
+import shlex
+import contextlib
+
 import click
 from rich.console import Console
-from sqlalchemy.orm import joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify, input_snapshot_key_and_verify
+from vaultsafe.utils.snapshot_utils import Snapshot, SnapshotError
+from vaultsafe.utils.search_utils import search_credentials
+from vaultsafe.utils.bulk_utils import bulk_decrypt, iter_credentials
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
+from vaultsafe.utils import output_utils
 
 console = Console()
 
+BATCH_FORMATS = ('json', 'env', 'shell')
+
+# The encrypted fields shown when listing the vault: the secrets are not decrypted
+LIST_FIELDS = tuple(field for field in Credential.ENCRYPTED_FIELDS if field not in Credential.SECRET_FIELDS)
+
+
+def env_name(mnemonic: str, field: str):
+    """The environment variable of a field: 'github-ci', 'token' -> 'GITHUB_CI_TOKEN'."""
+    # Variable names are ASCII letters, digits and underscores, not starting with a digit
+    name = re.sub(r'\W', '_', f"{mnemonic}_{field}", flags=re.ASCII).upper()
+    return f"_{name}" if name[0].isdigit() else name
+
+
+def check_env_names(mnemonics, fields):
+    """Raise a click.UsageError if two of the mnemonics map to the same environment variables."""
+    seen = {}
+    for mnemonic in dict.fromkeys(mnemonics):
+        for field in fields:
+            name = env_name(mnemonic, field)
+            other = seen.setdefault(name, mnemonic)
+            if other != mnemonic:
+                raise click.UsageError(
+                    f"The mnemonics '{other}' and '{mnemonic}' both map to the variable {name}; use '--format json'."
+                )
+
+
+def format_batch(results: dict, output_format: str):
+    """
+    Render the decrypted fields of `get --batch`.
+
+    Args:
+        results (dict): mnemonic -> {field: value or None}.
+        output_format (str): One of `BATCH_FORMATS`.
+
+    Returns:
+        str: The output, without a trailing newline.
+    """
+    if output_format == 'json':
+        return json.dumps(results, indent=2)
+
+    lines = []
+    for mnemonic, fields in results.items():
+        for field, value in fields.items():
+            name = env_name(mnemonic, field)
+            value = value or ''
+            if output_format == 'shell':
+                lines.append(f"export {name}={shlex.quote(value)}")
+            else:
+                # dotenv style double quoted value
+                escaped = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                lines.append(f'{name}="{escaped}"')
+    return '\n'.join(lines)
+
+
+def get_batch(mnemonics, fields, output_format):
+    """
+    Print the requested fields of many credentials in a machine readable format.
+
+    All the mnemonics are resolved in one query and only the requested fields
+    are decrypted. Prompts and errors go to stderr, so that stdout holds
+    nothing but the output. Exits with status 1 if a mnemonic is not found.
+    """
+    mnemonics = list(dict.fromkeys(mnemonics))
+
+    with contextlib.redirect_stdout(sys.stderr):
+        assert_db_init()
+        vault_key = input_vault_key_and_verify()
+
+    found = {
+        entry.name: entry.credential
+        for entry in (
+            session.query(Mnemonic)
+            .filter(Mnemonic.name.in_(mnemonics))
+            .options(selectinload(Mnemonic.credential))
+        )
+    }
+    missing = [name for name in mnemonics if name not in found]
+    if missing:
+        click.echo(f"Mnemonic(s) not found: {', '.join(missing)}", err=True)
+        sys.exit(1)
+
+    # Mnemonics of the same credential share one decryption
+    decrypted = {}
+    results = {}
+    for name in mnemonics:
+        credential = found[name]
+        if credential.id not in decrypted:
+            decrypted[credential.id] = credential.decrypt_fields(vault_key, fields)
+        results[name] = decrypted[credential.id]
+
+    click.echo(format_batch(results, output_format), file=output_utils.stdout())
+
+
+def get_batch_from_snapshot(path, mnemonics, fields, output_format):
+    """
+    Same as `get_batch()`, from a snapshot file (see `vaultsafe snapshot`)
+    instead of the database.
+    """
+    mnemonics = list(dict.fromkeys(mnemonics))
+
+    try:
+        snapshot = Snapshot(path)
+    except SnapshotError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+
+    with snapshot:
+        records = {name: snapshot.get(name) for name in mnemonics}
+        missing = [name for name, record in records.items() if record is None]
+        if missing:
+            click.echo(f"Mnemonic(s) not found: {', '.join(missing)}", err=True)
+            sys.exit(1)
+
+        with contextlib.redirect_stdout(sys.stderr):
+            vault_key = input_snapshot_key_and_verify(snapshot)
+
+        decrypted = {}
+        results = {}
+        for name, record in records.items():
+            if record.id not in decrypted:
+                decrypted[record.id] = record.decrypt_fields(vault_key, fields)
+            results[name] = decrypted[record.id]
+
+    click.echo(format_batch(results, output_format), file=output_utils.stdout())
+
+
 @click.command()
-@click.argument('mnemonic', required=False)
-@click.option('--search', '-s', help="Search keyword for fuzzy matching name, username, or notes.")
-def get(mnemonic, search):
+@click.argument('mnemonics', nargs=-1)
+@click.option('--search', '-s', help="Search keyword for fuzzy matching name, username, or notes. "
+              "Keywords shorter than 3 characters decrypt every credential.")
+@click.option('--batch', '-b', is_flag=True, help="Print the fields of all the given mnemonics in a machine readable format.")
+@click.option('--field', '-f', 'fields', multiple=True, type=click.Choice(Credential.ENCRYPTED_FIELDS),
+              help="Field to print with --batch (repeatable, default: password).")
+@click.option('--format', 'output_format', type=click.Choice(BATCH_FORMATS),
+              help="Output format of --batch (default: json).")
+@click.option('--snapshot', 'snapshot_path', type=click.Path(exists=True, dir_okay=False),
+              help="Read --batch from this snapshot file (see `vaultsafe snapshot`) instead of the vault.")
+def get(mnemonics, search, batch, fields, output_format, snapshot_path):
     """
     Retrieve and display credentials from the vault.
 
@@ -27,10 +169,19 @@ def get(mnemonic, search):
        - If the --search/-s option is given, it searches across credential name, username, notes, and mnemonics 
          for approximate matches and displays matching credentials.
        - If no search keyword is provided, it displays all credentials stored in the vault.
+    3. With --batch, it prints the requested fields of all the given mnemonics as JSON, dotenv
+       lines or shell `export` statements, for scripts and CI jobs.
+
+    With the global --json or --plain option (the former is the default when stdout is not
+    a terminal), each credential is one line of output, without its secrets.
 
     Args:
-        mnemonic (str, optional): The mnemonic used to identify a specific credential.
+        mnemonics (str, optional): The mnemonic(s) used to identify credentials (several only with --batch).
         --search, -s (str, optional): Keyword for fuzzy search.
+        --batch, -b (flag, optional): Machine readable output of many credentials.
+        --field, -f (str, optional): Field to print with --batch, repeatable. Default: password.
+        --format (str, optional): json (default), env or shell.
+        --snapshot (path, optional): Snapshot file to read --batch from, without the database.
 
     Examples:
         Retrieve a credential by mnemonic:
@@ -44,17 +195,47 @@ def get(mnemonic, search):
         Search credentials with a keyword:
         \b
         $ vaultsafe get -s "gmail"
+
+        List all credentials as JSON Lines:
+        \b
+        $ vaultsafe --json get > credentials.jsonl
+
+        Export the passwords and tokens of two credentials to the environment:
+        \b
+        $ eval "$(vaultsafe get --batch github aws -f password -f token --format shell)"
+
+        The same from a snapshot of the vault:
+        \b
+        $ eval "$(vaultsafe get --batch github aws -f password -f token --format shell --snapshot vault.snapshot)"
     """
+    if batch:
+        if not mnemonics:
+            raise click.UsageError("Provide at least one mnemonic with '--batch'.")
+        if search:
+            raise click.UsageError("Cannot provide both '--batch' and '--search' at the same time.")
+        fields = fields or ('password',)
+        output_format = output_format or 'json'
+        if output_format != 'json':
+            check_env_names(mnemonics, fields)
+        if snapshot_path:
+            get_batch_from_snapshot(snapshot_path, mnemonics, fields, output_format)
+        else:
+            get_batch(mnemonics, fields, output_format)
+        return
+
+    if len(mnemonics) > 1:
+        raise click.UsageError("Use '--batch' to retrieve several mnemonics at once.")
+    if fields or output_format or snapshot_path:
+        raise click.UsageError("'--field', '--format' and '--snapshot' can only be used with '--batch'.")
+    mnemonic = mnemonics[0] if mnemonics else None
+
     print_basic_info()
     assert_db_init()
     
     console.rule("Retrieve Credential")
     
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
-    
-    # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
 
     if mnemonic and search:
         raise click.UsageError("Cannot provide both 'mnemonic' and '--search' at the same time.")
@@ -68,28 +249,13 @@ def get(mnemonic, search):
         
         # Get the credential associated with the mnemonic
         credential = mnemonic_entry.credential
-        console.print("\n")
+        if output_utils.is_rich():
+            console.print("\n")
         credential.print_on_screen(vault_key)
 
     elif search:
-        # Fuzzy search logic
-
-        results = (
-            session.query(Credential)
-            .outerjoin(Credential.mnemonics)
-            .options(joinedload(Credential.mnemonics))
-            .filter(
-                or_(
-                    Credential.name.ilike(f"%{search}%"),
-                    Credential.username.ilike(f"%{search}%"),
-                    Credential.notes.ilike(f"%{search}%"),
-                    Mnemonic.name.ilike(f"%{search}%")  # <-- this line enables searching mnemonics
-                )
-            )
-            .distinct()
-            .all()
-        )
-
+        # Search through the encrypted (blind) index
+        results = search_credentials(search, vault_key)
 
         if not results:
             console.print(f"[bold red]No credentials found matching:[/bold red] '{search}'")
@@ -99,12 +265,18 @@ def get(mnemonic, search):
 
 
     else:
-        # Query all credentials
-        credentials = session.query(Credential).all()
-        if not credentials:
+        # Decrypt all credentials in parallel, only the fields which are shown
+        credentials_json = bulk_decrypt(iter_credentials(), vault_key, fields=LIST_FIELDS)
+
+        count = 0
+        if output_utils.is_rich():
+            for count, credential_data in enumerate(credentials_json, 1):
+                console.print("\n")
+                Credential._print_on_screen(credential_data, copy_to_clipboard=False, count=count)
+        else:
+            # One line per credential, as fast as they are decrypted
+            for count, credential_data in enumerate(credentials_json, 1):
+                output_utils.emit(Credential.record(credential_data))
+
+        if not count:
             console.print("[bold yellow]No credentials found.[/bold yellow]")
-            return
-        
-        for i, credential in enumerate(credentials):
-            console.print("\n")
-            Credential._print_on_screen(credential.json(vault_key), copy_to_clipboard=False, count=i + 1)
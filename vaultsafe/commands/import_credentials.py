@@ -3,16 +3,25 @@
 # Created On: Jun 14, 2024
 # 
 import json
+import hashlib
+from pathlib import Path
 
 import click
+from cryptography.fernet import InvalidToken
+from sqlalchemy import insert, select
 from sqlalchemy.exc import IntegrityError
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 from rich import print as rprint
 
-from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.crypto_utils import encrypt, decrypt, generate_fernet_key, derive_vault_key, sha256_hash
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
+from vaultsafe.db.models import session, Credential, Mnemonic, SearchToken
+from vaultsafe.utils.crypto_utils import encrypt, decrypt, generate_fernet_key, derive_vault_key, sha256_hash, get_fernet, new_fernet, derive_search_key
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify
+from vaultsafe.utils.search_utils import search_tokens_for
+from vaultsafe.utils.bulk_utils import worker_pool
+from vaultsafe.utils.stream_utils import EXPORT_READERS, ExportFormatError, CHUNK_SIZE
+from vaultsafe.config import IMPORT_BATCH_SIZE, DOT_IMPORT_CHECKPOINT
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -21,26 +30,233 @@ def _decrypt_attr(attr, key):
     return decrypt(attr, key) if attr else None
 
 
-def import_credentials_from_json(file_path, vault_key):
+def _parse_mnemonics(data):
+    return sorted(set(m.strip() for m in (data.get('mnemonics') or '').split(',') if m.strip()))
+
+
+def entry_error(data, file_encrypted: bool = False):
+    """
+    Check the shape of one imported entry before it is prepared.
+
+    Returns:
+        str: Why the entry cannot be imported, or None.
+    """
+    if not isinstance(data.get('name'), str) or not data.get('name'):
+        return "The entry has no name."
+    for field in ('mnemonics', *Credential.ENCRYPTED_FIELDS):
+        if data.get(field) is not None and not isinstance(data.get(field), str):
+            return f"'{field}' is not a string."
+    if file_encrypted and not isinstance(data.get('encrypted_key'), str):
+        return "The entry has no 'encrypted_key'."
+    return None
+
+
+def prepare_credential(data, vault_key, search_key, file_key=None):
+    """
+    Turn one imported entry into the column values of a new Credential.
+
+    A new credential key is generated, the attributes are (decrypted with the
+    file key if needed and) encrypted with it, and the search tokens are computed.
+    Module level so that it can run in a worker pool.
+
+    Returns:
+        tuple: (credential column values, mnemonics, search tokens)
+    """
+    if file_key:
+        # Decrypt the old credential key with the file key
+        old_credential_key = new_fernet(decrypt(data.get('encrypted_key').encode(), get_fernet(file_key)))
+        values = {field: _decrypt_attr(data.get(field), old_credential_key) for field in Credential.ENCRYPTED_FIELDS}
+    else:
+        values = {field: data.get(field) for field in Credential.ENCRYPTED_FIELDS}
+
+    mnemonics = _parse_mnemonics(data)
+    tokens = search_tokens_for([data.get('name'), values['username'], values['notes'], *mnemonics], search_key)
+
+    # Generate a new key for the credential and encrypt the attributes
+    credential_key = generate_fernet_key()
+    credential_cipher = new_fernet(credential_key)
+
+    columns = {field: encrypt(value, credential_cipher) if value else None for field, value in values.items()}
+    columns['name'] = data.get('name')
+    columns['encrypted_key'] = encrypt(credential_key, get_fernet(vault_key))
+
+    return columns, mnemonics, tokens
+
+
+def _prepare_entry(data, vault_key, search_key, file_key=None):
+    """
+    `prepare_credential()` for the worker pool: the error of a bad entry is
+    returned instead of raised, so that it only fails that entry.
+
+    Returns:
+        tuple: (the result of `prepare_credential()` or None, error message or None)
+    """
+    try:
+        return prepare_credential(data, vault_key, search_key, file_key), None
+    except InvalidToken:
+        return None, "Cannot be decrypted with the file password."
+    except (ValueError, TypeError, AttributeError) as e:
+        return None, f"Invalid entry: {e}"
+
+
+def _insert_batch(prepared):
+    """
+    Insert a batch of prepared credentials with bulk INSERTs. The caller
+    commits the session.
+    """
+    credential_ids = session.scalars(
+        insert(Credential).returning(Credential.id, sort_by_parameter_order=True),
+        [columns for columns, _, _ in prepared]
+    ).all()
+
+    mnemonic_rows = []
+    token_rows = []
+    for credential_id, (_, mnemonics, tokens) in zip(credential_ids, prepared):
+        mnemonic_rows.extend({'name': name, 'credential_id': credential_id} for name in mnemonics)
+        token_rows.extend({'token': token, 'credential_id': credential_id} for token in tokens)
+
+    if mnemonic_rows:
+        session.execute(insert(Mnemonic), mnemonic_rows)
+    if token_rows:
+        session.execute(insert(SearchToken), token_rows)
+
+
+def _hash_bytes(f, end: int, digest=None, start: int = 0):
     """
-    Import credentials from a JSON file into the database.
+    Feed the bytes [start, end) of a file opened in binary mode to a sha256 digest.
+
+    Returns:
+        The digest (a new one unless `digest` is given).
+    """
+    digest = digest or hashlib.sha256()
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = f.read(min(remaining, CHUNK_SIZE))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest
+
+
+def load_checkpoint(file_path):
+    """
+    The checkpoint of an interrupted import of `file_path`. It is only valid
+    while the part of the file already imported is unchanged, so a file
+    corrected after the checkpoint (e.g. a malformed credential) can be resumed.
+
+    Returns:
+        dict: The checkpoint, or None.
+    """
+    if not DOT_IMPORT_CHECKPOINT.exists():
+        return None
+    with open(DOT_IMPORT_CHECKPOINT, 'r') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('file') != str(Path(file_path).resolve()):
+        return None
+    with open(file_path, 'rb') as f:
+        if _hash_bytes(f, checkpoint['offset']).hexdigest() != checkpoint.get('sha256'):
+            return None
+    return checkpoint
+
+
+class CheckpointWriter:
+    """
+    Saves the checkpoints of an import, hashing the imported part of the file
+    as it grows (see `load_checkpoint()`).
+    """
+
+    def __init__(self, file_path, offset: int):
+        self.file_path = file_path
+        self.f = open(file_path, 'rb')
+        self.offset = offset
+        self.digest = _hash_bytes(self.f, offset)
+
+    def save(self, offset: int, imported: int):
+        """Record that everything before the byte `offset` of the file has been imported."""
+        _hash_bytes(self.f, offset, self.digest, start=self.offset)
+        self.offset = offset
+        checkpoint = {
+            'file': str(Path(self.file_path).resolve()), 'offset': offset,
+            'imported': imported, 'sha256': self.digest.hexdigest()
+        }
+        with open(DOT_IMPORT_CHECKPOINT, 'w') as f:
+            json.dump(checkpoint, f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.f.close()
+
+
+def clear_checkpoint():
+    if DOT_IMPORT_CHECKPOINT.exists():
+        DOT_IMPORT_CHECKPOINT.unlink()
+
+
+def import_credentials_from_json(file_path, vault_key, file_format: str = 'json',
+                                 resume: bool = False, batch_size: int = IMPORT_BATCH_SIZE):
+    """
+    Import credentials from a JSON (or JSON Lines) export into the database.
+
+    The file is read incrementally: the metadata header first, then the
+    credentials one at a time, so memory use does not depend on the file size.
+    All the mnemonics already in the vault are loaded once; entries whose mnemonics
+    are taken (or repeated within the file) are skipped and reported at the end.
+    The other entries are encrypted in parallel and inserted with bulk INSERTs,
+    `batch_size` entries per transaction. An entry which is invalid, cannot be
+    decrypted or is refused by the database fails on its own and is reported at
+    the end; the rest of its batch is imported. After each transaction a
+    checkpoint is saved so that an interrupted import can be resumed. A malformed credential
+    stops the import after the ones before it, and the checkpoint is kept so
+    that the import can be resumed once the file is corrected.
 
     Parameters:
     - file_path (str): Path to the JSON file containing credentials data.
     - vault_key (bytes): Vault key to encrypt the key of each Credentials.
+    - file_format (str): 'json' or 'jsonl'.
+    - resume (bool): Continue an interrupted import of the same file from its checkpoint.
+    - batch_size (int): Number of entries encrypted and committed together.
     """
-    with open(file_path, 'r') as f:
-        filedata = json.load(f)
+    read_metadata, iter_credentials_data = EXPORT_READERS[file_format]
 
-    metadata = filedata.get('metadata')
-    if metadata is None:
-        err_message = "[red]Error:[/red] The file structure is unknown. Cannot be imported."
-        rprint('\n', Panel(err_message, title="Import Error", title_align="left", highlight=True, padding=1), '\n')
-        return
+    with open(file_path, 'rb') as f:
+        try:
+            metadata, offset = read_metadata(f)
+        except ExportFormatError as e:
+            err_message = f"[red]Error:[/red] {e} Cannot be imported."
+            rprint('\n', Panel(err_message, title="Import Error", title_align="left", highlight=True, padding=1), '\n')
+            return
 
-    credentials_data = filedata.get('credentials', [])
+        if metadata is None:
+            err_message = "[red]Error:[/red] The file structure is unknown. Cannot be imported."
+            rprint('\n', Panel(err_message, title="Import Error", title_align="left", highlight=True, padding=1), '\n')
+            return
+
+        checkpoint = load_checkpoint(file_path)
+        if checkpoint and resume:
+            offset = checkpoint['offset']
+            console.print(f"Resuming the import after {checkpoint['imported']} imported credentials.")
+        elif checkpoint:
+            console.print("[bold yellow]Note:[/bold yellow] An interrupted import of this file was found. Use --resume to continue it.")
+        elif resume:
+            console.print("[bold yellow]Note:[/bold yellow] No checkpoint found for this file. Starting from the beginning.")
+
+        if offset is None:
+            # The file has no credentials
+            credentials_data, offset = iter([]), f.tell()
+        else:
+            credentials_data = iter_credentials_data(f, offset)
+        imported = checkpoint['imported'] if checkpoint and resume else 0
+
+        _import_credentials(file_path, credentials_data, offset, metadata, vault_key, batch_size, imported)
 
+
+def _import_credentials(file_path, credentials_data, offset, metadata, vault_key, batch_size, imported):
     file_encrypted = metadata.get('file_encrypted')
+    file_key = None
     
     if file_encrypted:
         # Ask the user for the file password.
@@ -56,117 +272,162 @@ def import_credentials_from_json(file_path, vault_key):
             rprint('\n', Panel(err_message, title="Password Error", title_align="left", highlight=True, padding=1), '\n')
             return
 
+    search_key = derive_search_key(vault_key)
 
-    for data in credentials_data:
-        name = data.get('name')
-
-        if file_encrypted:
-            # Get the old encrypted_key
-            old_credential_key_encrypted = data.get('encrypted_key').encode()
-
-            # Decrypt the key
-            old_credential_key = decrypt(old_credential_key_encrypted, file_key)
-
-        url = _decrypt_attr(data.get('url'), old_credential_key) if file_encrypted else data.get('url')
-        username = _decrypt_attr(data.get('username'), old_credential_key) if file_encrypted else data.get('username')
-        password = _decrypt_attr(data.get('password'), old_credential_key) if file_encrypted else data.get('password')
-        recovery_key = _decrypt_attr(data.get('recovery_key'), old_credential_key) if file_encrypted else data.get('recovery_key')
-        primary_email = _decrypt_attr(data.get('primary_email'), old_credential_key) if file_encrypted else data.get('primary_email')
-        secondary_email = _decrypt_attr(data.get('secondary_email'), old_credential_key) if file_encrypted else data.get('secondary_email')
-        token = _decrypt_attr(data.get('token'), old_credential_key) if file_encrypted else data.get('token')
-        notes = _decrypt_attr(data.get('notes'), old_credential_key) if file_encrypted else data.get('notes')
-
-        mnemonics = list(set([m.strip() for m in data.get('mnemonics', '').split(',') if m.strip()]))
+    # Check the mnemonics of every entry against the vault in one pass
+    taken_mnemonics = set(session.scalars(select(Mnemonic.name)))
+    skipped = []
+    failed = []
+    errors = []
+    # Byte offset after the last credential read (skipped ones included)
+    read_offset = offset
 
+    def accepted_entries():
+        nonlocal read_offset
         try:
-            # Check if any mnemonic is already associated with an existing credential
-            existing_mnemonics = session.query(Mnemonic).filter(Mnemonic.name.in_(mnemonics)).all()
-
-            if existing_mnemonics:
-                console.print(f"Skipping credential '{name}' due to existing mnemonic association.")
-                continue
-
-            # Create Credential object
-            # Generate a new key for the credential
-            credential_key = generate_fernet_key()
-
-            # Encrypt credentials
-            encrypted_username = encrypt(username, credential_key) if username else None
-            encrypted_password = encrypt(password, credential_key) if password else None
-            encrypted_url = encrypt(url, credential_key) if url else None
-            recovery_key_encrypted = encrypt(recovery_key, credential_key) if recovery_key else None
-            primary_email_encrypted = encrypt(primary_email, credential_key) if primary_email else None
-            secondary_email_encrypted = encrypt(secondary_email, credential_key) if secondary_email else None
-            token_encrypted = encrypt(token, credential_key) if token else None
-            notes_encrypted = encrypt(notes, credential_key) if notes else None
-            encrypted_credential_key = encrypt(credential_key, vault_key)
-
-            # Create the credential object
-            credential = Credential(
-                name=name,
-                url=encrypted_url,
-                username=encrypted_username,
-                password=encrypted_password,
-                encrypted_key=encrypted_credential_key,
-                recovery_key=recovery_key_encrypted,
-                primary_email=primary_email_encrypted,
-                secondary_email=secondary_email_encrypted,
-                token=token_encrypted,
-                notes=notes_encrypted
-            )
-
-            # Add the credential to the database
-            session.add(credential)
-            session.commit()
-
-            # Associate mnemonics with the credential
-            for mnemonic in mnemonics:
-                mnemonic_entry = Mnemonic(name=mnemonic, credential=credential)
-                session.add(mnemonic_entry)
-            
-            session.commit()
-
-            console.print(f"Imported credential '{name}' successfully.")
-
-        except IntegrityError as e:
-            session.rollback()
-            console.print(f"[bold red]Error:[/bold red] Failed to import credential '{name}'. {str(e)}")
+            for data, read_offset in credentials_data:
+                error = entry_error(data, bool(file_key))
+                if error:
+                    failed.append((data.get('name'), error))
+                    continue
+                mnemonics = _parse_mnemonics(data)
+                conflicts = [mnemonic for mnemonic in mnemonics if mnemonic in taken_mnemonics]
+                if conflicts:
+                    skipped.append((data.get('name'), conflicts))
+                    continue
+                taken_mnemonics.update(mnemonics)
+                yield data, read_offset
+        except ExportFormatError as e:
+            # The credentials read so far are still imported
+            errors.append(e)
+
+    def batches():
+        batch = []
+        for entry in accepted_entries():
+            batch.append(entry)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def fail(data, prepared, error):
+        failed.append((data.get('name'), error))
+        # The mnemonics of a failed entry are free for the next ones
+        taken_mnemonics.difference_update(prepared[1] if prepared else _parse_mnemonics(data))
+
+    with CheckpointWriter(file_path, offset) as checkpoint, worker_pool() as pool_map:
+        for batch in batches():
+            entries = []
+            results = pool_map(_prepare_entry, [data for data, _ in batch], vault_key, search_key, file_key)
+            for (data, _), (prepared, error) in zip(batch, results):
+                if error:
+                    fail(data, None, error)
+                else:
+                    entries.append((data, prepared))
+
+            try:
+                if entries:
+                    _insert_batch([prepared for _, prepared in entries])
+                session.commit()
+                imported += len(entries)
+            except IntegrityError:
+                session.rollback()
+                # Find the offending rows: one savepoint per row, the others are kept
+                for data, prepared in entries:
+                    try:
+                        with session.begin_nested():
+                            _insert_batch([prepared])
+                        imported += 1
+                    except IntegrityError as e:
+                        fail(data, prepared, str(e.orig))
+                session.commit()
+
+            # Every entry of the batch is now either imported or reported as failed
+            checkpoint.save(batch[-1][1], imported)
+
+        if errors:
+            # Resume at the malformed credential
+            checkpoint.save(read_offset, imported)
+
+    if errors:
+        err_message = (
+            f"[red]Error:[/red] {errors[0]} The credentials before it were imported. "
+            "Correct the file and run the import again with --resume to continue."
+        )
+        rprint('\n', Panel(err_message, title="Import Error", title_align="left", highlight=True, padding=1), '\n')
+        _print_import_report(imported, skipped, failed)
+        return
+
+    clear_checkpoint()
+    _print_import_report(imported, skipped, failed)
+
+
+def _print_import_report(imported, skipped, failed, max_rows: int = 50):
+    """Print a summary of the import with the skipped and failed entries."""
+    console.print(Panel(
+        f"Imported: [bold green]{imported}[/bold green]    "
+        f"Skipped: [bold yellow]{len(skipped)}[/bold yellow]    "
+        f"Failed: [bold red]{len(failed)}[/bold red]",
+        title="Import Summary", style="cyan"
+    ))
+
+    if skipped:
+        table = Table(title="Skipped (mnemonic already in use)", title_style="bold yellow")
+        table.add_column("Credential", style="bold")
+        table.add_column("Conflicting Mnemonics", style="yellow")
+        for name, conflicts in skipped[:max_rows]:
+            table.add_row(str(name), ", ".join(conflicts))
+        console.print(table)
+        if len(skipped) > max_rows:
+            console.print(f"... and {len(skipped) - max_rows} more.")
+
+    if failed:
+        table = Table(title="Failed", title_style="bold red")
+        table.add_column("Credential", style="bold")
+        table.add_column("Error", style="red")
+        for name, error in failed[:max_rows]:
+            table.add_row(str(name), error)
+        console.print(table)
+        if len(failed) > max_rows:
+            console.print(f"... and {len(failed) - max_rows} more.")
 
 
 @click.command()
 @click.argument('file_path', type=click.Path(exists=True))
-@click.option('--format', '-f', type=click.Choice(['json']), default='json',
-              help='File format for import (json).')
-def import_credentials(file_path, format):
+@click.option('--format', '-f', type=click.Choice(['json', 'jsonl']), default=None,
+              help='File format for import (json or jsonl). Guessed from the file extension if not given.')
+@click.option('-r', '--resume', is_flag=True, help='Resume an interrupted import of the same file.')
+def import_credentials(file_path, format, resume):
     """
-    Import credentials from a JSON file into the database.
+    Import credentials from a JSON or JSON Lines file into the database.
 
     This command imports credentials into the database. Mnemonics are checked to avoid duplication.
+    The file is read incrementally, so very large exports can be imported with little memory.
+    If an import is interrupted, run the same command again with --resume to continue it.
 
     Arg:
     - file_path (str): Path to the file containing credentials data.
 
     Option:
-    -f, --format (str): File format ('json').
+    -f, --format (str): File format ('json' or 'jsonl').
+    -r, --resume: Resume an interrupted import of the same file.
 
     Example usage:
     \b
-    $ vaultsafe import /path/to/credentials.csv --format csv
+    $ vaultsafe import /path/to/credentials.json
+    $ vaultsafe import /path/to/credentials.jsonl --resume
     """
     print_basic_info()
     assert_db_init()
 
     console.rule("Import Credentials")
 
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
-    
-    # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
-
-    if format == 'json':
-        import_credentials_from_json(file_path, vault_key)
-    elif format == 'txt':
-        # TODO: Let the user that txt file cannot be imported.
-        pass
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
+
+    if format is None:
+        format = 'jsonl' if file_path.endswith('.jsonl') else 'json'
+
+    import_credentials_from_json(file_path, vault_key, file_format=format, resume=resume)
 
@@ -8,6 +8,7 @@ from rich.panel import Panel
 
 from vaultsafe.db.models import session, Vault, Credential, Mnemonic
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
+from vaultsafe.utils import output_utils
 
 console = Console()
 
@@ -29,7 +30,6 @@ def info():
     
     # Get the vault
     vault = session.query(Vault).first()
-    vault.print_on_screen()
 
     # Count total number of Credentials
     total_credentials = session.query(Credential).count()
@@ -37,6 +37,13 @@ def info():
     # Count total number of Mnemonics
     total_mnemonics = session.query(Mnemonic).count()
 
+    if not output_utils.is_rich():
+        # A single record: the vault and its counts
+        output_utils.emit({**vault.record(), 'credentials': total_credentials, 'mnemonics': total_mnemonics})
+        return
+
+    vault.print_on_screen()
+
     # Print total number of credentials
     console.print(Panel(f"Total number of credentials: [bold]{total_credentials}[/bold]", title="Credentials", style="cyan"))
 
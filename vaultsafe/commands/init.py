@@ -11,9 +11,9 @@ from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 
-from vaultsafe.db.models import Base, engine, session, Vault
+from vaultsafe.db.models import Base, get_engine, session, Vault
+from vaultsafe.db.migrations import upgrade
 from vaultsafe.utils.auth_utils import get_password
-from vaultsafe.utils.crypto_utils import derive_vault_key
 from vaultsafe.utils.cli_utils import print_basic_info
 from vaultsafe.config import DATABASE_PATH, DOT_VAULTSAFE_DIR
 
@@ -45,7 +45,9 @@ def init_db():
     if not DATABASE_PATH.exists():
         # Create database and tables if they don't exist
         DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        engine = get_engine()
         Base.metadata.create_all(engine)
+        upgrade(engine)  # Records the schema version
 
         console.rule("[bold cyan]Password Vault Initialization[/bold cyan]")
         console.print("\n")
@@ -72,8 +74,9 @@ def init_db():
         # Set the sha256 hash value of `master_key`
         vault.set_master_password_hash(master_password=master_passwd)
 
-        # Derive `vault_key` from the `master_key`
-        vault_key = derive_vault_key(master_key=master_passwd)
+        # Derive `vault_key` from the `master_key` (with a fresh salt)
+        vault.set_kdf()
+        vault_key = vault.derive_key(master_passwd)
 
         # TODO: Generate session token and save it to the session.
 
@@ -0,0 +1,99 @@
+# This script handles the kdf-benchmark command.
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import click
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+
+from vaultsafe.db.models import session, Vault
+from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
+from vaultsafe.utils.rotation_utils import start_rotation
+from vaultsafe.utils.kdf_utils import available_kdfs, calibrate, dump_params, DEFAULT_KDF
+from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
+from vaultsafe.commands.change_master_passwd import rotate_with_progress
+
+console = Console()
+
+@click.command()
+@click.option('-a', '--algorithm', type=click.Choice(['pbkdf2-sha256', 'scrypt', 'argon2id']),
+              help='Benchmark only this key derivation function.')
+@click.option('-t', '--target', default=500, show_default=True, help='Target unlock time in milliseconds.')
+@click.option('--apply', is_flag=True, help='Use the calibrated parameters for the vault (re-wraps the credential keys).')
+def kdf_benchmark(algorithm, target, apply):
+    """
+    Calibrate the key derivation function to a target unlock time.
+
+    The vault key is derived from the master password with a deliberately slow
+    key derivation function (KDF). This command measures the KDFs available
+    on this machine and finds the parameters for which one derivation takes
+    about the target time. A slower KDF makes guessing the master password
+    harder but every unlock slower.
+
+    With --apply the vault switches to the calibrated parameters (with a fresh
+    salt): the master password is asked for, a new vault key is derived and the
+    key of every credential is re-encrypted with it.
+
+    Options:
+        -a, --algorithm (str): 'pbkdf2-sha256', 'scrypt' or 'argon2id' (needs argon2-cffi).
+        -t, --target (int): Target unlock time in milliseconds. Default is 500.
+        --apply: Use the calibrated parameters for the vault.
+
+    Examples:
+        \b
+        $ vaultsafe kdf-benchmark
+        $ vaultsafe kdf-benchmark -a scrypt -t 1000 --apply
+    """
+    print_basic_info()
+    console.rule("KDF Benchmark")
+
+    kdfs = available_kdfs()
+    if algorithm and algorithm not in kdfs:
+        console.print(f"[bold red]Error:[/bold red] '{algorithm}' is not available. Install argon2-cffi to use it.")
+        return
+
+    if apply and not algorithm:
+        algorithm = DEFAULT_KDF
+
+    table = Table(title=f"Parameters for a {target} ms unlock")
+    table.add_column("KDF", style="cyan")
+    table.add_column("Parameters", style="magenta")
+    table.add_column("Measured (ms)", justify="right")
+
+    results = {}
+    capped = []
+    with console.status("Measuring..."):
+        for name in ([algorithm] if algorithm else kdfs):
+            params, elapsed, reached_max = calibrate(name, target / 1000)
+            results[name] = params
+            if reached_max:
+                capped.append(name)
+            table.add_row(name, dump_params(params), f"{elapsed * 1000:.0f}" + (" (max)" if reached_max else ""))
+
+    console.print(table)
+    for name in capped:
+        console.print(f"[bold yellow]Note:[/bold yellow] {name} reached its largest allowed cost "
+                      "and is faster than the target on this machine.")
+
+    if apply:
+        assert_db_init()
+        apply_kdf(algorithm, results[algorithm])
+
+
+def apply_kdf(algorithm, params):
+    """Switch the vault to a new KDF and re-wrap the credential keys."""
+    master_passwd = input_master_passwd_and_verify()
+
+    vault = session.query(Vault).first()
+    if vault.rotation_state:
+        console.print("[bold red]Error:[/bold red] A master password change is in progress. "
+                      "Finish it (or abort it) with `vaultsafe change-master-password` first.")
+        return
+    old_vault_key = vault.derive_key(master_passwd)
+
+    # Same master password, new KDF (and salt): a rotation of the vault key
+    new_vault_key = start_rotation(vault, master_passwd, algorithm, params)
+    count = rotate_with_progress(vault, old_vault_key, new_vault_key)
+
+    console.print(Panel(f"[bold green]The vault now uses {algorithm} {dump_params(params)}. {count} credential keys re-wrapped.[/bold green]", border_style="green"))
@@ -8,9 +8,8 @@ import click
 from rich.console import Console
 from rich.prompt import Prompt
 
-from vaultsafe.db.models import session, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify
-from vaultsafe.utils.crypto_utils import derive_vault_key, decrypt
+from vaultsafe.db.models import session, Credential, Mnemonic
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
 
 console = Console()
@@ -36,11 +35,8 @@ def open(mnemonic):
     
     console.rule("Open Credential in Browser")
     
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
-    
-    # Derive the vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
 
     # Take the mnemonic if not given
     mnemonic = Prompt.ask("Enter the mnemonic of the credential: ") if mnemonic is None else mnemonic
@@ -52,14 +48,12 @@ def open(mnemonic):
         
     # Get the credential associated with the mnemonic
     credential = mnemonic_entry.credential
+    credential_data = credential.decrypted(vault_key)
     console.print("\n")
-    credential.print_on_screen(vault_key)
+    Credential._print_on_screen(credential_data)
 
-    
+    # The url was decrypted for printing already
     if credential.url:
-        cred_key = credential.get_decrypted_key(vault_key)
-        url_decrypted = decrypt(credential.url, cred_key)
-
-        webbrowser.open(url_decrypted)
+        webbrowser.open(credential_data['url'])
         
 
@@ -1,26 +1,54 @@
-# This script handles the get command.
+# This script handles the server command.
 # Author: Indrajit Ghosh
 # Created On: Jun 13, 2024
 #
-import click
+import os
+import sys
 import webbrowser
 
+import click
+from rich.console import Console
+from rich.panel import Panel
+
 from vaultsafe.config import DEFAULT_SERVER_PORT
 from vaultsafe.web import create_app
 from vaultsafe.config import Config
+from vaultsafe.utils.server_utils import parse_bind, bind_socket, serve, run_workers
+
+console = Console()
 
 @click.command()
-@click.option('--port', default=DEFAULT_SERVER_PORT, help=f'Port for the Flask server (default is {DEFAULT_SERVER_PORT})')
-def server(port):
+@click.option('--port', default=DEFAULT_SERVER_PORT, help=f'Port for the server on localhost (default is {DEFAULT_SERVER_PORT})')
+@click.option('-b', '--bind', help="Address to listen on: 'HOST:PORT' or 'unix:/path/to/socket'. Overrides --port.")
+@click.option('-w', '--workers', default=1, show_default=True, help='Number of worker processes (Unix only).')
+@click.option('-t', '--threads', default=8, show_default=True, help='Number of threads per worker.')
+@click.option('--no-api', is_flag=True, help='Do not serve the JSON API (needed for several workers).')
+@click.option('--headless', is_flag=True, help='Do not open a web browser.')
+@click.option('--dev', is_flag=True, help="Use Flask's development server instead.")
+def server(port, bind, workers, threads, no_api, headless, dev):
     """
     Run the server for VaultSafe, providing a GUI interface.
 
     To utilize the GUI, ensure you have initialized the app with:
     $ vaultsafe init
 
+    The app is served by waitress, a production WSGI server (HTTP/1.1
+    keep-alive, a pool of threads per worker). With several workers the
+    listening socket is shared by as many processes. Ctrl+C or SIGTERM stops
+    the server once the requests in progress are done.
+
+    The tokens of the JSON API are kept in the memory of the worker which
+    issued them, so several workers are only allowed with --no-api.
+
     Options:
     --port : Specifies the port for the server. Defaults to 8000.
              Use --port to specify a different port.
+    -b, --bind : 'HOST:PORT' or 'unix:/path/to/socket'.
+    -w, --workers : Number of worker processes. Defaults to 1.
+    -t, --threads : Number of threads per worker. Defaults to 8.
+    --no-api : Do not serve the JSON API.
+    --headless : Do not open a web browser.
+    --dev : Use Flask's development server.
 
     Examples:
     $ vaultsafe server
@@ -28,10 +56,57 @@ def server(port):
 
     $ vaultsafe server --port 9000
     Starts the server on port 9000.
+
+    $ vaultsafe server -b 0.0.0.0:8000 -w 4 -t 16 --no-api --headless
+    Four workers of 16 threads each, reachable from other hosts, without the API.
+
+    $ vaultsafe server -b unix:/run/vaultsafe.sock --headless
+    Listens on a Unix domain socket (e.g. behind a reverse proxy).
     """
-    app = create_app(Config)
+    if workers > 1 and not no_api:
+        raise click.UsageError(
+            "API tokens are kept in the memory of the worker which issued them: "
+            "use '--workers 1' (and more '--threads') or disable the API with '--no-api'."
+        )
+
+    app = create_app(Config, enable_api=not no_api)
+
+    if dev:
+        if not headless:
+            webbrowser.open(f"http://localhost:{port}")
+        # Start the Flask server
+        app.run(port=port)
+        return
+
+    bind = bind or f"127.0.0.1:{port}"
+    try:
+        kind, address = parse_bind(bind)
+        sock = bind_socket(bind)
+    except (ValueError, OSError) as e:
+        console.print(f"[bold red]Error:[/bold red] Cannot listen on '{bind}': {e}")
+        sys.exit(1)
+
+    if workers > 1 and not hasattr(os, 'fork'):
+        console.print("[bold yellow]Note:[/bold yellow] Several workers need os.fork(); running a single worker.")
+        workers = 1
+
+    if kind == 'tcp':
+        host, bound_port = sock.getsockname()[:2]
+        url = f"http://{'localhost' if host in ('127.0.0.1', '0.0.0.0', '::') else host}:{bound_port}"
+    else:
+        url = f"unix:{address}"
+
+    console.print(Panel(f"[bold green]Serving VaultSafe on {url} ({workers} worker(s) x {threads} threads). Press Ctrl+C to stop.[/bold green]", border_style="green"))
 
-    webbrowser.open(f"http://localhost:{port}")
+    if not headless and kind == 'tcp':
+        webbrowser.open(url)
 
-    # Start the Flask server
-    app.run(port=port)
+    try:
+        if workers > 1:
+            run_workers(app, sock, workers, threads)
+        else:
+            serve(app, sock, threads)
+    finally:
+        sock.close()
+        if kind == 'unix' and os.path.exists(address):
+            os.unlink(address)
@@ -0,0 +1,55 @@
+# This script handles the snapshot command.
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import time
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.panel import Panel
+
+from vaultsafe.utils.snapshot_utils import write_snapshot
+from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info
+from vaultsafe.config import SNAPSHOT_PATH
+
+console = Console()
+
+
+@click.command()
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), default=str(SNAPSHOT_PATH),
+              show_default=True, help="Path of the snapshot file.")
+def snapshot(output):
+    """
+    Compile the vault into a read-only snapshot file for fast lookups.
+
+    The snapshot is a compact binary file holding the credentials exactly as they
+    are encrypted in the vault, with a sorted index of the mnemonics. It is read
+    without the database: `vaultsafe get --batch --snapshot FILE` opens it
+    instantly and finds a mnemonic in microseconds, whatever the size of the vault.
+    The master password is not needed to build it; take a new snapshot after
+    changing the vault or the master password.
+
+    Options:
+        -o, --output (path): Path of the snapshot file. Default: ~/.vaultsafe/vault.snapshot
+
+    Examples:
+        \b
+        $ vaultsafe snapshot
+        $ vaultsafe snapshot -o ci/vault.snapshot
+        $ vaultsafe get --batch github aws --snapshot ci/vault.snapshot --format env
+    """
+    print_basic_info()
+    assert_db_init()
+
+    console.rule("Vault Snapshot")
+
+    start = time.perf_counter()
+    credentials, mnemonics = write_snapshot(output)
+    elapsed = time.perf_counter() - start
+
+    console.print(Panel(
+        f"Snapshot of [bold]{credentials}[/bold] credentials and [bold]{mnemonics}[/bold] mnemonics "
+        f"written to '{output}' ({Path(output).stat().st_size:,} bytes) in {elapsed:.2f}s.",
+        title="Snapshot Created", style="bold green"
+    ))
@@ -7,8 +7,10 @@ from rich.console import Console
 from rich.panel import Panel
 
 from vaultsafe.db.models import session, Credential, Mnemonic
-from vaultsafe.utils.auth_utils import input_master_passwd_and_verify, get_password
-from vaultsafe.utils.crypto_utils import derive_vault_key, encrypt, decrypt
+from vaultsafe.utils.auth_utils import input_vault_key_and_verify, get_password
+from vaultsafe.utils.crypto_utils import encrypt, decrypt
+from vaultsafe.utils.general_utils import utcnow
+from vaultsafe.utils.search_utils import index_credential
 from vaultsafe.utils.cli_utils import assert_db_init, print_basic_info, multiline_input
 
 console = Console()
@@ -79,8 +81,8 @@ def update(mnemonic, name, mnemonics, username, password, token, recovery_key, u
     
     console.rule("Update Credential")
 
-    # Take master password
-    master_passwd = input_master_passwd_and_verify()
+    # Get the vault key (from the key agent or the master password)
+    vault_key = input_vault_key_and_verify()
 
     # Query credential based on mnemonic
     credential = session.query(Credential).join(Mnemonic).filter(Mnemonic.name == mnemonic).first()
@@ -89,8 +91,6 @@ def update(mnemonic, name, mnemonics, username, password, token, recovery_key, u
         console.print(f"[yellow]Credential not found with the provided identifier '{mnemonic}'. Update operation aborted.[/yellow]")
         return
 
-    # Derive vault key
-    vault_key = derive_vault_key(master_key=master_passwd)
     credential_key = credential.get_decrypted_key(vault_key=vault_key)
 
     # Display existing values before updating
@@ -183,12 +183,20 @@ def update(mnemonic, name, mnemonics, username, password, token, recovery_key, u
             mnemonic_entry = Mnemonic(name=mnemonic, credential=credential)
             session.add(mnemonic_entry)
 
+        # The mnemonics live in their own table: mark the new version of the credential
+        credential.last_updated = utcnow()
+
 
     if notes:
         existing_notes = decrypt(credential.notes, credential_key) if credential.notes else ""
         new_notes = multiline_input(f"Existing notes:\n{existing_notes}\n\nUpdate the notes below. ([red]end with three empty lines[/red]):")
         credential.notes = encrypt(new_notes, credential_key)
 
+    # Refresh the search index if any searchable attribute changed
+    if name or username or mnemonics or notes:
+        session.flush()
+        index_credential(credential, vault_key)
+
     session.commit()
 
     console.print(Panel(f"Credential '{credential.name}' updated successfully!", title="Success", style="bold green"))
@@ -22,6 +22,9 @@ DOT_VAULTSAFE_DIR = Path.home() / '.vaultsafe' if DEV_MODE != 'on' else Path.cwd
 DATABASE_PATH = DOT_VAULTSAFE_DIR / 'vaultsafe.db'
 DATABASE_URL = f'sqlite:///{DATABASE_PATH}'
 DOT_SESSION_FILE = DOT_VAULTSAFE_DIR / '.session'
+DOT_AGENT_SOCKET = DOT_VAULTSAFE_DIR / '.agent.sock'
+DOT_IMPORT_CHECKPOINT = DOT_VAULTSAFE_DIR / '.import_checkpoint'
+SNAPSHOT_PATH = DOT_VAULTSAFE_DIR / 'vault.snapshot'
 
 # Basic information
 APP_NAME = "VaultSafe"
@@ -31,6 +34,26 @@ COPYRIGHT_STATEMENT = f"© {CURRENT_YEAR} Indrajit Ghosh. All rights reserved."
 
 # Server info
 DEFAULT_SERVER_PORT = 8000
+DASHBOARD_PAGE_SIZE = 50  # Credentials per dashboard page
+# Failed logins allowed before the backoff, and its longest delay in seconds
+AUTH_FREE_FAILURES = int(os.getenv('VAULTSAFE_AUTH_FREE_FAILURES', 5))
+AUTH_MAX_DELAY = int(os.getenv('VAULTSAFE_AUTH_MAX_DELAY', 300))
+# Decrypted credentials kept in memory by the web server (0 entries disables it)
+WEB_CACHE_MAX_ENTRIES = int(os.getenv('VAULTSAFE_WEB_CACHE_ENTRIES', 1000))
+WEB_CACHE_MAX_BYTES = int(os.getenv('VAULTSAFE_WEB_CACHE_BYTES', 4 * 1024 * 1024))
+
+# Bulk encryption/decryption (used when listing, exporting or importing the whole vault)
+CRYPTO_WORKERS = int(os.getenv('VAULTSAFE_CRYPTO_WORKERS', os.cpu_count() or 1))
+CRYPTO_POOL = os.getenv('VAULTSAFE_CRYPTO_POOL', 'thread')  # 'thread' or 'process'
+CRYPTO_CHUNK_SIZE = int(os.getenv('VAULTSAFE_CRYPTO_CHUNK_SIZE', 1000))
+IMPORT_BATCH_SIZE = int(os.getenv('VAULTSAFE_IMPORT_BATCH_SIZE', 5000))
+
+# SQLite performance profile: 'fast' or 'durable' (see `db/engine.py`)
+DB_PROFILE = os.getenv('VAULTSAFE_DB_PROFILE', 'fast')
+
+# Connections kept open by the engine (the web server uses one per request thread)
+DB_POOL_SIZE = int(os.getenv('VAULTSAFE_DB_POOL_SIZE', 8))
+DB_MAX_OVERFLOW = int(os.getenv('VAULTSAFE_DB_MAX_OVERFLOW', 32))
 
 class Config:
     SECRET_KEY = 'a_hard_to_guess_string'
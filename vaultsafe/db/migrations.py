@@ -0,0 +1,133 @@
+# migrations.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Schema migrations for the vault database.
+#
+# The version of the schema is kept in the `schema_version` table. Every
+# migration is a function taking a connection, registered in MIGRATIONS in
+# order; `upgrade()` applies the ones which are newer than the database, each
+# in its own transaction together with the version bump. Migrations are
+# written in plain SQL (not from the models, which keep changing) and are
+# idempotent, so that databases created by `Base.metadata.create_all()` can be
+# upgraded too.
+#
+from sqlalchemy import inspect
+
+
+def _add_search_token_table(conn):
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS search_token ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "token VARCHAR NOT NULL, "
+        "credential_id INTEGER NOT NULL REFERENCES credential (id))"
+    )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_search_token_credential_id ON search_token (credential_id)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_search_token_token_credential_id ON search_token (token, credential_id)")
+
+
+def _add_vault_kdf_columns(conn):
+    columns = {column['name'] for column in inspect(conn).get_columns('vault')}
+    for column, type_ in (('kdf_algorithm', 'VARCHAR'), ('kdf_params', 'TEXT'), ('kdf_salt', 'VARCHAR')):
+        if column not in columns:
+            conn.exec_driver_sql(f"ALTER TABLE vault ADD COLUMN {column} {type_}")
+
+
+def _add_lookup_indexes(conn):
+    # A unique index cannot be built over duplicates; give those a new uuid
+    duplicates = conn.exec_driver_sql(
+        "SELECT id FROM credential WHERE id NOT IN (SELECT MIN(id) FROM credential GROUP BY uuid)"
+    ).scalars().all()
+    for id in duplicates:
+        conn.exec_driver_sql("UPDATE credential SET uuid = lower(hex(randomblob(16))) WHERE id = ?", (id,))
+
+    conn.exec_driver_sql("CREATE UNIQUE INDEX IF NOT EXISTS ix_credential_uuid ON credential (uuid)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_credential_name ON credential (name)")
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_mnemonic_credential_id ON mnemonic (credential_id)")
+
+
+def _add_key_version_columns(conn):
+    vault_columns = {column['name'] for column in inspect(conn).get_columns('vault')}
+    if 'key_version' not in vault_columns:
+        conn.exec_driver_sql("ALTER TABLE vault ADD COLUMN key_version INTEGER NOT NULL DEFAULT 1")
+    if 'rotation_state' not in vault_columns:
+        conn.exec_driver_sql("ALTER TABLE vault ADD COLUMN rotation_state TEXT")
+
+    credential_columns = {column['name'] for column in inspect(conn).get_columns('credential')}
+    if 'key_version' not in credential_columns:
+        conn.exec_driver_sql("ALTER TABLE credential ADD COLUMN key_version INTEGER NOT NULL DEFAULT 1")
+    if 'next_encrypted_key' not in credential_columns:
+        conn.exec_driver_sql("ALTER TABLE credential ADD COLUMN next_encrypted_key VARCHAR")
+
+
+def _add_next_search_token_table(conn):
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS next_search_token ("
+        "id INTEGER NOT NULL PRIMARY KEY, "
+        "token VARCHAR NOT NULL, "
+        "key_version INTEGER NOT NULL, "
+        "credential_id INTEGER NOT NULL REFERENCES credential (id))"
+    )
+    conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_next_search_token_credential_id ON next_search_token (credential_id)")
+
+
+def _add_search_index_pending_column(conn):
+    columns = {column['name'] for column in inspect(conn).get_columns('vault')}
+    if 'search_index_pending' not in columns:
+        conn.exec_driver_sql("ALTER TABLE vault ADD COLUMN search_index_pending BOOLEAN NOT NULL DEFAULT 0")
+    # Credentials without any entry (not even the marker) were never indexed
+    conn.exec_driver_sql(
+        "UPDATE vault SET search_index_pending = 1 WHERE EXISTS ("
+        "SELECT 1 FROM credential WHERE NOT EXISTS ("
+        "SELECT 1 FROM search_token WHERE search_token.credential_id = credential.id))"
+    )
+
+
+# (version, description, migration), in order
+MIGRATIONS = [
+    (1, "Search index table", _add_search_token_table),
+    (2, "Key derivation settings of the vault", _add_vault_kdf_columns),
+    (3, "Indexes on credential.uuid, credential.name and mnemonic.credential_id", _add_lookup_indexes),
+    (4, "Key versions for resumable vault key rotation", _add_key_version_columns),
+    (5, "Search index staged during a vault key rotation", _add_next_search_token_table),
+    (6, "Vault flag of the credentials missing from the search index", _add_search_index_pending_column),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """
+    Returns:
+        int: The version of the schema, 0 for a database never migrated.
+    """
+    conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+    version = conn.exec_driver_sql("SELECT MAX(version) FROM schema_version").scalar()
+    return version or 0
+
+
+def upgrade(engine):
+    """
+    Bring the database up to the latest schema.
+
+    Args:
+        engine: The engine of an initialized vault database.
+
+    Returns:
+        list: The versions which were applied.
+    """
+    with engine.begin() as conn:
+        version = get_schema_version(conn)
+        if version >= LATEST_VERSION or not inspect(conn).has_table('vault'):
+            return []
+
+    applied = []
+    for step_version, _, migration in MIGRATIONS:
+        if step_version <= version:
+            continue
+        with engine.begin() as conn:
+            migration(conn)
+            conn.exec_driver_sql("DELETE FROM schema_version")
+            conn.exec_driver_sql("INSERT INTO schema_version (version) VALUES (?)", (step_version,))
+        applied.append(step_version)
+    return applied
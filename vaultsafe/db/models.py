@@ -2,25 +2,32 @@
 # Author: Indrajit Ghosh
 # Created On: Jun 12, 2024
 #
+import json
 import getpass
 import uuid
 import socket
 from datetime import datetime
+from collections.abc import Mapping
 
 import pyperclip
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Boolean, Index, select, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 
-from vaultsafe.utils.crypto_utils import sha256_hash, decrypt, generate_session_secret_key
+from vaultsafe.utils.crypto_utils import sha256_hash, decrypt, get_fernet, new_fernet, generate_session_secret_key, derive_vault_key
+from vaultsafe.utils.kdf_utils import DEFAULT_KDF, DEFAULT_KDF_PARAMS, derive_key, generate_salt, dump_params, load_params
 from vaultsafe.utils.general_utils import utcnow, convert_utc_to_local_str
+from vaultsafe.utils.profile_utils import span, timed
+from vaultsafe.utils import output_utils
 from vaultsafe.commands.generate_strong_passwd import generate_strong_password
-from vaultsafe.config import DATABASE_URL
+from vaultsafe.db.engine import create_vault_engine
+from vaultsafe.db.migrations import upgrade
+from vaultsafe.config import DATABASE_PATH, DB_POOL_SIZE, DB_MAX_OVERFLOW
 
 Base = declarative_base()
 
@@ -42,6 +49,104 @@ class Vault(Base):
     session_salt = Column(String, nullable=False, default=generate_strong_password)
     session_expiration = Column(Integer, nullable=False, default=3 * 3600)
 
+    # Key derivation (see `utils/kdf_utils.py`). Vaults created before these
+    # columns existed have them NULL and use the legacy `derive_vault_key()`.
+    kdf_algorithm = Column(String)
+    kdf_params = Column(Text)
+    kdf_salt = Column(String)
+
+    # Version of the vault key, incremented by every rotation (new master password
+    # or KDF), and the settings of the next key while a rotation is in progress
+    # (see `utils/rotation_utils.py`)
+    key_version = Column(Integer, nullable=False, default=1)
+    rotation_state = Column(Text)
+
+    # Set while some credentials are missing from the search index (e.g. those of
+    # a vault made before the index existed), which the next search indexes
+    search_index_pending = Column(Boolean, nullable=False, default=False)
+
+    def set_kdf(self, algorithm: str = DEFAULT_KDF, params: dict = None):
+        """
+        Choose the key derivation function of the vault, with a new random salt.
+        The vault key changes, so the credential keys must be re-wrapped by the caller.
+
+        Args:
+            algorithm (str): One of `kdf_utils.available_kdfs()`.
+            params (dict, optional): Parameters of the KDF. Defaults to `DEFAULT_KDF_PARAMS[algorithm]`.
+        """
+        self.kdf_algorithm = algorithm
+        self.kdf_params = dump_params(params or DEFAULT_KDF_PARAMS[algorithm])
+        self.kdf_salt = generate_salt()
+
+    def derive_key(self, master_password: str):
+        """
+        Derives the vault key from the master password with the KDF of this vault.
+
+        Returns:
+            bytes: The vault key.
+        """
+        if self.kdf_algorithm is None:
+            return derive_vault_key(master_key=master_password)
+        return derive_key(master_password, self.kdf_algorithm, load_params(self.kdf_params), self.kdf_salt)
+
+    def begin_rotation(self, master_password: str, algorithm: str = None, params: dict = None):
+        """
+        Record the settings of a new vault key in `rotation_state`. The vault keeps
+        its current key (and master password) until `finish_rotation()`.
+
+        Args:
+            master_password (str): The (new) master password.
+            algorithm (str, optional): The KDF of the new key. Defaults to the current
+                one (with its parameters), or `DEFAULT_KDF` for legacy vaults.
+            params (dict, optional): Parameters of the KDF.
+
+        Returns:
+            bytes: The new vault key.
+        """
+        if algorithm is None and self.kdf_algorithm:
+            algorithm, params = self.kdf_algorithm, params or load_params(self.kdf_params)
+        algorithm = algorithm or DEFAULT_KDF
+        params = params or DEFAULT_KDF_PARAMS[algorithm]
+        kdf_salt = generate_salt()
+        new_vault_key = derive_key(master_password, algorithm, params, kdf_salt)
+
+        password_salt = generate_strong_password(25)
+        self.rotation_state = json.dumps({
+            'key_version': self.key_version + 1,
+            'kdf_algorithm': algorithm,
+            'kdf_params': dump_params(params),
+            'kdf_salt': kdf_salt,
+            'vault_key_hash': sha256_hash(new_vault_key),
+            'password_salt': password_salt,
+            'master_password_hash': sha256_hash(master_password + password_salt),
+        })
+        return new_vault_key
+
+    def rotation_key(self, master_password: str):
+        """
+        Derives the key of the rotation in progress from its master password.
+
+        Returns:
+            bytes: The new vault key, or None if the password is not the one of the rotation.
+        """
+        state = json.loads(self.rotation_state)
+        if sha256_hash(master_password + state['password_salt']) != state['master_password_hash']:
+            return None
+        return derive_key(master_password, state['kdf_algorithm'], load_params(state['kdf_params']), state['kdf_salt'])
+
+    @property
+    def rotation_key_version(self):
+        """The key version of the rotation in progress, or None."""
+        return json.loads(self.rotation_state)['key_version'] if self.rotation_state else None
+
+    def finish_rotation(self):
+        """Switch the vault to the key recorded by `begin_rotation()`."""
+        state = json.loads(self.rotation_state)
+        for attr in ('key_version', 'kdf_algorithm', 'kdf_params', 'kdf_salt',
+                     'vault_key_hash', 'password_salt', 'master_password_hash'):
+            setattr(self, attr, state[attr])
+        self.rotation_state = None
+
     def set_vault_key_hash(self, vault_key):
         """
         Sets the vault key hash from the provided vault key.
@@ -61,6 +166,7 @@ class Vault(Base):
         self.password_salt = generate_strong_password(25)
         self.master_password_hash = sha256_hash(master_password + self.password_salt)
 
+    @timed('auth.check_password')
     def check_password(self, raw_password: str):
         """Checks whether the password is correct"""
         if sha256_hash(raw_password + self.password_salt) == self.master_password_hash:
@@ -86,13 +192,41 @@ class Vault(Base):
             "last_updated": self.last_updated.isoformat(),
             "owner_name": self.owner_name,
             "owner_email": self.owner_email,
-            "session_expiration": self.session_expiration
+            "session_expiration": self.session_expiration,
+            "kdf_algorithm": self.kdf_algorithm,
+            "kdf_params": self.kdf_params,
+            "key_version": self.key_version
         }
     
+    def record(self):
+        """The fields shown by `print_on_screen()`, as one record of the plain/json output."""
+        return {
+            "id": self.id,
+            "uuid": self.uuid,
+            "name": self.name,
+            "owner_name": self.owner_name,
+            "owner_email": self.owner_email,
+            "date_created": self.date_created.isoformat(),
+            "last_updated": self.last_updated.isoformat(),
+            "vault_key_hash": self.vault_key_hash,
+            "master_password_hash": self.master_password_hash,
+            "kdf_algorithm": self.kdf_algorithm or "pbkdf2-sha256 (legacy)",
+            "kdf_params": self.kdf_params,
+            "key_version": self.key_version,
+            "rotation_in_progress": bool(self.rotation_state),
+            "session_check": self.session_check,
+            "session_expiration": self.session_expiration if self.session_check else None,
+        }
+
     def print_on_screen(self):
         """
         Prints the Vault information on the terminal screen in a professional CLI app style using rich library.
+        In the plain/json output mode it is written as a single record instead.
         """
+        if not output_utils.is_rich():
+            output_utils.emit(self.record())
+            return
+
         console = Console()
 
         table = Table(title="Vault Details", title_style="bold cyan", style="bright_blue")
@@ -108,6 +242,8 @@ class Vault(Base):
         table.add_row("Last Updated", convert_utc_to_local_str(self.last_updated))
         table.add_row("Vault Key Hash", self.vault_key_hash)
         table.add_row("Master Password Hash", self.master_password_hash)
+        table.add_row("Key Derivation", f"{self.kdf_algorithm} {self.kdf_params}" if self.kdf_algorithm else "pbkdf2-sha256 (legacy)")
+        table.add_row("Key Version", str(self.key_version) + (" (rotation in progress)" if self.rotation_state else ""))
         table.add_row("Session Check", str(self.session_check))
         if self.session_check:
             table.add_row("Session Expiration (in sec)", str(self.session_expiration))
@@ -120,7 +256,7 @@ class Mnemonic(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
 
-    credential_id = Column(Integer, ForeignKey('credential.id'))
+    credential_id = Column(Integer, ForeignKey('credential.id'), index=True)
     credential = relationship('Credential', back_populates='mnemonics')
 
     def __str__(self):
@@ -130,11 +266,17 @@ class Credential(Base):
     __tablename__ = 'credential'
     NONE_STR = "Not Provided"
     DEFAULT_ENCRYPTION_ALGO = "Fernet"
+    ENCRYPTED_FIELDS = (
+        'url', 'username', 'password', 'recovery_key',
+        'primary_email', 'secondary_email', 'token', 'notes'
+    )
+    # Never shown on screen, only copied
+    SECRET_FIELDS = ('password', 'recovery_key', 'token')
 
     id = Column(Integer, primary_key=True)
-    uuid = Column(String, default=lambda: uuid.uuid4().hex)  # Optional, defaults to a generated UUID
+    uuid = Column(String, default=lambda: uuid.uuid4().hex, unique=True, index=True)  # Optional, defaults to a generated UUID
 
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     url = Column(String, nullable=True)
     username = Column(String, nullable=True)
     password = Column(String, nullable=True)
@@ -152,7 +294,15 @@ class Credential(Base):
     encrypted_key = Column(String, nullable=False)
     encryption_algorithm = Column(String, default=DEFAULT_ENCRYPTION_ALGO)
 
+    # Version of the vault key wrapping `encrypted_key` (new credentials get the
+    # current one), and the key wrapped with the next vault key during a rotation
+    key_version = Column(Integer, nullable=False,
+                         default=select(func.coalesce(func.max(Vault.key_version), 1)).scalar_subquery())
+    next_encrypted_key = Column(String)
+
     mnemonics = relationship('Mnemonic', back_populates='credential', cascade='all, delete-orphan')
+    search_tokens = relationship('SearchToken', back_populates='credential', cascade='all, delete-orphan')
+    next_search_tokens = relationship('NextSearchToken', cascade='all, delete-orphan')
 
     def __str__(self):
         url_str = self._get_none_or_encrypted_str(self.url)
@@ -185,8 +335,15 @@ class Credential(Base):
 
         Returns (bytes): decrypted_key
         """
-        return decrypt(self.encrypted_key, vault_key)
+        return decrypt(self.encrypted_key, get_fernet(vault_key))
     
+    def decrypted(self, vault_key):
+        """
+        Returns a DecryptedCredential, which decrypts each field only when it is read.
+        Prefer it to `json(vault_key)` when not every field is needed.
+        """
+        return DecryptedCredential(self, vault_key)
+
     def json(self, vault_key=None):
         """
         Returns a JSON representation of the object, with optional decryption of attributes.
@@ -205,8 +362,8 @@ class Credential(Base):
 
         decrypted_data = {}
         if vault_key:
-            # Get the decrypted_key
-            credential_key = self.get_decrypted_key(vault_key=vault_key)
+            # Get the decrypted_key (one cipher is reused for all the attributes)
+            credential_key = new_fernet(self.get_decrypted_key(vault_key=vault_key))
 
             decrypted_data = {
                 'url': decrypt_attr(self.url, credential_key),
@@ -241,10 +398,83 @@ class Credential(Base):
             "date_created": self.date_created.isoformat(),
             "last_updated": self.last_updated.isoformat()
         }
-            
+
+    def decrypt_fields(self, vault_key, fields):
+        """
+        Decrypts only the given encrypted attributes. The credential key is
+        unwrapped only if one of them is set.
+
+        Args:
+            vault_key (bytes or Fernet): The vault key.
+            fields (iterable): Names from `ENCRYPTED_FIELDS`.
+
+        Returns:
+            dict: field -> decrypted value, or None if the attribute is not set.
+        """
+        credential_key = None
+        data = {}
+        for field in fields:
+            value = getattr(self, field)
+            if value and credential_key is None:
+                credential_key = new_fernet(self.get_decrypted_key(vault_key))
+            data[field] = decrypt(value, credential_key) if value else None
+        return data
+
+    @classmethod
+    def decrypt_json(cls, credential_data: dict, vault_key, fields=None):
+        """
+        Decrypts the attributes of an (encrypted) JSON representation, i.e. the output of
+        `json()` without a `vault_key`. `credential.json(vault_key)` and
+        `Credential.decrypt_json(credential.json(), vault_key)` give the same result, but
+        the latter works on plain dicts and so can run in another thread or process.
+
+        Args:
+            credential_data (dict): Output of `json()` without a `vault_key`.
+            vault_key (bytes): Key used to decrypt the attributes.
+            fields (iterable, optional): The attributes to decrypt (default: all of
+                `ENCRYPTED_FIELDS`); the others are left encrypted.
+
+        Returns:
+            dict: A new dictionary with the attributes decrypted.
+        """
+        credential_key = new_fernet(decrypt(credential_data['encrypted_key'].encode(), get_fernet(vault_key)))
+
+        decrypted_data = dict(credential_data)
+        for field in fields or cls.ENCRYPTED_FIELDS:
+            value = credential_data[field]
+            if value != cls.NONE_STR:
+                decrypted_data[field] = decrypt(value.encode(), credential_key)
+
+        return decrypted_data
     
     def print_on_screen(self, vault_key, **kwargs):
-        self._print_on_screen(credential_data=self.json(vault_key), **kwargs)
+        self._print_on_screen(credential_data=self.decrypted(vault_key), **kwargs)
+
+    @staticmethod
+    def record(credential_data):
+        """
+        The fields shown by `_print_on_screen()`, as one record of the plain/json output.
+
+        As on screen, the secrets (password, recovery key, token) are not
+        included: they are '[encrypted]' if set (use `get --batch` to read them).
+        Unset fields are None and the dates are in UTC (ISO 8601).
+        """
+        record = {
+            'id': credential_data.get('id'),
+            'uuid': credential_data.get('uuid'),
+            'name': credential_data.get('name'),
+        }
+        for field in Credential.ENCRYPTED_FIELDS:
+            if not is_set(credential_data, field):
+                record[field] = None
+            elif field in Credential.SECRET_FIELDS:
+                record[field] = '[encrypted]'
+            else:
+                record[field] = credential_data.get(field)
+        record['mnemonics'] = list(credential_data.get('mnemonics') or ())
+        record['date_created'] = credential_data.get('date_created')
+        record['last_updated'] = credential_data.get('last_updated')
+        return record
     
     @staticmethod
     def _print_on_screen(credential_data, copy_to_clipboard:bool=True, count:int=None):
@@ -252,9 +482,17 @@ class Credential(Base):
         Prints the relevant info related to the Credential on the terminal screen for the user.
 
         Parameters:
-        credential_data (dict): The dictionary containing credential information.
+        credential_data (dict or DecryptedCredential): The credential information. The secrets
+            (password, recovery key, token) are only read from it if they get copied.
         copy_to_clipboard (bool): If True then the 'password' will be copied to the clipboard.
+
+        In the plain/json output mode the credential is written as a single
+        record (see `record()`) and nothing is copied.
         """
+        if not output_utils.is_rich():
+            output_utils.emit(Credential.record(credential_data))
+            return
+
         console = Console()
 
         count = "(" + str(count) + ") " if count else ''
@@ -264,15 +502,12 @@ class Credential(Base):
         name = credential_data.get('name')
         url = credential_data.get('url')
         username = credential_data.get('username')
-        password = credential_data.get('password')
-        password_display = '\\[encrypted]' if password != Credential.NONE_STR else password
-        recovery_key = credential_data.get('recovery_key')
-        recovery_key_display = '\\[encrypted]' if recovery_key != Credential.NONE_STR else recovery_key
+        password_display = '\\[encrypted]' if is_set(credential_data, 'password') else Credential.NONE_STR
+        recovery_key_display = '\\[encrypted]' if is_set(credential_data, 'recovery_key') else Credential.NONE_STR
 
         primary_email = credential_data.get('primary_email')
         secondary_email = credential_data.get('secondary_email')
-        token = credential_data.get('token')
-        token_display = '\\[encrypted]' if token != Credential.NONE_STR else token
+        token_display = '\\[encrypted]' if is_set(credential_data, 'token') else Credential.NONE_STR
         notes = credential_data.get('notes')
         mnemonics:list = credential_data.get('mnemonics')
 
@@ -306,10 +541,13 @@ class Credential(Base):
 
         panel = Panel(table, title=count + name, title_align="left", border_style="bold magenta")
 
-        console.print(panel)
+        with span('render'):
+            console.print(panel)
 
-        if copy_to_clipboard and password != Credential.NONE_STR:
-            pyperclip.copy(password)
+        if copy_to_clipboard and is_set(credential_data, 'password'):
+            password = credential_data['password']
+            with span('clipboard'):
+                pyperclip.copy(password)
 
     
     @staticmethod
@@ -317,8 +555,134 @@ class Credential(Base):
         return 'None' if text is None else '[encrypted]'
 
 
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
+class DecryptedCredential(Mapping):
+    """
+    A read only, decrypted view of a Credential with the same keys as
+    `credential.json(vault_key)`.
+
+    Nothing is decrypted up front: an encrypted field is decrypted the first
+    time it is read (`view['password']` or `view.password`) and then kept. The
+    credential key is unwrapped on the first such read, and only then.
+    """
+    KEYS = (
+        'id', 'uuid', 'name', *Credential.ENCRYPTED_FIELDS,
+        'mnemonics', 'encrypted_key', 'encryption_algorithm', 'date_created', 'last_updated'
+    )
+
+    def __init__(self, credential, vault_key):
+        self._credential = credential
+        self._vault_key = vault_key
+        self._credential_key = None
+        self._values = {}
+
+    def is_set(self, field: str):
+        """Whether an (encrypted) field has a value, without decrypting it."""
+        return bool(getattr(self._credential, field))
+
+    def _load(self, key):
+        credential = self._credential
+        if key in Credential.ENCRYPTED_FIELDS:
+            value = getattr(credential, key)
+            if not value:
+                return Credential.NONE_STR
+            if self._credential_key is None:
+                self._credential_key = new_fernet(credential.get_decrypted_key(self._vault_key))
+            return decrypt(value, self._credential_key)
+        if key == 'mnemonics':
+            return [mn.name for mn in credential.mnemonics]
+        if key == 'encrypted_key':
+            return credential.encrypted_key.decode()
+        if key in ('date_created', 'last_updated'):
+            return getattr(credential, key).isoformat()
+        return getattr(credential, key)
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            if key not in self.KEYS:
+                raise KeyError(key)
+            self._values[key] = self._load(key)
+        return self._values[key]
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"DecryptedCredential(uuid={self._credential.uuid}, decrypted={sorted(self._values)})"
+
+
+def is_set(credential_data, field: str):
+    """Whether `field` has a value in a DecryptedCredential or a `json()` dict."""
+    if isinstance(credential_data, DecryptedCredential):
+        return credential_data.is_set(field)
+    return credential_data.get(field) != Credential.NONE_STR
+
+
+class SearchToken(Base):
+    """
+    Blind index used by `get --search`. Each row holds a keyed HMAC (derived from
+    the vault key) of a word or trigram found in a credential, so that searching
+    never needs the plaintext nor a scan of the encrypted columns.
+    """
+    __tablename__ = 'search_token'
+    __table_args__ = (
+        Index('ix_search_token_token_credential_id', 'token', 'credential_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    token = Column(String, nullable=False)
+
+    credential_id = Column(Integer, ForeignKey('credential.id'), nullable=False, index=True)
+    credential = relationship('Credential', back_populates='search_tokens')
+
+
+class NextSearchToken(Base):
+    """
+    The search index under the vault key of a rotation in progress (version
+    `key_version`). Its rows are written with `credential.next_encrypted_key`
+    and replace the `search_token` rows when the rotation finishes.
+    """
+    __tablename__ = 'next_search_token'
+
+    id = Column(Integer, primary_key=True)
+    token = Column(String, nullable=False)
+    key_version = Column(Integer, nullable=False)
+
+    credential_id = Column(Integer, ForeignKey('credential.id'), nullable=False, index=True)
+
+
+_engine = None
+
+def get_engine():
+    """
+    Returns the engine of the vault database, creating it on first use so that
+    commands which never touch the database do not pay for it.
+    """
+    global _engine
+    if _engine is None:
+        # One connection per thread, shared through a pool
+        _engine = create_vault_engine(
+            poolclass=QueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            connect_args={'check_same_thread': False},
+        )
+
+        # Bring vaults created by older versions up to date
+        if DATABASE_PATH.exists():
+            upgrade(_engine)
+    return _engine
+
+Session = sessionmaker()
 
-# Create a session
-session = Session()
+# The session (and the engine behind it) is created on first use. Each thread
+# gets its own session; the web app removes it at the end of every request.
+session = scoped_session(lambda: Session(bind=get_engine()))
@@ -0,0 +1,205 @@
+# /utils/agent_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# A tiny ssh-agent like daemon that keeps the derived `vault_key` in memory
+# behind a Unix domain socket, so that commands do not have to run the KDF
+# again on every invocation.
+#
+# Protocol (one line per request and one line per response):
+#   GET    -> the vault key (empty line if not available)
+#   STATUS -> 'OK <seconds left>'
+#   STOP   -> 'OK' and the agent exits
+#
+import os
+import socket
+import struct
+import time
+
+from vaultsafe.utils.profile_utils import timed
+from vaultsafe.utils.crypto_utils import clear_fernet_cache
+from vaultsafe.config import DOT_AGENT_SOCKET
+
+AGENT_TIMEOUT = 2  # Seconds to wait on a single socket operation
+MAX_LINE_LENGTH = 4096
+
+
+def agent_supported():
+    """Checks whether Unix domain sockets are available on this platform."""
+    return hasattr(socket, 'AF_UNIX')
+
+
+def _recv_line(conn):
+    """Read a single newline terminated line from the socket."""
+    data = b''
+    while not data.endswith(b'\n') and len(data) < MAX_LINE_LENGTH:
+        chunk = conn.recv(1024)
+        if not chunk:
+            break
+        data += chunk
+    return data.strip().decode()
+
+
+def _peer_is_owner(conn):
+    """
+    Makes sure that the peer process belongs to the same user. This only
+    works where `SO_PEERCRED` is available (Linux); elsewhere the socket
+    file permissions (0600) are the only guard.
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', creds)
+    return uid == os.getuid()
+
+
+def agent_request(command: str, socket_path=DOT_AGENT_SOCKET):
+    """
+    Send a request to the running agent.
+
+    Args:
+        command (str): One of 'GET', 'STATUS' or 'STOP'.
+        socket_path (Path): Path of the agent socket.
+
+    Returns:
+        str: The response line, or None if no agent is reachable.
+    """
+    if not agent_supported() or not socket_path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(AGENT_TIMEOUT)
+            sock.connect(str(socket_path))
+            sock.sendall(command.encode() + b'\n')
+            return _recv_line(sock)
+    except OSError:
+        return None
+
+
+@timed('auth.agent')
+def get_vault_key_from_agent():
+    """
+    Ask the running agent for the `vault_key`.
+
+    Returns:
+        bytes: The vault key, or None if no agent is running.
+    """
+    response = agent_request('GET')
+    return response.encode() if response else None
+
+
+def agent_status():
+    """
+    Returns:
+        int: Seconds left before the agent forgets the key, or None if no agent is running.
+    """
+    response = agent_request('STATUS')
+    if response and response.startswith('OK '):
+        return int(response.split()[1])
+    return None
+
+
+def stop_agent():
+    """Stop the running agent (if any). Returns True if an agent was stopped."""
+    return agent_request('STOP') == 'OK'
+
+
+def serve_agent(vault_key: bytes, ttl: int, socket_path=DOT_AGENT_SOCKET):
+    """
+    Serve the `vault_key` on a Unix domain socket until `ttl` seconds have
+    passed or a 'STOP' request is received.
+
+    Args:
+        vault_key (bytes): The derived vault key to hold in memory.
+        ttl (int): Lifetime of the agent in seconds.
+        socket_path (Path): Path of the agent socket.
+    """
+    expires_at = time.monotonic() + ttl
+
+    if socket_path.exists():
+        socket_path.unlink()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    # Only the owner should be able to talk to the agent
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(str(socket_path))
+    finally:
+        os.umask(old_umask)
+
+    server.listen(16)
+
+    try:
+        while True:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                break
+
+            server.settimeout(remaining)
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+
+            with conn:
+                try:
+                    conn.settimeout(AGENT_TIMEOUT)
+                    if not _peer_is_owner(conn):
+                        continue
+
+                    request = _recv_line(conn)
+                    if request == 'GET':
+                        conn.sendall(vault_key + b'\n')
+                    elif request == 'STATUS':
+                        conn.sendall(f"OK {int(remaining)}\n".encode())
+                    elif request == 'STOP':
+                        conn.sendall(b'OK\n')
+                        break
+                    else:
+                        conn.sendall(b'ERR\n')
+                except OSError:
+                    continue
+    finally:
+        server.close()
+        if socket_path.exists():
+            socket_path.unlink()
+        clear_fernet_cache()
+
+
+def daemonize():
+    """
+    Detach the current process from the terminal (double fork).
+
+    Returns:
+        int: 0 inside the daemon, otherwise the pid of the daemon (in the parent).
+    """
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid > 0:
+        # Parent: wait for the daemon pid from the grandchild
+        os.close(write_fd)
+        with os.fdopen(read_fd) as r:
+            daemon_pid = r.read()
+        os.waitpid(pid, 0)
+        return int(daemon_pid)
+
+    os.close(read_fd)
+    os.setsid()
+
+    pid = os.fork()
+    if pid > 0:
+        os._exit(0)
+
+    with os.fdopen(write_fd, 'w') as w:
+        w.write(str(os.getpid()))
+
+    # Redirect the standard file descriptors
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.close(devnull)
+
+    return 0
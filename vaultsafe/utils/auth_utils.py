@@ -12,6 +12,9 @@ from rich.console import Console
 from rich.panel import Panel
 
 from vaultsafe.db.models import session, Vault
+from vaultsafe.utils.crypto_utils import sha256_hash
+from vaultsafe.utils.agent_utils import get_vault_key_from_agent
+from vaultsafe.utils.profile_utils import span, timed
 from vaultsafe.config import DOT_SESSION_FILE
 
 console = Console()
@@ -44,6 +47,7 @@ def get_password(
         else:
             click.echo(warning_msg)
 
+@timed('auth.session')
 def _master_passwd_from_session(**kwargs):
     # Get the existing session token
     existing_token = get_existing_session_token()
@@ -84,7 +88,8 @@ def input_master_passwd_and_verify():
             return master_passwd
     
     # Take master_passwd from user!
-    master_passwd = pwinput.pwinput("Enter your master password: ", mask=bullet_unicode)
+    with span('auth.prompt'):
+        master_passwd = pwinput.pwinput("Enter your master password: ", mask=bullet_unicode)
 
     # Check master_password
     if not vault.check_password(master_passwd):
@@ -105,6 +110,47 @@ def input_master_passwd_and_verify():
 
     return master_passwd
 
+def input_vault_key_and_verify():
+    """
+    Get the `vault_key` for the current command.
+
+    If a key agent (see `vaultsafe agent`) is running and holds the key of this
+    vault, the key is returned straight away. Otherwise the master password is
+    taken from the user (or the session) and the key is derived from it.
+
+    Returns:
+        bytes: The vault key.
+    """
+    vault_key = get_vault_key_from_agent()
+    if vault_key:
+        vault = session.query(Vault).first()
+        if vault and sha256_hash(vault_key) == vault.vault_key_hash:
+            return vault_key
+
+    master_passwd = input_master_passwd_and_verify()
+    vault = session.query(Vault).first()
+    return vault.derive_key(master_passwd)
+
+def input_snapshot_key_and_verify(snapshot):
+    """
+    Get the `vault_key` of a snapshot (see `utils/snapshot_utils.py`) from the
+    key agent, or from the master password with the KDF settings of the snapshot.
+    The database is not used.
+
+    Returns:
+        bytes: The vault key.
+    """
+    vault_key = get_vault_key_from_agent()
+    if vault_key and snapshot.check_key(vault_key):
+        return vault_key
+
+    master_passwd = pwinput.pwinput("Enter your master password: ", mask='\u2022')
+    vault_key = snapshot.derive_key(master_passwd)
+    if not snapshot.check_key(vault_key):
+        console.print(Panel("[bold red]Sorry, wrong password![/bold red]", border_style="red"))
+        sys.exit(1)
+    return vault_key
+
 def generate_session_token(master_password:str, session_secret_key:str, session_salt:str):
     """
     Generate a session token using the master password hash.
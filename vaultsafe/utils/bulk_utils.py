@@ -0,0 +1,117 @@
+# /utils/bulk_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from sqlalchemy.orm import selectinload
+
+from vaultsafe.db.models import session, Credential
+from vaultsafe.utils.profile_utils import count
+from vaultsafe.config import CRYPTO_WORKERS, CRYPTO_POOL, CRYPTO_CHUNK_SIZE
+
+def iter_credentials(chunk_size: int = CRYPTO_CHUNK_SIZE):
+    """
+    Iterate over all the credentials (ordered by id) fetching `chunk_size` rows
+    at a time. Rows of a finished chunk are expunged from the session so that
+    memory use does not grow with the size of the vault.
+
+    Yields:
+        Credential: The credentials.
+    """
+    last_id = 0
+    while True:
+        chunk = (
+            session.query(Credential)
+            .options(selectinload(Credential.mnemonics))
+            .filter(Credential.id > last_id)
+            .order_by(Credential.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not chunk:
+            return
+
+        yield from chunk
+
+        last_id = chunk[-1].id
+        for credential in chunk:
+            session.expunge(credential)
+
+def _run_batch(func, batch, args):
+    """Apply `func` to a batch of items. Module level so that it can be sent to a process pool."""
+    return [func(item, *args) for item in batch]
+
+def _batches(items, n):
+    """Split `items` into (at most) `n` contiguous batches."""
+    size = -(-len(items) // n)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+@contextmanager
+def worker_pool(workers: int = CRYPTO_WORKERS, pool: str = CRYPTO_POOL):
+    """
+    A pool of workers for the crypto heavy bulk operations.
+
+    Yields a function `pool_map(func, items, *args)` which returns
+    `[func(item, *args) for item in items]`, computed by splitting `items`
+    between the workers. `func` must be defined at module level when a
+    process pool is used.
+
+    Args:
+        workers (int): Number of workers. 1 runs everything in the calling thread.
+        pool (str): 'thread' or 'process'.
+    """
+    if pool not in ('thread', 'process'):
+        raise ValueError(f"Unknown pool '{pool}'. Use 'thread' or 'process'.")
+
+    if workers <= 1:
+        yield lambda func, items, *args: _run_batch(func, items, args)
+        return
+
+    executor_class = ProcessPoolExecutor if pool == 'process' else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        def pool_map(func, items, *args):
+            batches = _batches(items, workers)
+            results = []
+            for result in executor.map(_run_batch, [func] * len(batches), batches, [args] * len(batches)):
+                results.extend(result)
+            return results
+
+        yield pool_map
+
+def bulk_decrypt(credentials, vault_key, workers: int = CRYPTO_WORKERS,
+                 chunk_size: int = CRYPTO_CHUNK_SIZE, pool: str = CRYPTO_POOL, fields=None):
+    """
+    Decrypt many credentials using a pool of workers.
+
+    The credentials are read `chunk_size` at a time; each chunk is turned into
+    plain dicts and split between the workers. Results come back in the
+    original order.
+
+    Args:
+        credentials (iterable): Credential objects (e.g. from `iter_credentials()`).
+        vault_key (bytes): The vault key.
+        workers (int): Number of workers. 1 decrypts in the calling thread.
+        chunk_size (int): Number of credentials read per chunk.
+        pool (str): 'thread' or 'process'.
+        fields (iterable, optional): The encrypted attributes to decrypt (default:
+            all); the others are left encrypted (see `Credential.decrypt_json()`).
+
+    Yields:
+        dict: Same as `credential.json(vault_key)`, in the order of `credentials`.
+    """
+    def chunks():
+        chunk = []
+        for credential in credentials:
+            chunk.append(credential.json())
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    with worker_pool(workers, pool) as pool_map:
+        for chunk in chunks():
+            count('crypto.bulk_credentials', len(chunk))
+            yield from pool_map(Credential.decrypt_json, chunk, vault_key, fields)
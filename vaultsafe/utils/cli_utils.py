@@ -7,12 +7,15 @@ import os
 import sys
 from datetime import date
 
+import click
 import pwinput
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
 from vaultsafe.version import __version__
+from vaultsafe.utils.profile_utils import timed
+from vaultsafe.utils import output_utils
 from vaultsafe.config import APP_NAME, COPYRIGHT_STATEMENT, DATABASE_PATH, GITHUB_REPO
 
 console = Console()
@@ -58,8 +61,16 @@ def assert_db_init():
 
 
 # Function to print basic information
+@timed('render.banner')
 def print_basic_info():
 
+    if not output_utils.is_rich():
+        # No clear nor banner: stdout is left to the records until the command ends
+        ctx = click.get_current_context(silent=True)
+        if ctx is not None:
+            ctx.with_resource(output_utils.records_to_stdout())
+        return
+
     clear_terminal_screen()
 
     # Create title with centered alignment
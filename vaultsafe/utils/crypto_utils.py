@@ -3,12 +3,19 @@
 # Created On: Jun 12, 2024
 #
 import hashlib
+import hmac
 import base64
 import string
 import secrets
+from functools import lru_cache
 
 from cryptography.fernet import Fernet
 
+from vaultsafe.utils.profile_utils import timed
+
+# Number of Fernet objects kept alive by `get_fernet()`
+FERNET_CACHE_SIZE = 128
+
 def sha256_hash(data: str):
     """
     Creates a SHA-256 hash of the input data.
@@ -26,6 +33,7 @@ def sha256_hash(data: str):
     return sha256_hash
 
 
+@timed('kdf.pbkdf2-legacy')
 def derive_vault_key(master_key: str, key_length: int = 32, iterations: int = 100000):
     """
     Derives a `vault_key` from the master key using PBKDF2 and encodes it in URL-safe base64 format.
@@ -44,6 +52,35 @@ def derive_vault_key(master_key: str, key_length: int = 32, iterations: int = 10
     return encoded_key
 
 
+def derive_search_key(vault_key):
+    """
+    Derives the key used for the blind search index from the `vault_key`.
+
+    Args:
+        vault_key (bytes or str): The vault key.
+
+    Returns:
+        bytes: The search key.
+    """
+    if isinstance(vault_key, str):
+        vault_key = vault_key.encode()
+    return hmac.new(vault_key, b"vaultsafe-search-index", hashlib.sha256).digest()
+
+
+def blind_index(term: str, search_key: bytes):
+    """
+    Computes the blind index token (keyed HMAC-SHA256) of a search term.
+
+    Args:
+        term (str): The (normalized) search term.
+        search_key (bytes): The key from `derive_search_key()`.
+
+    Returns:
+        str: The token in hexadecimal format.
+    """
+    return hmac.new(search_key, term.encode(), hashlib.sha256).hexdigest()[:32]
+
+
 def generate_fernet_key():
     """
     Generates a new Fernet key for encryption and decryption.
@@ -54,18 +91,63 @@ def generate_fernet_key():
     return Fernet.generate_key()
 
 
+@lru_cache(maxsize=FERNET_CACHE_SIZE)
+def get_fernet(key):
+    """
+    Returns a Fernet object for the given key.
+
+    Building a `Fernet` decodes the key and sets up the signing and encryption
+    keys, so the objects are cached and reused across calls with the same key.
+    The cache lives as long as the process: it is meant for the vault key (and
+    export file keys), and is emptied by `clear_fernet_cache()` when a vault
+    key goes out of use. The key of a credential should get `new_fernet()`.
+
+    Args:
+        key (bytes or str): The Fernet key.
+
+    Returns:
+        Fernet: The Fernet object.
+    """
+    return Fernet(key)
+
+
+def new_fernet(key):
+    """
+    Returns a Fernet object for the given key, which is not cached: for the key
+    of a single credential, used for its fields and then dropped.
+
+    Args:
+        key (bytes or str): The Fernet key.
+
+    Returns:
+        Fernet: The Fernet object.
+    """
+    return Fernet(key)
+
+
+def clear_fernet_cache():
+    """Drop the Fernet objects of `get_fernet()` (on logout, key rotation or when the agent stops)."""
+    get_fernet.cache_clear()
+
+
+def _get_cipher(key):
+    """Accept either a Fernet object or a key (which gets a new, uncached Fernet)."""
+    return key if isinstance(key, Fernet) else new_fernet(key)
+
+
+@timed('crypto.encrypt')
 def encrypt(data, key):
     """
     Encrypts the input data using the provided Fernet key.
 
     Args:
         data (str or bytes): The raw data to encrypt.
-        key (bytes or str): The Fernet key for encryption.
+        key (bytes or str or Fernet): The Fernet key (or a Fernet object from `get_fernet()`).
 
     Returns:
         bytes: The encrypted data.
     """
-    fernet = Fernet(key)
+    fernet = _get_cipher(key)
     if isinstance(data, str):
         data = data.encode()
 
@@ -73,18 +155,19 @@ def encrypt(data, key):
     return encrypted_data
 
 
+@timed('crypto.decrypt')
 def decrypt(encrypted_data: bytes, key):
     """
     Decrypts the encrypted data using the provided Fernet key.
 
     Args:
         encrypted_data (bytes): The encrypted data to decrypt.
-        key (bytes or str): The Fernet key for decryption.
+        key (bytes or str or Fernet): The Fernet key (or a Fernet object from `get_fernet()`).
 
     Returns:
         str: The decrypted raw data.
     """
-    fernet = Fernet(key)
+    fernet = _get_cipher(key)
     decrypted_data = fernet.decrypt(encrypted_data).decode()
     return decrypted_data
 
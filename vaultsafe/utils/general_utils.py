@@ -3,12 +3,14 @@
 # Created On: Jun 16, 2024
 #
 import string
-import secrets
-from datetime import datetime, timedelta, timezone
+import functools
+from datetime import datetime, timedelta, timezone, time
 
 import pytz
 from tzlocal import get_localzone_name
 
+from vaultsafe.utils.password_utils import random_chars
+
 def generate_strong_password(length=15):
     """
     Generate a strong password of specified length.
@@ -23,8 +25,7 @@ def generate_strong_password(length=15):
         raise ValueError("Password length must be at least 4 characters.")
     
     characters = string.ascii_letters + string.digits + "@#$-%&"
-    password = ''.join(secrets.choice(characters) for _ in range(length))
-    return password
+    return random_chars(characters.encode(), length).decode()
 
 def get_system_timezone():
     """
@@ -41,6 +42,19 @@ def get_system_timezone():
         # Log the exception if needed
         return None
 
+@functools.lru_cache(maxsize=None)
+def get_local_timezone():
+    """
+    Get the system's timezone, resolved once per process.
+
+    Returns:
+        pytz.tzinfo: The local timezone, or UTC if it cannot be determined.
+    """
+    try:
+        return pytz.timezone(get_system_timezone())
+    except Exception:
+        return pytz.utc
+
 def utcnow():
     """
     Get the current UTC datetime.
@@ -69,35 +83,78 @@ def get_timezone_offset(timezone_str):
         # Log the exception if needed
         return timedelta(0)  # Default to UTC offset
 
+@functools.lru_cache(maxsize=None)
+def _local_datetime_format(show_time: bool, weekday: bool, zone_label: str):
+    local_format = "%a, " if weekday else ""
+    local_format += "%d %b %Y"
+    if show_time:
+        local_format += f" %I:%M %p ({zone_label})"
+    return local_format
+
+def _zone_label(tz, offset):
+    # An offset of zero is shown as UTC (as for machines set to UTC)
+    return 'UTC' if offset == timedelta(0) else tz.zone
+
+def _as_naive_utc(dt):
+    # The database stores naive datetimes in UTC
+    return dt if dt.tzinfo is None else dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _utc_offset_of_day(tz, day):
+    """The UTC offset of `tz` during the whole UTC `day`, or None if it changes that day."""
+    start = datetime.combine(day, time(), tzinfo=timezone.utc)
+    offset = start.astimezone(tz).utcoffset()
+    end = start + timedelta(days=1, microseconds=-1)
+    return offset if end.astimezone(tz).utcoffset() == offset else None
+
 def convert_utc_to_local_str(dt, show_time: bool = True, weekday: bool = True):
     """
     Convert a datetime object with timezone information UTC to a string representation in local time format.
 
+    The local timezone is resolved once per process, and the offset is the one in
+    effect at `dt` (so that daylight saving time is respected).
+
     Args:
-        dt (datetime.datetime): A datetime object with timezone information UTC.
+        dt (datetime.datetime): A datetime object in UTC (naive datetimes are taken as UTC).
         show_time (bool, optional): Whether to include the time in the output string. Defaults to True.
         weekday (bool, optional): Whether to include the weekday in the output string. Defaults to True.
 
     Returns:
         str: A string representation of the datetime object in local time format.
     """
-    timezone_str = get_system_timezone()
+    tz = get_local_timezone()
+    dt_local = _as_naive_utc(dt).replace(tzinfo=timezone.utc).astimezone(tz)
+    zone_label = _zone_label(tz, dt_local.utcoffset())
+    return dt_local.strftime(_local_datetime_format(show_time, weekday, zone_label))
 
-    # Get the offset for the given timezone
-    offset = get_timezone_offset(timezone_str)
+def convert_utc_to_local_strs(dts, show_time: bool = True, weekday: bool = True):
+    """
+    Same as `convert_utc_to_local_str()` for many datetimes at once.
 
-    # Check whether the offset found or not
-    timezone_str = 'UTC' if offset == timedelta(0) else timezone_str
-    
-    # Convert UTC to local time
-    dt_local = dt + offset
-
-    # Format the datetime object
-    local_format = ""
-    if weekday:
-        local_format += dt_local.strftime("%a, ")
-    local_format += dt_local.strftime("%d %b %Y")
-    if show_time:
-        local_format += dt_local.strftime(f" %I:%M %p ({timezone_str})")
+    The UTC offset is computed once per UTC day (per row only on the days the
+    offset changes), which makes it much faster on long lists.
+
+    Args:
+        dts (iterable): Datetime objects in UTC.
+        show_time (bool, optional): Whether to include the time. Defaults to True.
+        weekday (bool, optional): Whether to include the weekday. Defaults to True.
 
-    return local_format
\ No newline at end of file
+    Returns:
+        list: The formatted strings, in the order of `dts`.
+    """
+    tz = get_local_timezone()
+    day_offsets = {}
+    formats = {}
+    local_strs = []
+    for dt in dts:
+        dt = _as_naive_utc(dt)
+        day = dt.date()
+        if day not in day_offsets:
+            day_offsets[day] = _utc_offset_of_day(tz, day)
+        offset = day_offsets[day]
+        if offset is None:
+            offset = dt.replace(tzinfo=timezone.utc).astimezone(tz).utcoffset()
+
+        if offset not in formats:
+            formats[offset] = _local_datetime_format(show_time, weekday, _zone_label(tz, offset))
+        local_strs.append((dt + offset).strftime(formats[offset]))
+    return local_strs
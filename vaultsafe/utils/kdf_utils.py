@@ -0,0 +1,162 @@
+# /utils/kdf_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Key derivation functions used to turn the master password into the vault key.
+# The algorithm, its parameters and a random salt are stored on the Vault, so
+# the cost can be tuned (see `vaultsafe kdf-benchmark`) without breaking
+# existing vaults.
+#
+import time
+import json
+import base64
+import hashlib
+import secrets
+
+try:
+    import argon2.low_level as argon2
+except ImportError:  # argon2-cffi is optional
+    argon2 = None
+
+from vaultsafe.utils.profile_utils import timed
+
+KEY_LENGTH = 32
+SALT_LENGTH = 16
+
+DEFAULT_KDF = 'scrypt'
+
+# Defaults for new vaults: about a quarter of a second on a recent laptop
+DEFAULT_KDF_PARAMS = {
+    'pbkdf2-sha256': {'iterations': 600_000},
+    'scrypt': {'n': 2 ** 15, 'r': 8, 'p': 1},
+    'argon2id': {'time_cost': 3, 'memory_cost': 64 * 1024, 'parallelism': 4},
+}
+
+# The parameter which is scaled by `calibrate()`
+COST_PARAMETERS = {
+    'pbkdf2-sha256': 'iterations',
+    'scrypt': 'n',
+    'argon2id': 'time_cost',
+}
+
+# Largest cost `calibrate()` goes to: scrypt uses 128 * r * n bytes of memory,
+# 1 GiB at n = 2**20 with r = 8
+MAX_COSTS = {
+    'n': 2 ** 20,
+}
+
+
+def _pbkdf2_sha256(password: bytes, salt: bytes, iterations: int):
+    return hashlib.pbkdf2_hmac('sha256', password, salt, iterations, dklen=KEY_LENGTH)
+
+
+def _scrypt(password: bytes, salt: bytes, n: int, r: int, p: int):
+    # OpenSSL refuses to use more than `maxmem` bytes (32 MiB by default)
+    maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+    return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=KEY_LENGTH)
+
+
+def _argon2id(password: bytes, salt: bytes, time_cost: int, memory_cost: int, parallelism: int):
+    return argon2.hash_secret_raw(
+        password, salt, time_cost=time_cost, memory_cost=memory_cost,
+        parallelism=parallelism, hash_len=KEY_LENGTH, type=argon2.Type.ID
+    )
+
+
+KDF_FUNCTIONS = {
+    'pbkdf2-sha256': _pbkdf2_sha256,
+    'scrypt': _scrypt,
+}
+if argon2 is not None:
+    KDF_FUNCTIONS['argon2id'] = _argon2id
+
+
+def available_kdfs():
+    """Names of the KDFs usable on this machine."""
+    return list(KDF_FUNCTIONS)
+
+
+def generate_salt():
+    """
+    Generates a random salt for a vault.
+
+    Returns:
+        str: The salt, base64 encoded (to be stored in the Vault).
+    """
+    return base64.b64encode(secrets.token_bytes(SALT_LENGTH)).decode()
+
+
+def dump_params(params: dict):
+    """Serialize KDF parameters for the Vault.kdf_params column."""
+    return json.dumps(params, sort_keys=True)
+
+
+def load_params(params: str):
+    return json.loads(params)
+
+
+@timed('kdf')
+def derive_key(password: str, algorithm: str, params: dict, salt: str):
+    """
+    Derives a key from the password with the given KDF and encodes it in
+    URL-safe base64 format (so that it can be used as a Fernet key).
+
+    Args:
+        password (str): The master password.
+        algorithm (str): One of `available_kdfs()`.
+        params (dict): Parameters of the KDF (see `DEFAULT_KDF_PARAMS`).
+        salt (str): The base64 encoded salt from `generate_salt()`.
+
+    Returns:
+        bytes: The derived key as a URL-safe base64-encoded bytes object.
+    """
+    if algorithm not in KDF_FUNCTIONS:
+        raise ValueError(f"Unknown or unavailable key derivation function '{algorithm}'.")
+
+    key = KDF_FUNCTIONS[algorithm](password.encode(), base64.b64decode(salt), **params)
+    return base64.urlsafe_b64encode(key)
+
+
+def time_kdf(algorithm: str, params: dict):
+    """Seconds taken by one key derivation with the given parameters."""
+    salt = generate_salt()
+    start = time.perf_counter()
+    derive_key('benchmark-password', algorithm, params, salt)
+    return time.perf_counter() - start
+
+
+def calibrate(algorithm: str, target: float, params: dict = None):
+    """
+    Find the parameters of a KDF for which one key derivation takes about
+    `target` seconds on this machine. The cost parameter (see
+    `COST_PARAMETERS`) is doubled until the target is reached, or its limit
+    in `MAX_COSTS`; the other parameters are kept.
+
+    Args:
+        algorithm (str): One of `available_kdfs()`.
+        target (float): The wanted unlock time in seconds.
+        params (dict, optional): Starting parameters. Defaults to a cheap setting.
+
+    Returns:
+        tuple: (params, measured seconds, whether the cost limit was reached
+        before the target)
+    """
+    params = dict(params or DEFAULT_KDF_PARAMS[algorithm])
+    cost = COST_PARAMETERS[algorithm]
+
+    # Start cheap and double the cost
+    params[cost] = {'iterations': 10_000, 'n': 2 ** 10, 'time_cost': 1}[cost]
+    elapsed = time_kdf(algorithm, params)
+    max_cost = MAX_COSTS.get(cost)
+    while elapsed < target / 2:
+        if max_cost is not None and params[cost] * 2 > max_cost:
+            return params, elapsed, True
+        params[cost] *= 2
+        elapsed = time_kdf(algorithm, params)
+
+    # scrypt's n must stay a power of 2; the others can be scaled linearly
+    if cost != 'n' and elapsed < target:
+        params[cost] = int(params[cost] * target / elapsed)
+        elapsed = time_kdf(algorithm, params)
+
+    return params, elapsed, False
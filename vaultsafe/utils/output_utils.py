@@ -0,0 +1,116 @@
+# /utils/output_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Output modes of the CLI: `vaultsafe --plain <command>` and `vaultsafe --json <command>`.
+#
+# In the default 'rich' mode the commands clear the terminal, print the banner
+# and render every record (credential, vault, password) as a rich table. The
+# 'plain' and 'json' modes are meant for scripts and pipes: no `clear`, no
+# banner and no tables. The records are streamed to stdout one per line, as tab
+# separated values or as a JSON object. Everything else the command prints
+# (prompts, rules, messages) goes to stderr, so that stdout holds only the
+# records: `print_basic_info()`, which every command calls once its arguments
+# are parsed, redirects stdout instead of printing the banner.
+#
+# If no mode is given, it is read from VAULTSAFE_OUTPUT. Otherwise the mode is
+# 'json' when stdout is not a terminal and 'rich' when it is.
+#
+import os
+import sys
+from contextlib import contextmanager
+
+OUTPUT_MODES = ('rich', 'plain', 'json')
+
+_mode = 'rich'
+# The real stdout while it is redirected to stderr (see `records_to_stdout()`)
+_stdout = None
+
+
+def detect_mode(stream=None):
+    """
+    The output mode when none is given: VAULTSAFE_OUTPUT, or 'json' if `stream`
+    (default: stdout) is not a terminal, else 'rich'.
+
+    Raises:
+        ValueError: If VAULTSAFE_OUTPUT is set to an unknown mode.
+    """
+    mode = os.environ.get('VAULTSAFE_OUTPUT')
+    if mode:
+        if mode.lower() not in OUTPUT_MODES:
+            raise ValueError(f"VAULTSAFE_OUTPUT must be one of {', '.join(OUTPUT_MODES)}, not '{mode}'.")
+        return mode.lower()
+    stream = stream or sys.stdout
+    try:
+        return 'rich' if stream.isatty() else 'json'
+    except (AttributeError, ValueError):
+        return 'json'
+
+
+def set_mode(mode: str):
+    global _mode
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode '{mode}'.")
+    _mode = mode
+
+
+def get_mode():
+    return _mode
+
+
+def is_rich():
+    """Whether the output is for a person at a terminal (banner, tables, colors)."""
+    return _mode == 'rich'
+
+
+def stdout():
+    """The stream of the records: stdout, even while it is redirected to stderr."""
+    return _stdout or sys.stdout
+
+
+@contextmanager
+def records_to_stdout():
+    """Redirect `sys.stdout` to stderr, keeping the real stdout for `emit()`."""
+    global _stdout
+    if _stdout is not None:
+        yield
+        return
+    _stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        yield
+    finally:
+        sys.stdout = _stdout
+        _stdout = None
+
+
+def _plain_value(value):
+    if value is None:
+        return '-'
+    if isinstance(value, (list, tuple)):
+        value = ','.join(str(item) for item in value)
+    # One record per line: tabs and newlines of the values are escaped
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def format_record(record: dict, mode: str = None):
+    """A record as one line (without the newline): a JSON object, or its values tab separated in plain mode."""
+    if (mode or _mode) == 'plain':
+        return '\t'.join(_plain_value(value) for value in record.values())
+    # Imported here: the module is loaded by every command, even `generate`
+    import json
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+def emit(record: dict):
+    """
+    Write one record to stdout, as a line of the current mode ('json' when
+    called in 'rich' mode).
+    """
+    out = stdout()
+    try:
+        out.write(format_record(record) + '\n')
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop, silencing the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+        sys.exit(0)
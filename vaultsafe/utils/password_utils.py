@@ -0,0 +1,219 @@
+# /utils/password_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Bulk generation of passwords and passphrases.
+#
+# Random characters are taken from one large `os.urandom` buffer which is
+# mapped onto the alphabet by `bytes.translate()`: the bytes which would make
+# `byte % len(alphabet)` biased are deleted (rejection sampling), so every
+# character is uniform and the whole mapping runs in C.
+#
+import os
+import math
+import string
+import functools
+from pathlib import Path
+from itertools import combinations, compress
+
+CHARACTER_CLASSES = {
+    'lower': string.ascii_lowercase,
+    'upper': string.ascii_uppercase,
+    'digits': string.digits,
+    'symbols': "@#$-%&",
+}
+DEFAULT_CLASSES = tuple(CHARACTER_CLASSES)
+DEFAULT_PASSWORD_LENGTH = 18
+DEFAULT_PASSPHRASE_WORDS = 6
+DEFAULT_CHUNK_SIZE = 65536
+
+WORDLIST_PATH = Path(__file__).resolve().parent.parent / 'data' / 'wordlist.txt'
+
+
+@functools.lru_cache(maxsize=None)
+def _sampling_table(alphabet: bytes):
+    """
+    The `translate()` arguments mapping random bytes onto `alphabet` without bias.
+
+    Returns:
+        tuple: (table, rejected bytes, fraction of the bytes which are kept)
+    """
+    size = len(alphabet)
+    if not 1 < size <= 256:
+        raise ValueError("The alphabet must have between 2 and 256 characters.")
+    limit = 256 - 256 % size
+    table = bytes(alphabet[byte % size] for byte in range(limit)) + bytes(256 - limit)
+    return table, bytes(range(limit, 256)), limit / 256
+
+
+def random_chars(alphabet: bytes, n: int):
+    """
+    Returns:
+        bytes: `n` characters drawn uniformly and independently from `alphabet`.
+    """
+    table, rejected, kept = _sampling_table(alphabet)
+    chars = bytearray()
+    while len(chars) < n:
+        # Draw a little more than needed, so that one round is almost always enough
+        missing = n - len(chars)
+        chars += os.urandom(int(missing / kept) + 64).translate(table, rejected)
+    del chars[n:]
+    return bytes(chars)
+
+
+def random_indices(n: int, size: int):
+    """
+    Returns:
+        list: `n` integers drawn uniformly from range(size), size <= 2**32.
+    """
+    limit = 2**32 - 2**32 % size
+    indices = []
+    while len(indices) < n:
+        missing = n - len(indices)
+        words = memoryview(os.urandom(4 * (missing + missing // 8 + 8))).cast('I')
+        indices.extend(word % size for word in words if word < limit)
+    del indices[n:]
+    return indices
+
+
+def password_alphabet(classes=DEFAULT_CLASSES):
+    """The characters of the given classes (names from `CHARACTER_CLASSES`)."""
+    unknown = [name for name in classes if name not in CHARACTER_CLASSES]
+    if unknown or not classes:
+        raise ValueError(f"Character classes must be among: {', '.join(CHARACTER_CLASSES)}.")
+    return ''.join(CHARACTER_CLASSES[name] for name in dict.fromkeys(classes))
+
+
+def password_entropy(length: int, classes=DEFAULT_CLASSES, require_each: bool = False):
+    """
+    Entropy, in bits, of a random password.
+
+    With `require_each` only the passwords having a character of every class are
+    possible; they are counted by inclusion-exclusion.
+    """
+    classes = tuple(dict.fromkeys(classes))
+    size = len(password_alphabet(classes))
+    if not require_each:
+        return length * math.log2(size)
+
+    possible = 0
+    for k in range(len(classes) + 1):
+        for excluded in combinations(classes, k):
+            possible += (-1) ** k * (size - sum(len(CHARACTER_CLASSES[name]) for name in excluded)) ** length
+    return math.log2(possible) if possible > 0 else 0.0
+
+
+def password_length_for_entropy(bits: float, classes=DEFAULT_CLASSES, require_each: bool = False):
+    """The shortest password length giving at least `bits` of entropy."""
+    length = max(math.ceil(bits / math.log2(len(password_alphabet(classes)))), 1)
+    while password_entropy(length, classes, require_each) < bits:
+        length += 1
+    return length
+
+
+def generate_password_chunks(count: int, length: int = DEFAULT_PASSWORD_LENGTH, classes=DEFAULT_CLASSES,
+                             require_each: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Generate random passwords, `chunk_size` at a time.
+
+    Args:
+        count (int): Number of passwords.
+        length (int): Length of each password.
+        classes (tuple): Character classes of the alphabet (names from `CHARACTER_CLASSES`).
+        require_each (bool): Only keep passwords with at least one character of every class.
+        chunk_size (int): Passwords per chunk.
+
+    Returns:
+        generator: Lists of passwords, as ASCII bytes. The arguments are checked
+            (ValueError) before the generator is returned.
+    """
+    classes = tuple(dict.fromkeys(classes))
+    alphabet = password_alphabet(classes).encode()
+    if length < 1:
+        raise ValueError("Password length must be at least 1.")
+    if require_each and length < len(classes):
+        raise ValueError(f"Passwords of length {length} cannot contain all of the {len(classes)} character classes.")
+    # For each class, the characters of the alphabet outside of it
+    other_chars = [
+        bytes(char for char in alphabet if char not in CHARACTER_CLASSES[name].encode())
+        for name in classes
+    ] if require_each else None
+    return _password_chunks(count, length, alphabet, other_chars, chunk_size)
+
+
+def _password_chunks(count, length, alphabet, other_chars, chunk_size):
+    remaining = count
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        block = random_chars(alphabet, n * length)
+        passwords = [block[i:i + length] for i in range(0, n * length, length)]
+        if other_chars:
+            # Without the characters outside of a class, the passwords lacking it
+            # are empty; the whole chunk is checked at once, in C
+            lines = b'\n'.join(passwords)
+            class_only = [lines.translate(None, chars).split(b'\n') for chars in other_chars]
+            passwords = list(compress(passwords, map(all, zip(*class_only))))
+        remaining -= len(passwords)
+        yield passwords
+
+
+@functools.lru_cache(maxsize=None)
+def load_wordlist(path=WORDLIST_PATH):
+    """
+    Returns:
+        tuple: The distinct words of a wordlist file, one word per line.
+    """
+    with open(path, encoding='utf-8') as f:
+        words = tuple(dict.fromkeys(line.strip() for line in f if line.strip()))
+    if len(words) < 2:
+        raise ValueError(f"The wordlist '{path}' needs at least 2 distinct words.")
+    return words
+
+
+def passphrase_entropy(words: int, wordlist=None):
+    """Entropy, in bits, of a passphrase of `words` random words."""
+    return words * math.log2(len(wordlist or load_wordlist()))
+
+
+def passphrase_words_for_entropy(bits: float, wordlist=None):
+    """The least number of words giving at least `bits` of entropy."""
+    return max(math.ceil(bits / math.log2(len(wordlist or load_wordlist()))), 1)
+
+
+def generate_passphrase_chunks(count: int, words: int = DEFAULT_PASSPHRASE_WORDS, wordlist=None,
+                               separator: str = '-', chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Generate random passphrases (words drawn uniformly from `wordlist`), `chunk_size` at a time.
+
+    Returns:
+        generator: Lists of passphrases, as UTF-8 bytes.
+    """
+    if words < 1:
+        raise ValueError("A passphrase needs at least 1 word.")
+    wordlist = [word.encode() for word in (wordlist or load_wordlist())]
+    return _passphrase_chunks(count, words, wordlist, separator.encode(), chunk_size)
+
+
+def _passphrase_chunks(count, words, wordlist, separator, chunk_size):
+    remaining = count
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        indices = random_indices(n * words, len(wordlist))
+        chosen = [wordlist[i] for i in indices]
+        yield [separator.join(chosen[i:i + words]) for i in range(0, n * words, words)]
+        remaining -= n
+
+
+def write_chunks(chunks, file):
+    """
+    Write generated passwords to a binary file, one per line, a chunk at a time.
+
+    Returns:
+        int: Number of passwords written.
+    """
+    count = 0
+    for chunk in chunks:
+        if chunk:
+            file.write(b'\n'.join(chunk) + b'\n')
+            count += len(chunk)
+    return count
@@ -0,0 +1,244 @@
+# /utils/profile_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Lightweight timing of the hot paths (`vaultsafe --profile <command>`).
+#
+# The code is instrumented with named spans (`with span('db.query'):` or the
+# `@timed('kdf')` decorator) and counters (`count('credentials', n)`). Until
+# `enable()` is called a span is a shared no-op context manager and `timed`
+# costs a single flag check, so the instrumentation can stay in place.
+#
+# Span names are dotted, the first part being the category: auth, kdf, db,
+# crypto, render and clipboard.
+#
+# Once enabled, every span is accumulated (calls, total and longest time) and
+# recorded as a trace event. At the end `report()` prints a breakdown table
+# and `save()` writes either a JSON trace (Chrome's trace event format, which
+# can be opened in chrome://tracing or https://ui.perfetto.dev) or, for a
+# '.pstats' / '.prof' file, the output of cProfile run over the whole command.
+#
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import nullcontext
+from collections import Counter
+
+# Trace events kept for the JSON trace; the totals keep counting past it
+MAX_TRACE_EVENTS = 200_000
+PSTATS_SUFFIXES = ('.pstats', '.prof')
+
+_NO_SPAN = nullcontext()
+
+
+class _Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.output = None
+        self.start = None
+        self.cprofile = None
+        # name -> [calls, total seconds, longest call]
+        self.spans = {}
+        self.counters = Counter()
+        self.events = []
+        self.dropped_events = 0
+        self.lock = threading.Lock()
+
+
+_profiler = _Profiler()
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        elapsed = end - self.start
+        with _profiler.lock:
+            totals = _profiler.spans.get(self.name)
+            if totals is None:
+                _profiler.spans[self.name] = [1, elapsed, elapsed]
+            else:
+                totals[0] += 1
+                totals[1] += elapsed
+                if elapsed > totals[2]:
+                    totals[2] = elapsed
+            if len(_profiler.events) < MAX_TRACE_EVENTS:
+                _profiler.events.append((self.name, self.start, elapsed, threading.get_ident()))
+            else:
+                _profiler.dropped_events += 1
+
+
+def is_enabled():
+    return _profiler.enabled
+
+
+def span(name: str):
+    """
+    Time the enclosed block under `name` (a no-op unless profiling is enabled).
+
+    Usage:
+        with span('render'):
+            console.print(table)
+    """
+    return _Span(name) if _profiler.enabled else _NO_SPAN
+
+
+def timed(name: str):
+    """Decorator: time every call of the function under `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1):
+    """Add `n` to the counter `name` (a no-op unless profiling is enabled)."""
+    if _profiler.enabled:
+        with _profiler.lock:
+            _profiler.counters[name] += n
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('profile_spans', []).append(_Span('db.query').__enter__())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get('profile_spans')
+    if spans:
+        spans.pop().__exit__(None, None, None)
+        count('db.statements')
+
+
+def enable(output=None):
+    """
+    Start profiling. Can be called again to set the output file.
+
+    Args:
+        output (str, optional): File written by `save()`: a JSON trace, or
+            cProfile statistics if it ends with '.pstats' or '.prof'.
+    """
+    if output:
+        _profiler.output = str(output)
+    if _profiler.output and _profiler.output.endswith(PSTATS_SUFFIXES) and _profiler.cprofile is None:
+        import cProfile
+        _profiler.cprofile = cProfile.Profile()
+        _profiler.cprofile.enable()
+    if _profiler.enabled:
+        return
+
+    _profiler.enabled = True
+    _profiler.start = time.perf_counter()
+
+    # Every SQL statement of every engine is a 'db.query' span
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def summary():
+    """
+    Returns:
+        dict: The wall time, the totals of every span (by total time) and the counters.
+    """
+    wall = time.perf_counter() - _profiler.start
+    with _profiler.lock:
+        spans = sorted(_profiler.spans.items(), key=lambda item: item[1][1], reverse=True)
+        counters = dict(_profiler.counters)
+    return {
+        'wall_ms': wall * 1000,
+        'spans': {
+            name: {'calls': calls, 'total_ms': total * 1000, 'mean_ms': total / calls * 1000, 'max_ms': longest * 1000}
+            for name, (calls, total, longest) in spans
+        },
+        'counters': counters,
+    }
+
+
+def report(console=None):
+    """Print the breakdown of the spans and the counters (to stderr by default)."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = console or Console(stderr=True)
+    data = summary()
+    wall = data['wall_ms']
+
+    table = Table(title="Profile", caption=f"Wall time: {wall:.1f} ms. Nested spans are included in their parents.")
+    table.add_column("Span", style="cyan", no_wrap=True)
+    table.add_column("Calls", justify="right")
+    table.add_column("Total (ms)", justify="right", style="magenta")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("Max (ms)", justify="right")
+    table.add_column("% of wall", justify="right", style="green")
+    for name, totals in data['spans'].items():
+        table.add_row(
+            name, str(totals['calls']), f"{totals['total_ms']:.2f}", f"{totals['mean_ms']:.3f}",
+            f"{totals['max_ms']:.2f}", f"{totals['total_ms'] / wall * 100:.1f}" if wall else "-"
+        )
+    for name, value in sorted(data['counters'].items()):
+        table.add_row(f"[dim]{name}[/dim]", str(value), "", "", "", "")
+    console.print(table)
+
+
+def save(path=None):
+    """
+    Write the profile to `path` (default: the output given to `enable()`).
+
+    Returns:
+        str: The path written, or None.
+    """
+    path = str(path or _profiler.output or '')
+    if not path:
+        return None
+
+    if path.endswith(PSTATS_SUFFIXES):
+        if _profiler.cprofile is None:
+            raise ValueError("cProfile statistics need the output file to be given to `enable()`.")
+        _profiler.cprofile.disable()
+        _profiler.cprofile.dump_stats(path)
+        return path
+
+    pid = os.getpid()
+    with _profiler.lock:
+        events = [
+            {'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+             'ts': round((start - _profiler.start) * 1e6, 3), 'dur': round(elapsed * 1e6, 3)}
+            for name, start, elapsed, tid in _profiler.events
+        ]
+        dropped = _profiler.dropped_events
+    with open(path, 'w') as f:
+        json.dump({
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {**summary(), 'dropped_events': dropped},
+        }, f)
+    return path
+
+
+def finish():
+    """Print the report and write the output file, if profiling is enabled."""
+    if not _profiler.enabled:
+        return
+    if _profiler.cprofile is not None:
+        _profiler.cprofile.disable()
+    report()
+    path = save()
+    if path:
+        from rich.console import Console
+        Console(stderr=True).print(f"Profile written to '{path}'.")
@@ -0,0 +1,214 @@
+# /utils/rotation_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Crash safe rotation of the vault key (after a new master password or KDF).
+#
+#   1. `start_rotation()` records the settings of the new key in
+#      `vault.rotation_state` and commits, before anything else changes.
+#   2. `rewrap_pending()` wraps the key of every credential with the new vault
+#      key into `credential.next_encrypted_key`, and computes its search tokens
+#      under the new key into `next_search_token`: chunks are processed by a
+#      pool of workers and each chunk is written by bulk statements and
+#      committed. `encrypted_key` and `search_token` are left alone, so readers
+#      keep working with the current master password, and an interrupted
+#      rotation resumes where it stopped.
+#   3. `finish_rotation()` swaps the keys in a single transaction of set based
+#      statements: the next keys become the keys (tagged with the new
+#      `key_version`), the staged tokens become the search index and the vault
+#      takes the new settings.
+#
+# A credential edited during a rotation (see `search_utils.index_credential()`)
+# loses its next key and staged tokens, and is processed again.
+#
+from collections import defaultdict
+
+from sqlalchemy import update, insert, delete, select, func
+
+from vaultsafe.db.models import session, Vault, Credential, Mnemonic, SearchToken, NextSearchToken
+from vaultsafe.utils.bulk_utils import worker_pool
+from vaultsafe.utils.crypto_utils import encrypt, decrypt, get_fernet, new_fernet, derive_search_key, clear_fernet_cache
+from vaultsafe.utils.search_utils import search_tokens_for
+from vaultsafe.config import CRYPTO_WORKERS, CRYPTO_POOL, CRYPTO_CHUNK_SIZE
+
+
+def _rewrap_credential(row, old_vault_key, new_vault_key, new_search_key):
+    """
+    The key of a credential wrapped with the new vault key, and its search
+    tokens under the new key. Module level so that it can be sent to a process pool.
+
+    Args:
+        row (tuple): (encrypted_key, name, username, notes, mnemonics) of the credential.
+
+    Returns:
+        tuple: (next encrypted key, set of search tokens)
+    """
+    encrypted_key, name, username, notes, mnemonics = row
+    credential_key = decrypt(encrypted_key, get_fernet(old_vault_key))
+    cipher = new_fernet(credential_key)
+    texts = [name, *mnemonics, *(decrypt(attr, cipher) for attr in (username, notes) if attr)]
+    return encrypt(credential_key, get_fernet(new_vault_key)), search_tokens_for(texts, new_search_key)
+
+
+def _pending_chunk(after_id: int, chunk_size: int):
+    """(id, encrypted_key, name, username, notes) of the credentials not re-wrapped yet, following `after_id`."""
+    return (
+        session.query(Credential.id, Credential.encrypted_key, Credential.name, Credential.username, Credential.notes)
+        .filter(Credential.id > after_id, Credential.next_encrypted_key.is_(None))
+        .order_by(Credential.id)
+        .limit(chunk_size)
+        .all()
+    )
+
+
+def _mnemonics_of(ids):
+    """credential id -> names of its mnemonics."""
+    names = defaultdict(list)
+    for credential_id, name in session.query(Mnemonic.credential_id, Mnemonic.name).filter(Mnemonic.credential_id.in_(ids)):
+        names[credential_id].append(name)
+    return names
+
+
+def _discard_staged():
+    """Forget the next keys and staged tokens (of an interrupted or aborted rotation)."""
+    session.query(Credential).update({Credential.next_encrypted_key: None}, synchronize_session=False)
+    session.query(NextSearchToken).delete(synchronize_session=False)
+
+
+def pending_count():
+    """
+    Returns:
+        int: Number of credentials whose key is not re-wrapped yet.
+    """
+    return session.query(func.count(Credential.id)).filter(Credential.next_encrypted_key.is_(None)).scalar()
+
+
+def start_rotation(vault, master_password: str, algorithm: str = None, params: dict = None):
+    """
+    Begin the rotation to the vault key of `master_password` (see `Vault.begin_rotation()`)
+    and commit it.
+
+    Returns:
+        bytes: The new vault key.
+    """
+    # Left over by an interrupted rotation which was not aborted cleanly
+    _discard_staged()
+    new_vault_key = vault.begin_rotation(master_password, algorithm, params)
+    session.commit()
+    return new_vault_key
+
+
+def rewrap_pending(old_vault_key, new_vault_key, key_version: int = None, workers: int = CRYPTO_WORKERS,
+                   chunk_size: int = CRYPTO_CHUNK_SIZE, pool: str = CRYPTO_POOL, progress=None, commit: bool = True):
+    """
+    Wrap the keys of the credentials which are not re-wrapped yet with the new
+    vault key and stage their search tokens under it, `chunk_size` at a time.
+
+    Args:
+        old_vault_key (bytes): The current vault key.
+        new_vault_key (bytes): The vault key of the rotation.
+        key_version (int, optional): Key version of the rotation. Default: the one
+            of the rotation in progress of the vault.
+        workers (int): Number of workers. 1 re-wraps in the calling thread.
+        chunk_size (int): Credentials per chunk (and per transaction).
+        pool (str): 'thread' or 'process'.
+        progress (callable, optional): Called with the size of every finished chunk.
+        commit (bool): Commit after every chunk.
+
+    Returns:
+        int: Number of credentials re-wrapped.
+    """
+    if key_version is None:
+        key_version = session.query(Vault).first().rotation_key_version
+    new_search_key = derive_search_key(new_vault_key)
+
+    count = 0
+    last_id = 0
+    with worker_pool(workers, pool) as pool_map:
+        while True:
+            rows = _pending_chunk(last_id, chunk_size)
+            if not rows:
+                return count
+
+            ids = [row.id for row in rows]
+            mnemonics = _mnemonics_of(ids)
+            results = pool_map(
+                _rewrap_credential,
+                [(row.encrypted_key, row.name, row.username, row.notes, mnemonics[row.id]) for row in rows],
+                old_vault_key, new_vault_key, new_search_key
+            )
+
+            # Tokens left by an earlier pass over these credentials, if any
+            session.execute(delete(NextSearchToken).where(NextSearchToken.credential_id.in_(ids)))
+            session.execute(update(Credential), [
+                {'id': id, 'next_encrypted_key': next_key} for id, (next_key, _) in zip(ids, results)
+            ])
+            tokens = [
+                {'token': token, 'credential_id': id, 'key_version': key_version}
+                for id, (_, credential_tokens) in zip(ids, results) for token in credential_tokens
+            ]
+            if tokens:
+                # Core executemany: the ORM bulk insert would be several times slower
+                session.execute(insert(NextSearchToken.__table__), tokens)
+            if commit:
+                session.commit()
+
+            last_id = rows[-1].id
+            count += len(rows)
+            if progress:
+                progress(len(rows))
+
+
+def finish_rotation(vault, old_vault_key, new_vault_key):
+    """
+    Switch the credentials, the search index and the vault to the new key, in one transaction.
+    """
+    key_version = vault.rotation_key_version
+
+    # Credentials added or edited since the last chunk
+    rewrap_pending(old_vault_key, new_vault_key, key_version, workers=1, commit=False)
+
+    session.execute(
+        update(Credential)
+        .where(Credential.next_encrypted_key.is_not(None))
+        .values(encrypted_key=Credential.next_encrypted_key, next_encrypted_key=None, key_version=key_version)
+        .execution_options(synchronize_session=False)
+    )
+
+    # The search index is keyed by the vault key: the staged one takes its place
+    session.execute(delete(SearchToken).execution_options(synchronize_session=False))
+    session.execute(
+        insert(SearchToken).from_select(
+            ['token', 'credential_id'],
+            select(NextSearchToken.token, NextSearchToken.credential_id)
+            .where(NextSearchToken.key_version == key_version, NextSearchToken.credential_id.in_(select(Credential.id)))
+        )
+    )
+    session.execute(delete(NextSearchToken).execution_options(synchronize_session=False))
+
+    vault.finish_rotation()
+    session.commit()
+    # The old vault key is out of use
+    clear_fernet_cache()
+
+
+def rotate(vault, old_vault_key, new_vault_key, progress=None, **kwargs):
+    """
+    Re-wrap the credential keys and switch to the new key: steps 2 and 3 of a
+    rotation begun by `start_rotation()`. Also resumes an interrupted rotation.
+
+    Returns:
+        int: Number of credentials re-wrapped by this call.
+    """
+    count = rewrap_pending(old_vault_key, new_vault_key, vault.rotation_key_version, progress=progress, **kwargs)
+    finish_rotation(vault, old_vault_key, new_vault_key)
+    return count
+
+
+def abort_rotation(vault):
+    """Discard a rotation in progress; the vault keeps its current key."""
+    _discard_staged()
+    vault.rotation_state = None
+    session.commit()
+    # The vault key of the rotation is out of use
+    clear_fernet_cache()
@@ -0,0 +1,175 @@
+# /utils/search_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+import re
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import selectinload
+
+from vaultsafe.db.models import session, Vault, Credential, SearchToken
+from vaultsafe.utils.crypto_utils import derive_search_key, blind_index, decrypt, new_fernet
+from vaultsafe.utils.profile_utils import timed
+
+NGRAM_SIZE = 3
+
+# Credentials loaded at a time when a query cannot use the index
+SCAN_CHUNK_SIZE = 1000
+
+# Stored with the tokens of every indexed credential, so that one whose texts
+# give no terms is not taken for unindexed. Not hexadecimal: no term gives it.
+INDEXED_MARKER = 'indexed'
+
+def extract_terms(text: str):
+    """
+    Split a text into the terms stored in the search index: every word
+    (lowercased) together with all of its trigrams.
+
+    Args:
+        text (str): The plaintext to be indexed.
+
+    Returns:
+        set: The terms.
+    """
+    terms = set()
+    for word in re.findall(r'\w+', text.lower()):
+        terms.add(word)
+        for i in range(len(word) - NGRAM_SIZE + 1):
+            terms.add(word[i:i + NGRAM_SIZE])
+    return terms
+
+def _query_terms(query: str):
+    """
+    Terms that a credential must contain to match the `query`: the trigrams of
+    its words. Words shorter than a trigram give none; they are only checked
+    on the decrypted texts.
+    """
+    terms = set()
+    for word in re.findall(r'\w+', query.lower()):
+        terms.update(word[i:i + NGRAM_SIZE] for i in range(len(word) - NGRAM_SIZE + 1))
+    return terms
+
+def _searchable_texts(credential, credential_key):
+    """Decrypt the searchable attributes of a Credential."""
+    texts = [credential.name]
+    texts.extend(mn.name for mn in credential.mnemonics)
+    for attr in (credential.username, credential.notes):
+        if attr:
+            texts.append(decrypt(attr, credential_key))
+    return texts
+
+def search_tokens_for(texts, search_key: bytes):
+    """
+    Compute the blind index tokens for the given plaintexts.
+
+    Args:
+        texts (list): Plaintexts of the credential (name, mnemonics, username, notes).
+        search_key (bytes): The key from `derive_search_key()`.
+
+    Returns:
+        set: The tokens, and `INDEXED_MARKER`.
+    """
+    terms = set()
+    for text in texts:
+        if text:
+            terms.update(extract_terms(text))
+    return {blind_index(term, search_key) for term in terms} | {INDEXED_MARKER}
+
+def build_search_tokens(texts, search_key: bytes):
+    """
+    Build the SearchToken rows for the given plaintexts.
+
+    Returns:
+        list: SearchToken objects (not yet attached to a credential).
+    """
+    return [SearchToken(token=token) for token in search_tokens_for(texts, search_key)]
+
+def index_credential(credential, vault_key, search_key: bytes = None):
+    """
+    (Re)build the search index entries of a Credential. The caller is
+    responsible for committing the session.
+
+    Args:
+        credential (Credential): The credential to index.
+        vault_key (bytes): The vault key.
+        search_key (bytes, optional): Precomputed `derive_search_key(vault_key)`.
+    """
+    search_key = search_key or derive_search_key(vault_key)
+    credential_key = new_fernet(credential.get_decrypted_key(vault_key))
+    credential.search_tokens = build_search_tokens(
+        _searchable_texts(credential, credential_key), search_key
+    )
+    if credential.next_encrypted_key is not None:
+        # A rotation is in progress and staged the old texts: it redoes this credential
+        credential.next_encrypted_key = None
+        credential.next_search_tokens = []
+
+
+def ensure_search_index(vault_key):
+    """
+    Index every credential that has no search index entries yet (e.g. created
+    before the index existed or by an older version of the app). Indexed
+    credentials always have the `INDEXED_MARKER` entry, even without terms.
+
+    Such credentials only come from a migration, which sets
+    `Vault.search_index_pending`; without the flag this costs one lookup.
+    """
+    if not session.query(Vault.search_index_pending).scalar():
+        return
+
+    unindexed = (
+        session.query(Credential)
+        .outerjoin(SearchToken)
+        .filter(SearchToken.id.is_(None))
+        .options(selectinload(Credential.mnemonics))
+        .all()
+    )
+    search_key = derive_search_key(vault_key)
+    for credential in unindexed:
+        index_credential(credential, vault_key, search_key)
+    session.execute(update(Vault).values(search_index_pending=False, last_updated=Vault.last_updated))
+    session.commit()
+
+@timed('search')
+def search_credentials(query: str, vault_key):
+    """
+    Search credentials by name, mnemonics, username and notes.
+
+    Candidates are found through the blind index; only those are decrypted to
+    confirm the match. A query without a word of 3 characters or more cannot
+    use the index, so every credential is decrypted and checked.
+
+    Args:
+        query (str): The search keyword(s).
+        vault_key (bytes): The vault key.
+
+    Returns:
+        list: Matching Credential objects ordered by id.
+    """
+    ensure_search_index(vault_key)
+
+    search_key = derive_search_key(vault_key)
+    tokens = {blind_index(term, search_key) for term in _query_terms(query)}
+
+    candidates = session.query(Credential).options(selectinload(Credential.mnemonics)).order_by(Credential.id)
+    if tokens:
+        indexed_ids = (
+            session.query(SearchToken.credential_id)
+            .filter(SearchToken.token.in_(tokens))
+            .group_by(SearchToken.credential_id)
+            .having(func.count(func.distinct(SearchToken.token)) == len(tokens))
+        )
+        candidates = candidates.filter(Credential.id.in_(indexed_ids))
+    else:
+        # No word of a trigram or more (e.g. 'gh' or '@'): the index cannot
+        # narrow the search, every credential is decrypted and checked
+        candidates = candidates.yield_per(SCAN_CHUNK_SIZE)
+
+    # Trigram hits may be false positives; confirm on the decrypted text
+    needle = query.lower()
+    results = []
+    for credential in candidates:
+        credential_key = new_fernet(credential.get_decrypted_key(vault_key))
+        if any(needle in text.lower() for text in _searchable_texts(credential, credential_key)):
+            results.append(credential)
+    return results
@@ -0,0 +1,116 @@
+# /utils/server_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Production serving of the web interface with waitress (a pure Python WSGI
+# server with HTTP/1.1 keep-alive). The listening socket is bound once and
+# shared by the worker processes, each of which runs a pool of threads.
+#
+import os
+import sys
+import socket
+import signal
+
+from waitress.server import create_server
+
+
+def parse_bind(bind: str):
+    """
+    Parse a bind address.
+
+    Args:
+        bind (str): 'HOST:PORT', ':PORT' or 'unix:/path/to/socket'.
+
+    Returns:
+        tuple: ('unix', path) or ('tcp', (host, port)).
+    """
+    if bind.startswith('unix:'):
+        return 'unix', bind[len('unix:'):]
+
+    host, sep, port = bind.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid bind address '{bind}'. Use HOST:PORT or unix:PATH.")
+    return 'tcp', (host.strip('[]') or '127.0.0.1', int(port))
+
+
+def bind_socket(bind: str, backlog: int = 1024):
+    """
+    Create the listening socket.
+
+    A Unix socket is only accessible by the current user, like the key agent's.
+
+    Returns:
+        socket.socket: The listening socket.
+    """
+    kind, address = parse_bind(bind)
+
+    if kind == 'unix':
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("Unix domain sockets are not available on this platform.")
+        if os.path.exists(address):
+            os.unlink(address)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(address)
+        finally:
+            os.umask(old_umask)
+    else:
+        family = socket.AF_INET6 if ':' in address[0] else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(address)
+
+    sock.listen(backlog)
+    return sock
+
+
+def serve(app, sock, threads: int):
+    """
+    Serve `app` on the listening socket until SIGTERM or Ctrl+C, then let the
+    in-flight requests finish (for at most 5 sec).
+    """
+    server = create_server(app, sockets=[sock], threads=threads, ident='vaultsafe')
+
+    # waitress shuts down its threads gracefully on SystemExit
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server.run()
+
+
+def run_workers(app, sock, workers: int, threads: int):
+    """
+    Fork `workers` processes serving `app` on the shared socket, and wait for
+    them. SIGTERM or Ctrl+C is forwarded to the workers, which finish their
+    requests before exiting.
+    """
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            # Ctrl+C reaches the whole process group; the parent forwards it as SIGTERM
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            try:
+                serve(app, sock, threads)
+            finally:
+                os._exit(0)
+        pids.append(pid)
+
+    def stop_workers(signum, frame):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+
+    for pid in pids:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                break
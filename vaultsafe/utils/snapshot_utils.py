@@ -0,0 +1,277 @@
+# /utils/snapshot_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Vault snapshots: a read-only, compact binary copy of the vault for fast
+# lookups by mnemonic (e.g. secret injection in CI), without the database.
+#
+# Everything stays encrypted exactly as in the vault; the Fernet tokens are
+# kept raw (not base64) and the credential keys stay wrapped by the vault key.
+# All the integers are little endian.
+#
+#   header    SNAPSHOT_HEADER (64 bytes): magic, format version, counts and
+#             the offsets of the sections below
+#   metadata  JSON: vault name, key version, vault key hash and KDF settings
+#   records   one per credential: RECORD_HEADER (id, key version and the
+#             lengths of the blobs) followed by the blobs: uuid, name,
+#             encrypted_key and the ENCRYPTED_FIELDS (length 0 = not set)
+#   names     the mnemonics (UTF-8), concatenated in sorted order
+#   index     INDEX_ENTRY per mnemonic, sorted by name: offset and length of
+#             the name in `names`, offset of the credential's record
+#
+# `Snapshot` maps the file in memory and binary searches the index, so opening
+# costs the same for any size and a lookup touches a few pages. The reader does
+# not import the database models.
+#
+import os
+import json
+import mmap
+import base64
+import struct
+
+from datetime import datetime, timezone
+
+from vaultsafe.utils.crypto_utils import sha256_hash, decrypt, get_fernet, new_fernet, derive_vault_key
+from vaultsafe.utils.kdf_utils import derive_key, load_params
+from vaultsafe.config import CRYPTO_CHUNK_SIZE
+
+SNAPSHOT_MAGIC = b'VSSNAPSH'
+SNAPSHOT_VERSION = 2
+
+# magic, version, reserved, mnemonics, credentials, reserved,
+# metadata offset, metadata length, records offset, names offset, index offset
+SNAPSHOT_HEADER = struct.Struct('<8sHHIIIQQQQQ')
+# Part of the format: a new field of the credentials needs a new version
+FIELDS = (
+    'url', 'username', 'password', 'recovery_key',
+    'primary_email', 'secondary_email', 'token', 'notes'
+)
+BLOBS = ('uuid', 'name', 'encrypted_key') + FIELDS
+# credential id, key version, lengths of the blobs
+RECORD_HEADER = struct.Struct(f'<II{len(BLOBS)}I')
+# name offset (in the names section), name length, record offset. Version 1
+# had a 16-bit name length followed by 2 zero bytes, which reads the same.
+INDEX_ENTRY = struct.Struct('<IIQ')
+
+
+class SnapshotError(Exception):
+    """The file is not a snapshot this version can read, or there is no vault to snapshot."""
+
+
+def _raw_token(token):
+    # Fernet tokens are base64; the raw bytes are 3/4 of the size
+    return base64.urlsafe_b64decode(token) if token else b''
+
+
+def write_snapshot(path, chunk_size: int = CRYPTO_CHUNK_SIZE):
+    """
+    Compile the vault into a snapshot file. Nothing is decrypted: the rows are
+    read `chunk_size` at a time (without the ORM) and copied as they are.
+
+    The file is written next to `path` and renamed over it at the end, so a
+    reader never sees a partial snapshot. It is only readable by the owner.
+
+    Returns:
+        tuple: (number of credentials, number of mnemonics)
+    """
+    from sqlalchemy import select
+    from vaultsafe.db.models import session, Vault, Credential, Mnemonic
+
+    vault = session.query(Vault).first()
+    if vault is None:
+        raise SnapshotError("There is no vault to snapshot; run 'vaultsafe init' first.")
+    metadata = json.dumps({
+        'vault_uuid': vault.uuid,
+        'vault_name': vault.name,
+        'key_version': vault.key_version,
+        'vault_key_hash': vault.vault_key_hash,
+        'kdf_algorithm': vault.kdf_algorithm,
+        'kdf_params': vault.kdf_params,
+        'kdf_salt': vault.kdf_salt,
+        'created': datetime.now(timezone.utc).isoformat(),
+    }).encode()
+
+    columns = [Credential.id, Credential.key_version] + [getattr(Credential, blob) for blob in BLOBS]
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(bytes(SNAPSHOT_HEADER.size))
+            metadata_offset = f.tell()
+            f.write(metadata)
+
+            # Records, in the order of the ids
+            records_offset = f.tell()
+            record_offsets = {}
+            last_id = 0
+            while True:
+                rows = session.execute(
+                    select(*columns).where(Credential.id > last_id).order_by(Credential.id).limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                for id, key_version, uuid, name, encrypted_key, *fields in rows:
+                    blobs = [(uuid or '').encode(), name.encode(), _raw_token(encrypted_key)] + [_raw_token(field) for field in fields]
+                    record_offsets[id] = f.tell()
+                    f.write(RECORD_HEADER.pack(id, key_version or 0, *map(len, blobs)))
+                    f.write(b''.join(blobs))
+                last_id = rows[-1].id
+
+            # Names and index, sorted by the UTF-8 bytes of the names
+            mnemonics = sorted(
+                (name.encode(), credential_id)
+                for name, credential_id in session.execute(select(Mnemonic.name, Mnemonic.credential_id))
+                if credential_id in record_offsets
+            )
+            names_offset = f.tell()
+            f.write(b''.join(name for name, _ in mnemonics))
+
+            index_offset = f.tell()
+            name_offset = 0
+            index = bytearray()
+            for name, credential_id in mnemonics:
+                index += INDEX_ENTRY.pack(name_offset, len(name), record_offsets[credential_id])
+                name_offset += len(name)
+            f.write(index)
+
+            f.seek(0)
+            f.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(mnemonics), len(record_offsets), 0,
+                metadata_offset, len(metadata), records_offset, names_offset, index_offset
+            ))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return len(record_offsets), len(mnemonics)
+
+
+class SnapshotRecord:
+    """A credential of a snapshot, with its blobs still encrypted."""
+
+    __slots__ = ('id', 'key_version', '_blobs')
+
+    def __init__(self, id, key_version, blobs):
+        self.id = id
+        self.key_version = key_version
+        self._blobs = blobs
+
+    @property
+    def uuid(self):
+        return self._blobs['uuid'].decode()
+
+    @property
+    def name(self):
+        return self._blobs['name'].decode()
+
+    def _token(self, blob):
+        raw = self._blobs[blob]
+        return base64.urlsafe_b64encode(raw) if raw else None
+
+    def get_decrypted_key(self, vault_key):
+        """Same as `Credential.get_decrypted_key()`."""
+        return decrypt(self._token('encrypted_key'), get_fernet(vault_key))
+
+    def decrypt_fields(self, vault_key, fields):
+        """Same as `Credential.decrypt_fields()`."""
+        credential_key = None
+        data = {}
+        for field in fields:
+            token = self._token(field)
+            if token and credential_key is None:
+                credential_key = new_fernet(self.get_decrypted_key(vault_key))
+            data[field] = decrypt(token, credential_key) if token else None
+        return data
+
+
+class Snapshot:
+    """
+    Read-only access to a snapshot file.
+
+    Usage:
+        with Snapshot(path) as snapshot:
+            record = snapshot.get('github')
+            record.decrypt_fields(vault_key, ['password'])
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < SNAPSHOT_HEADER.size:
+                raise SnapshotError(f"'{path}' is not a VaultSafe snapshot.")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.mnemonic_count, self.credential_count, _, metadata_offset, metadata_length,
+         self._records_offset, self._names_offset, self._index_offset) = SNAPSHOT_HEADER.unpack_from(self._mm)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise SnapshotError(f"'{path}' is not a VaultSafe snapshot.")
+        if not 1 <= version <= SNAPSHOT_VERSION:
+            self.close()
+            raise SnapshotError(f"'{path}' has the snapshot format version {version}; this version of VaultSafe reads up to {SNAPSHOT_VERSION}.")
+
+        self.metadata = json.loads(self._mm[metadata_offset:metadata_offset + metadata_length])
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.mnemonic_count
+
+    def check_key(self, vault_key):
+        """Whether `vault_key` is the key of the vault the snapshot was made of."""
+        return sha256_hash(vault_key) == self.metadata['vault_key_hash']
+
+    def derive_key(self, master_password: str):
+        """Same as `Vault.derive_key()`, with the settings saved in the snapshot."""
+        if self.metadata['kdf_algorithm'] is None:
+            return derive_vault_key(master_key=master_password)
+        return derive_key(master_password, self.metadata['kdf_algorithm'],
+                          load_params(self.metadata['kdf_params']), self.metadata['kdf_salt'])
+
+    def _entry(self, i):
+        name_offset, name_length, record_offset = INDEX_ENTRY.unpack_from(self._mm, self._index_offset + i * INDEX_ENTRY.size)
+        start = self._names_offset + name_offset
+        return self._mm[start:start + name_length], record_offset
+
+    def _record(self, offset):
+        id, key_version, *lengths = RECORD_HEADER.unpack_from(self._mm, offset)
+        blobs = {}
+        position = offset + RECORD_HEADER.size
+        for blob, length in zip(BLOBS, lengths):
+            blobs[blob] = self._mm[position:position + length]
+            position += length
+        return SnapshotRecord(id, key_version, blobs)
+
+    def get(self, mnemonic: str):
+        """
+        Returns:
+            SnapshotRecord: The credential of the mnemonic, or None.
+        """
+        target = mnemonic.encode()
+        low, high = 0, self.mnemonic_count
+        while low < high:
+            middle = (low + high) // 2
+            name, record_offset = self._entry(middle)
+            if name < target:
+                low = middle + 1
+            elif name > target:
+                high = middle
+            else:
+                return self._record(record_offset)
+        return None
+
+    def mnemonics(self):
+        """Iterate over the mnemonics, in sorted order."""
+        for i in range(self.mnemonic_count):
+            yield self._entry(i)[0].decode()
@@ -0,0 +1,197 @@
+# /utils/stream_utils.py
+# Author: Indrajit Ghosh
+# Created On: Oct 17, 2026
+#
+# Incremental readers for the files written by `vaultsafe export`, so that
+# huge exports can be imported without loading them in memory.
+#
+# Offsets are byte offsets in the file, always right after a complete
+# credential. They can be saved and passed back to resume reading. A malformed
+# file raises `ExportFormatError`, with the byte offset of the faulty part.
+#
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class ExportFormatError(ValueError):
+    """Raised when an export file is malformed."""
+
+
+def _credential(data, offset: int):
+    """Check that a decoded credential (starting at byte `offset`) is an object."""
+    if not isinstance(data, dict):
+        raise ExportFormatError(f"Malformed export file: expected a credential object at byte {offset}.")
+    return data
+
+
+class _JsonStream:
+    """A growing text buffer over a binary file which keeps track of byte offsets."""
+
+    def __init__(self, f, offset: int = 0):
+        self.f = f
+        self.f.seek(offset)
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        # Byte offset of buf[mark_pos]
+        self.mark_pos = 0
+        self.mark_offset = offset
+
+    def fill(self):
+        """Read one more chunk. Returns False at the end of the file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            self.buf += self.text_decoder.decode(b'', final=True)
+            return False
+        # Drop what was consumed already
+        self.offset()
+        self.buf = self.buf[self.pos:] + self.text_decoder.decode(chunk)
+        self.pos = self.mark_pos = 0
+        return True
+
+    def offset(self):
+        """Byte offset of the current position."""
+        self.mark_offset += len(self.buf[self.mark_pos:self.pos].encode('utf-8'))
+        self.mark_pos = self.pos
+        return self.mark_offset
+
+    def peek(self):
+        """Next non whitespace character (not consumed), '' at the end of the file."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\n\r':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ExportFormatError(f"Malformed export file: expected '{char}' at byte {self.offset()}.")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise ExportFormatError(f"Malformed export file: invalid JSON at byte {self.offset()}.")
+            # The value may continue in the next chunk
+            self.fill()
+
+
+def read_json_metadata(f):
+    """
+    Read the header of a JSON export.
+
+    Args:
+        f: The export file opened in binary mode.
+
+    Returns:
+        tuple: (metadata, byte offset where the credentials start).
+    """
+    stream = _JsonStream(f)
+    stream.expect('{')
+
+    metadata = None
+    while stream.peek() not in ('}', ''):
+        key = stream.value()
+        stream.expect(':')
+
+        if key == 'credentials':
+            if metadata is None:
+                raise ExportFormatError("Malformed export file: 'metadata' must come before 'credentials'.")
+            stream.expect('[')
+            return metadata, stream.offset()
+
+        value = stream.value()
+        if key == 'metadata':
+            if not isinstance(value, dict):
+                raise ExportFormatError("Malformed export file: 'metadata' must be an object.")
+            metadata = value
+
+        if stream.peek() == ',':
+            stream.pos += 1
+
+    return metadata, None
+
+
+def iter_json_credentials(f, offset: int):
+    """
+    Stream the elements of the 'credentials' array of a JSON export.
+
+    Args:
+        f: The export file opened in binary mode.
+        offset (int): Byte offset from `read_json_metadata()` or a saved checkpoint.
+
+    Yields:
+        tuple: (credential dict, byte offset right after it)
+    """
+    stream = _JsonStream(f, offset)
+    while True:
+        char = stream.peek()
+        if char == ']':
+            return
+        if char == ',':
+            stream.pos += 1
+        elif char == '':
+            raise ExportFormatError(f"Malformed export file: unexpected end of file at byte {stream.offset()}.")
+
+        start = stream.offset()
+        data = _credential(stream.value(), start)
+        yield data, stream.offset()
+
+
+def read_jsonl_metadata(f):
+    """
+    Read the header (first line) of a JSON Lines export.
+
+    Returns:
+        tuple: (metadata, byte offset where the credentials start).
+    """
+    f.seek(0)
+    try:
+        header = json.loads(f.readline() or b'{}')
+    except ValueError:
+        raise ExportFormatError("Malformed export file: invalid JSON at byte 0.")
+    if not isinstance(header, dict) or not isinstance(header.get('metadata', {}), dict):
+        raise ExportFormatError("Malformed export file: the first line must be an object with the 'metadata'.")
+    return header.get('metadata'), f.tell()
+
+
+def iter_jsonl_credentials(f, offset: int):
+    """
+    Stream the credentials of a JSON Lines export (one per line).
+
+    Yields:
+        tuple: (credential dict, byte offset right after it)
+    """
+    f.seek(offset)
+    for line in iter(f.readline, b''):
+        start, offset = offset, offset + len(line)
+        if line.strip():
+            try:
+                data = json.loads(line)
+            except ValueError:
+                raise ExportFormatError(f"Malformed export file: invalid JSON at byte {start}.")
+            yield _credential(data, start), offset
+
+
+EXPORT_READERS = {
+    'json': (read_json_metadata, iter_json_credentials),
+    'jsonl': (read_jsonl_metadata, iter_jsonl_credentials),
+}
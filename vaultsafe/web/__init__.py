@@ -1,13 +1,24 @@
 # vaultsafe/web/__init__.py
 from flask import Flask
 
-def create_app(config_class):
+def create_app(config_class, enable_api=True):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
     # Import routes
     from vaultsafe.web.routes import bp
     app.register_blueprint(bp)
+    if enable_api:
+        from vaultsafe.web.api import api
+        app.register_blueprint(api)
+
+    # Every request thread gets its own database session; drop it once the
+    # request is done so that its identity map does not keep growing.
+    from vaultsafe.db.models import session as db_session
+
+    @app.teardown_appcontext
+    def remove_db_session(exception=None):
+        db_session.remove()
     
     return app
 
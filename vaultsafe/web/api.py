@@ -0,0 +1,207 @@
+# vaultsafe/web/api.py
+#
+# JSON API, version 1.
+#
+#   POST   /api/v1/auth                          {"master_password": ...} -> {"token", "expires_in"}
+#   DELETE /api/v1/auth                          Revoke the token
+#   GET    /api/v1/credentials?after=&limit=     Plaintext listing (nothing decrypted)
+#   GET    /api/v1/credentials/<uuid>            A decrypted credential
+#   GET    /api/v1/mnemonics/<name>              A decrypted credential
+#   GET    /api/v1/mnemonics/<name>/<field>      A single decrypted field
+#   POST   /api/v1/mnemonics/batch               {"mnemonics": [...], "fields": [...]} -> many at once
+#
+# Every endpoint but POST /auth needs the header `Authorization: Bearer <token>`.
+# Failed POST /auth are throttled per client (429 with `Retry-After`), and the
+# tokens issued before a change of the master password are refused (401).
+#
+from functools import wraps
+
+from flask import Blueprint, request, jsonify, g
+from sqlalchemy.orm import selectinload
+
+from vaultsafe.db.models import Vault, Credential, Mnemonic, session as db_session
+from vaultsafe.utils.crypto_utils import sha256_hash
+from vaultsafe.web.key_store import KeyStore
+from vaultsafe.web.routes import dashboard_page, login_throttle
+from vaultsafe.config import DASHBOARD_PAGE_SIZE
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+key_store = KeyStore()
+
+# Plaintext attributes which can be asked for along with the encrypted ones
+PLAIN_FIELDS = ('id', 'uuid', 'name', 'mnemonics')
+FIELDS = PLAIN_FIELDS + Credential.ENCRYPTED_FIELDS
+
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 1000
+
+
+def error(message: str, status: int):
+    return jsonify({'error': message}), status
+
+
+def token_required(func):
+    @wraps(func)
+    def decorated_function(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        vault_key = key_store.get(token) if scheme.lower() == 'bearer' and token else None
+        if vault_key is None:
+            return error('Missing, invalid or expired token.', 401)
+        if sha256_hash(vault_key) != db_session.query(Vault.vault_key_hash).scalar():
+            # Issued before the master password was changed
+            key_store.revoke(token)
+            return error('The master password has changed; authenticate again.', 401)
+        g.vault_key = vault_key
+        g.token = token
+        return func(*args, **kwargs)
+    return decorated_function
+
+
+def credential_data(credential, vault_key, fields=None):
+    """
+    The decrypted attributes of a credential, missing ones as null. Only the
+    asked `fields` (default: all of `FIELDS`) are decrypted.
+    """
+    fields = fields or FIELDS
+    data = {}
+    for field in fields:
+        if field == 'mnemonics':
+            data[field] = [mnemonic.name for mnemonic in credential.mnemonics]
+        elif field in PLAIN_FIELDS:
+            data[field] = getattr(credential, field)
+    data.update(credential.decrypt_fields(vault_key, [field for field in fields if field not in PLAIN_FIELDS]))
+    return {field: data[field] for field in fields}
+
+
+def _fields_arg(fields):
+    """Validate the requested fields. Returns (fields, error response)."""
+    if fields is None:
+        return None, None
+    if not isinstance(fields, list):
+        return None, error("'fields' must be a list.", 400)
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        return None, error(f"Unknown field(s): {', '.join(unknown)}. Use: {', '.join(FIELDS)}.", 400)
+    return fields, None
+
+
+@api.route('/auth', methods=['POST'])
+def auth():
+    data = request.get_json(silent=True) or {}
+    master_passwd = data.get('master_password')
+    if not master_passwd:
+        return error("'master_password' is required.", 400)
+
+    retry_after = login_throttle.retry_after(request.remote_addr)
+    if retry_after:
+        response = error('Too many failed attempts. Try again later.', 429)
+        response[0].headers['Retry-After'] = str(retry_after)
+        return response
+
+    vault = db_session.query(Vault).first()
+    if vault is None:
+        return error('Vault not initialized.', 503)
+    if not vault.check_password(master_passwd):
+        login_throttle.failure(request.remote_addr)
+        return error('Invalid master password.', 401)
+    login_throttle.success(request.remote_addr)
+
+    ttl = vault.session_expiration
+    token = key_store.issue(vault.derive_key(master_passwd), ttl)
+    return jsonify({'token': token, 'expires_in': ttl})
+
+
+@api.route('/auth', methods=['DELETE'])
+@token_required
+def revoke():
+    key_store.revoke(g.token)
+    return '', 204
+
+
+@api.route('/credentials', methods=['GET'])
+@token_required
+def list_credentials():
+    limit = min(max(request.args.get('limit', DASHBOARD_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    credentials, _, next_after = dashboard_page(after=request.args.get('after', type=int), limit=limit)
+    return jsonify({
+        'credentials': [credential_data(credential, None, PLAIN_FIELDS) for credential in credentials],
+        'next_after': next_after,
+    })
+
+
+@api.route('/credentials/<uuid>', methods=['GET'])
+@token_required
+def get_credential(uuid):
+    fields, response = _fields_arg(request.args.getlist('field') or None)
+    if response:
+        return response
+
+    credential = db_session.query(Credential).filter_by(uuid=uuid).first()
+    if credential is None:
+        return error(f"No credential with the uuid '{uuid}'.", 404)
+    return jsonify(credential_data(credential, g.vault_key, fields))
+
+
+@api.route('/mnemonics/<name>', methods=['GET'])
+@token_required
+def get_by_mnemonic(name):
+    fields, response = _fields_arg(request.args.getlist('field') or None)
+    if response:
+        return response
+
+    mnemonic = db_session.query(Mnemonic).filter_by(name=name).first()
+    if mnemonic is None:
+        return error(f"No credential with the mnemonic '{name}'.", 404)
+    return jsonify(credential_data(mnemonic.credential, g.vault_key, fields))
+
+
+@api.route('/mnemonics/<name>/<field>', methods=['GET'])
+@token_required
+def get_field(name, field):
+    if field not in FIELDS:
+        return error(f"Unknown field '{field}'. Use: {', '.join(FIELDS)}.", 400)
+
+    mnemonic = db_session.query(Mnemonic).filter_by(name=name).first()
+    if mnemonic is None:
+        return error(f"No credential with the mnemonic '{name}'.", 404)
+    return jsonify({'mnemonic': name, 'field': field, 'value': credential_data(mnemonic.credential, g.vault_key, [field])[field]})
+
+
+@api.route('/mnemonics/batch', methods=['POST'])
+@token_required
+def get_batch():
+    data = request.get_json(silent=True) or {}
+    names = data.get('mnemonics')
+    if not isinstance(names, list) or not names:
+        return error("'mnemonics' must be a non empty list.", 400)
+    if len(names) > MAX_BATCH_SIZE:
+        return error(f"At most {MAX_BATCH_SIZE} mnemonics per request.", 400)
+
+    fields, response = _fields_arg(data.get('fields'))
+    if response:
+        return response
+
+    # All the credentials (and their mnemonics) in a fixed number of queries
+    mnemonics = (
+        db_session.query(Mnemonic)
+        .filter(Mnemonic.name.in_(set(names)))
+        .options(selectinload(Mnemonic.credential).selectinload(Credential.mnemonics))
+        .all()
+    )
+    found = {mnemonic.name: mnemonic.credential for mnemonic in mnemonics}
+
+    # Mnemonics of the same credential share one decryption
+    decrypted = {}
+    results = {}
+    for name in names:
+        if name in found:
+            credential = found[name]
+            if credential.id not in decrypted:
+                decrypted[credential.id] = credential_data(credential, g.vault_key, fields)
+            results[name] = decrypted[credential.id]
+
+    return jsonify({
+        'credentials': results,
+        'missing': [name for name in names if name not in found],
+    })
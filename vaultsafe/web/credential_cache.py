@@ -0,0 +1,159 @@
+# vaultsafe/web/credential_cache.py
+#
+# Decrypted credentials of the web pages, kept in the memory of the server
+# process so that viewing the same credential again needs neither its row
+# nor any decryption.
+#
+# An entry belongs to one vault key (i.e. one login) and to one version of the
+# credential: it is keyed by the credential id and only served while the
+# credential's `last_updated` is unchanged. Every edit, made here or elsewhere
+# (e.g. the CLI), must therefore bump `last_updated`, including edits which
+# only touch the mnemonics (their own table). Entries expire with the login
+# session and the cache is bounded both in entries and in bytes (least
+# recently used first out).
+#
+# The secrets of an entry are held in bytearrays which are overwritten with
+# zeros when the entry goes away. This only limits how long the cache itself
+# keeps them: `get()` and `put()` return str copies (as do the decryption and
+# the rendered pages), which Python neither lets us overwrite nor zeroes when
+# it frees them, so plaintext may linger in the memory of the server process.
+#
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from vaultsafe.db.models import Credential
+from vaultsafe.config import WEB_CACHE_MAX_ENTRIES, WEB_CACHE_MAX_BYTES
+
+# The keys of `DecryptedCredential` used by the templates
+CACHED_KEYS = ('id', 'uuid', 'name', 'mnemonics', *Credential.ENCRYPTED_FIELDS, 'date_created', 'last_updated')
+
+
+class _Entry:
+    __slots__ = ('last_updated', 'values', 'size', 'expires_at')
+
+    def __init__(self, last_updated, values, expires_at):
+        self.last_updated = last_updated
+        self.values = values
+        self.size = sum(len(value) if isinstance(value, (str, bytearray)) else 64 for value in values.values())
+        self.expires_at = expires_at
+
+    def data(self):
+        """A plain dict of the values, the secrets as str (copies which `wipe()` does not reach)."""
+        return {key: value.decode() if isinstance(value, bytearray) else value for key, value in self.values.items()}
+
+    def wipe(self):
+        for value in self.values.values():
+            if isinstance(value, bytearray):
+                # Same size slice assignment: the buffer is overwritten in place
+                value[:] = bytes(len(value))
+        self.values.clear()
+
+
+class CredentialCache:
+    """A thread safe LRU cache of decrypted credentials, with expiry."""
+
+    def __init__(self, max_entries: int = WEB_CACHE_MAX_ENTRIES, max_bytes: int = WEB_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # (sha256(vault key), credential id) -> _Entry, least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(('hits', 'misses', 'stale', 'expired', 'evictions', 'invalidations'), 0)
+
+    @staticmethod
+    def _vault_id(vault_key):
+        # Entries are told apart by a hash of the vault key; the key itself is not kept
+        if isinstance(vault_key, str):
+            vault_key = vault_key.encode()
+        return hashlib.sha256(vault_key).hexdigest()
+
+    def get(self, vault_key, credential_id: int, last_updated):
+        """
+        Returns:
+            dict: The decrypted credential, or None if it is not cached, has
+                expired or was modified since (`last_updated` differs).
+        """
+        key = (self._vault_id(vault_key), credential_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if entry.last_updated != last_updated or time.monotonic() >= entry.expires_at:
+                self._stats['stale' if entry.last_updated != last_updated else 'expired'] += 1
+                self._stats['misses'] += 1
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry.data()
+
+    def put(self, vault_key, credential, ttl: int):
+        """
+        Cache a credential for `ttl` seconds (at most), decrypting its fields.
+
+        Args:
+            vault_key (bytes): The vault key of the login.
+            credential (Credential): The credential to decrypt and cache.
+            ttl (int): Seconds left in the login session.
+
+        Returns:
+            dict: The decrypted credential (as `get()` would return it).
+        """
+        view = credential.decrypted(vault_key)
+        values = {
+            key: bytearray(view[key].encode()) if key in Credential.ENCRYPTED_FIELDS else view[key]
+            for key in CACHED_KEYS
+        }
+        entry = _Entry(credential.last_updated, values, time.monotonic() + ttl)
+        data = entry.data()
+        if not self.max_entries or ttl <= 0 or entry.size > self.max_bytes:
+            entry.wipe()
+            return data
+
+        key = (self._vault_id(vault_key), credential.id)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+        return data
+
+    def invalidate(self, credential_id: int):
+        """Drop a credential (modified or deleted) from the cache, for every login."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == credential_id]:
+                self._remove(key)
+                self._stats['invalidations'] += 1
+
+    def clear(self, vault_key=None):
+        """Drop the credentials of a login (e.g. on logout), or all of them."""
+        vault_id = self._vault_id(vault_key) if vault_key is not None else None
+        with self._lock:
+            for key in [key for key in self._entries if vault_id is None or key[0] == vault_id]:
+                self._remove(key)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hits, misses (of which stale and expired), evictions,
+                invalidations, hit rate, entries and bytes.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            entry.wipe()
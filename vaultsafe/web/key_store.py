@@ -0,0 +1,63 @@
+# vaultsafe/web/key_store.py
+#
+# The vault keys behind the API tokens. They live only in the memory of the
+# server process; a client only ever holds an opaque random token.
+#
+import time
+import secrets
+import hashlib
+import threading
+
+
+class KeyStore:
+    """A thread safe map from API tokens to vault keys, with expiry."""
+
+    def __init__(self):
+        # sha256(token) -> (vault_key, expires_at)
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _token_id(token: str):
+        # Only a hash of the token is kept, so that the store cannot be used to
+        # recover a valid token
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def issue(self, vault_key: bytes, ttl: int):
+        """
+        Store the vault key and return a new token for it, valid for `ttl` sec.
+        """
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._purge()
+            self._keys[self._token_id(token)] = (vault_key, time.monotonic() + ttl)
+        return token
+
+    def get(self, token: str):
+        """
+        Returns:
+            bytes: The vault key of the token, or None if it is unknown or expired.
+        """
+        token_id = self._token_id(token)
+        with self._lock:
+            entry = self._keys.get(token_id)
+            if entry is None:
+                return None
+            vault_key, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._keys[token_id]
+                return None
+            return vault_key
+
+    def revoke(self, token: str):
+        with self._lock:
+            self._keys.pop(self._token_id(token), None)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+    def _purge(self):
+        now = time.monotonic()
+        for token_id in [token_id for token_id, (_, expires_at) in self._keys.items() if expires_at <= now]:
+            del self._keys[token_id]
@@ -1,15 +1,26 @@
 # vaultsafe/web/routes.py
+import time
 from functools import wraps
 
-from flask import render_template, redirect, url_for, flash, request, session, Blueprint
+from flask import render_template, redirect, url_for, flash, request, session, Blueprint, jsonify
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload, load_only
 
 from vaultsafe.db.models import Vault, Credential, Mnemonic, session as db_session
-from vaultsafe.utils.crypto_utils import encrypt, derive_vault_key, generate_fernet_key
-from vaultsafe.utils.general_utils import convert_utc_to_local_str
-from vaultsafe.config import DATABASE_PATH
+from vaultsafe.utils.crypto_utils import encrypt, generate_fernet_key, clear_fernet_cache
+from vaultsafe.utils.general_utils import utcnow, convert_utc_to_local_strs
+from vaultsafe.utils.search_utils import index_credential
+from vaultsafe.web.credential_cache import CredentialCache
+from vaultsafe.web.throttle import LoginThrottle
+from vaultsafe.config import DATABASE_PATH, DASHBOARD_PAGE_SIZE
 
 bp = Blueprint('main', __name__)
 
+credential_cache = CredentialCache()
+
+# Shared with POST /api/v1/auth
+login_throttle = LoginThrottle()
+
 def login_required(func):
     @wraps(func)
     def decorated_function(*args, **kwargs):
@@ -32,29 +43,142 @@ def login():
             flash('Database not found. Please initialize the app by running: vaultsafe init', 'error')
             return render_template('login.html')
         
+        retry_after = login_throttle.retry_after(request.remote_addr)
+        if retry_after:
+            flash(f'Too many failed attempts. Try again in {retry_after} seconds.', 'error')
+            return render_template('login.html'), 429
+
         master_passwd = request.form['master_passwd']
         vault = db_session.query(Vault).first()
         if vault.check_password(master_passwd):
+            login_throttle.success(request.remote_addr)
             session['logged_in'] = True
 
             # Generate the vault_key
-            vault_key = derive_vault_key(master_key=master_passwd)
+            vault_key = vault.derive_key(master_passwd)
 
             # Save the vault_key to the session
             session['vault_key'] = vault_key
+            # Cached credentials live as long as the login session
+            session['expires_at'] = time.time() + vault.session_expiration
 
             flash('Login successful!', 'success')
             return redirect(url_for('main.dashboard'))
         else:
+            login_throttle.failure(request.remote_addr)
             flash('Invalid master password!', 'error')
     return render_template('login.html')
 
 
+def decrypted_credential(condition):
+    """
+    The decrypted credential matching `condition`, from `credential_cache` if
+    it holds its current version. Otherwise the credential is loaded, decrypted
+    and cached until the end of the login session.
+
+    Args:
+        condition: A filter on Credential (and Mnemonic), e.g. `Credential.uuid == uuid`.
+
+    Returns:
+        dict: The credential, with the keys of `credential_cache.CACHED_KEYS`, or None.
+    """
+    # Only the id and the version of the credential are read to check the cache
+    row = db_session.execute(
+        select(Credential.id, Credential.last_updated).outerjoin(Mnemonic).where(condition).limit(1)
+    ).first()
+    if row is None:
+        return None
+
+    vault_key = session['vault_key']
+    data = credential_cache.get(vault_key, row.id, row.last_updated)
+    if data is None:
+        credential = db_session.get(Credential, row.id)
+        data = credential_cache.put(vault_key, credential, ttl=session.get('expires_at', 0) - time.time())
+    return data
+
+
+def dashboard_page(after: int = None, before: int = None, limit: int = DASHBOARD_PAGE_SIZE):
+    """
+    One page of the dashboard, using keyset pagination on the credential id so
+    that every page costs the same however large the vault is. Only the
+    plaintext columns are loaded (nothing is decrypted) and the mnemonics of
+    the whole page are fetched in one query.
+
+    Args:
+        after (int, optional): Return the credentials following this id.
+        before (int, optional): Return the credentials preceding this id.
+        limit (int): Page size.
+
+    Returns:
+        tuple: (credentials ordered by id, id for the previous page or None, id for the next page or None)
+    """
+    query = db_session.query(Credential).options(
+        load_only(Credential.id, Credential.uuid, Credential.name, Credential.date_created, Credential.last_updated),
+        selectinload(Credential.mnemonics)
+    )
+
+    if before is not None:
+        # Walk backwards, one extra row tells whether there is a page before
+        credentials = query.filter(Credential.id < before).order_by(Credential.id.desc()).limit(limit + 1).all()
+        has_previous = len(credentials) > limit
+        credentials = credentials[:limit][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            query = query.filter(Credential.id > after)
+        credentials = query.order_by(Credential.id).limit(limit + 1).all()
+        has_next = len(credentials) > limit
+        credentials = credentials[:limit]
+        has_previous = after is not None
+
+    previous_before = credentials[0].id if credentials and has_previous else None
+    next_after = credentials[-1].id if credentials and has_next else None
+    return credentials, previous_before, next_after
+
+
 @bp.route('/dashboard')
 @login_required
 def dashboard():
-    credentials = db_session.query(Credential).all()
-    return render_template('dashboard.html', credentials=credentials, convert_utc_to_local_str=convert_utc_to_local_str)
+    credentials, previous_before, next_after = dashboard_page(
+        after=request.args.get('after', type=int),
+        before=request.args.get('before', type=int)
+    )
+    # Format the dates of the whole page at once: id -> (date created, last updated)
+    local_dates = convert_utc_to_local_strs(
+        dt for credential in credentials for dt in (credential.date_created, credential.last_updated)
+    )
+    dates = {credential.id: local_dates[2 * i:2 * i + 2] for i, credential in enumerate(credentials)}
+    return render_template(
+        'dashboard.html', credentials=credentials, previous_before=previous_before, next_after=next_after,
+        dates=dates
+    )
+
+
+@bp.route('/dashboard.json')
+@login_required
+def dashboard_json():
+    """The dashboard as JSON: `?after=<id>`, `?before=<id>` and `?limit=<n>` (at most 500)."""
+    limit = min(request.args.get('limit', DASHBOARD_PAGE_SIZE, type=int), 500)
+    credentials, previous_before, next_after = dashboard_page(
+        after=request.args.get('after', type=int),
+        before=request.args.get('before', type=int),
+        limit=max(limit, 1)
+    )
+    return jsonify({
+        'credentials': [
+            {
+                'id': credential.id,
+                'uuid': credential.uuid,
+                'name': credential.name,
+                'mnemonics': [mnemonic.name for mnemonic in credential.mnemonics],
+                'date_created': credential.date_created.isoformat(),
+                'last_updated': credential.last_updated.isoformat(),
+            }
+            for credential in credentials
+        ],
+        'previous_before': previous_before,
+        'next_after': next_after,
+    })
 
 
 @bp.route('/add', methods=['GET', 'POST'])
@@ -114,6 +238,7 @@ def add_credential():
             mnemonic_entry = Mnemonic(name=mnemonic, credential=credential)
             db_session.add(mnemonic_entry)
 
+        index_credential(credential, vault_key)
         db_session.commit()
 
         flash('Credential added successfully!')
@@ -124,11 +249,11 @@ def add_credential():
 @bp.route('/update/<uuid>', methods=['GET', 'POST'])
 @login_required
 def update_credential(uuid):
-    credential = db_session.query(Credential).filter_by(uuid=uuid).first()
-
     vault_key = session['vault_key']
 
     if request.method == 'POST':
+        credential = db_session.query(Credential).filter_by(uuid=uuid).first()
+
         # Extract form data
         name = request.form.get('name')
         mnemonics = request.form.get('mnemonics').split(', ')
@@ -181,48 +306,46 @@ def update_credential(uuid):
             mnemonic_entry = Mnemonic(name=mnemonic, credential=credential)
             db_session.add(mnemonic_entry)
 
+        # The mnemonics live in their own table: mark the new version of the credential
+        credential.last_updated = utcnow()
+        db_session.flush()
+        index_credential(credential, vault_key)
         db_session.commit()
+        credential_cache.invalidate(credential.id)
 
         flash('Credential updated successfully!')
         return redirect(url_for('main.dashboard'))
 
-    return render_template('update_credential.html', credential=credential.json(vault_key))
+    return render_template('update_credential.html', credential=decrypted_credential(Credential.uuid == uuid))
 
 
 @bp.route('/get/<uuid>', methods=['GET'])
 @login_required
 def get_credential(uuid):
-    credential = db_session.query(Credential).filter_by(uuid=uuid).first()
+    credential = decrypted_credential(Credential.uuid == uuid)
     if not credential:
         flash('Credential not found.', 'error')
         return redirect(url_for('main.dashboard'))
     
-    vault_key = session['vault_key']
-    
-    return render_template('get_credential.html', credential=credential.json(vault_key), none_str=Credential.NONE_STR)
+    return render_template('get_credential.html', credential=credential, none_str=Credential.NONE_STR)
 
 @bp.route('/get', methods=['GET', 'POST'])
 @login_required
 def get():
     credential = None
-    vault_key = session['vault_key']
 
     if request.method == 'POST':
         mnemonic = request.form.get('mnemonic')
         print(mnemonic)
         if mnemonic:
-            mnemonic_entry = db_session.query(Mnemonic).filter_by(name=mnemonic).first()
-            if not mnemonic_entry:
+            # The credential associated with the mnemonic
+            credential = decrypted_credential(Mnemonic.name == mnemonic)
+            if not credential:
                 flash(f"Mnemonic not found with the name '{mnemonic}'.", 'error')
-            else:
-                # Get the credential associated with the mnemonic
-                credential = mnemonic_entry.credential
         else:
             flash("Please enter a mnemonic onto the search bar!", 'error')
 
-    credential_json = credential.json(vault_key) if credential else None
-    
-    return render_template('get.html', credential=credential_json, none_str=Credential.NONE_STR)
+    return render_template('get.html', credential=credential, none_str=Credential.NONE_STR)
 
 
 @bp.route('/delete/<int:id>', methods=['POST'])
@@ -236,6 +359,7 @@ def delete_credential(id):
     
     db_session.delete(credential)
     db_session.commit()
+    credential_cache.invalidate(id)
     
     flash(f'Credential "{credential.name}" deleted successfully!', 'success')
     return redirect(url_for('main.dashboard'))
@@ -246,4 +370,14 @@ def delete_credential(id):
 def logout():
     # Implement logout logic
     session['logged_in'] = False
-    return redirect(url_for('main.index'))
\ No newline at end of file
+    if 'vault_key' in session:
+        credential_cache.clear(session['vault_key'])
+    clear_fernet_cache()
+    return redirect(url_for('main.index'))
+
+
+@bp.route('/cache.json')
+@login_required
+def cache_stats():
+    """Metrics of the decrypted credential cache: hits, misses, evictions..."""
+    return jsonify(credential_cache.stats())
\ No newline at end of file
@@ -0,0 +1,57 @@
+# vaultsafe/web/throttle.py
+#
+# Backoff of master password guesses (the login page and POST /api/v1/auth).
+#
+# Failures are counted per client address. After `free_failures` of them,
+# every further failure locks the address out for twice as long as the
+# previous one, up to `max_delay` seconds. A successful login clears the count,
+# and so does an hour without failures. The state lives in the memory of the
+# server process only.
+#
+import time
+import threading
+
+from vaultsafe.config import AUTH_FREE_FAILURES, AUTH_MAX_DELAY
+
+
+class LoginThrottle:
+    """A thread safe per client count of failed logins, with exponential backoff."""
+
+    def __init__(self, free_failures: int = AUTH_FREE_FAILURES, max_delay: int = AUTH_MAX_DELAY,
+                 forget_after: int = 3600):
+        self.free_failures = free_failures
+        self.max_delay = max_delay
+        self.forget_after = forget_after
+        # client -> (failures, locked until, last failure)
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, client: str):
+        """
+        Returns:
+            int: Seconds before `client` may try again, 0 if it may now.
+        """
+        with self._lock:
+            entry = self._clients.get(client)
+            if entry is None:
+                return 0
+            return max(0, int(entry[1] - time.monotonic() + 0.999))
+
+    def failure(self, client: str):
+        """Record a failed login of `client`."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            failures = self._clients.get(client, (0, 0, 0))[0] + 1
+            excess = failures - self.free_failures
+            delay = min(2 ** (excess - 1), self.max_delay) if excess > 0 else 0
+            self._clients[client] = (failures, now + delay, now)
+
+    def success(self, client: str):
+        """Forget the failures of `client`."""
+        with self._lock:
+            self._clients.pop(client, None)
+
+    def _purge(self, now):
+        for client in [client for client, (_, _, last) in self._clients.items() if now - last > self.forget_after]:
+            del self._clients[client]